@@ -1,29 +1,53 @@
 import sys
 import os
 import re
+import json
+import sqlite3
+import uuid
+import hashlib
+import zipfile
+import io
 import subprocess
-from datetime import datetime
+import tempfile
+import shutil
+import time
+import threading
+import queue
+import random
+import struct
+import socket
+import types
+from bisect import bisect_right
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from html import escape, unescape
+from html.parser import HTMLParser
 from playwright.sync_api import sync_playwright
 
 # PySide6 Core
 from PySide6.QtCore import (
-    Qt, QSize, QTimer, QPropertyAnimation, QEasingCurve, Signal, QUrl, QObject, QThread, QRectF,
-    QSettings
+    Qt, QSize, QRect, QPoint, QTimer, QPropertyAnimation, QEasingCurve, Signal, QUrl, QObject, QThread, QRectF,
+    QSettings, QEvent, QMarginsF, QFileSystemWatcher, QAbstractListModel, QModelIndex, QPersistentModelIndex, QRunnable, QThreadPool
 )
 
 # PySide6 GUI
 from PySide6.QtGui import (
     QIcon, QColor, QLinearGradient, QPalette, QBrush, QFont, QPainter, QTextCursor, QPixmap,
-    QPainterPath, QFontMetrics, QAction
+    QPainterPath, QFontMetrics, QAction, QTextDocument, QPdfWriter, QPageSize, QPageLayout, QPixmapCache,
+    QShortcut, QKeySequence, QTextDocumentFragment
 )
 
 # PySide6 Widgets
 from PySide6.QtWidgets import (
-    QApplication, QWidget, QDialog, QLabel, QPushButton, QLineEdit, QListWidget, QListWidgetItem,
+    QApplication, QWidget, QDialog, QLabel, QPushButton, QLineEdit, QListView,
     QVBoxLayout, QHBoxLayout, QGridLayout, QStackedLayout, QScrollArea,
     QTextEdit, QTextBrowser, QSplitter, QFrame, QGraphicsDropShadowEffect,
     QGroupBox, QRadioButton, QComboBox, QButtonGroup, QStyledItemDelegate, QStyle,
-    QMenu, QMessageBox
+    QMenu, QMessageBox, QCheckBox, QDoubleSpinBox, QSpinBox, QAbstractItemView, QToolTip
 )
 
 # PySide6 Web
@@ -35,86 +59,217 @@ from PySide6.QtWebEngineCore import QWebEngineProfile, QWebEnginePage
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound
 import ollama
 import markdown
-from bs4 import BeautifulSoup
-from openai import OpenAI
+from openai import OpenAI, RateLimitError
+import httpx
 
+try:
+    from pypdf import PdfReader, PdfWriter
+except ImportError:
+    PdfReader = PdfWriter = None
 
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-ICON = lambda filename: os.path.join(BASE_DIR, "icons", filename)
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-class TranscriptWorker(QObject):
-    finished = Signal(str)
-    error = Signal(str)
-
-    def __init__(self, video_id):
-        super().__init__()
-        self.video_id = video_id
-        self.max_retries = 10
+try:
+    from PySide6.QtPdf import QPdfDocument
+except ImportError:
+    QPdfDocument = None
 
-    def fetch_transcript(self):
-        attempt = 0
-        while attempt < self.max_retries:
-            try:
-                if not os.path.exists("transcript"):
-                    os.makedirs("transcript")
+try:
+    import psutil
+except ImportError:
+    psutil = None
 
-                transcript = None
 
-               
-                try:
-                    transcript = YouTubeTranscriptApi.get_transcript(self.video_id, languages=['en'])
-                except NoTranscriptFound:
-           
-                    transcript_list = YouTubeTranscriptApi.list_transcripts(self.video_id)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ICON = lambda filename: os.path.join(BASE_DIR, "icons", filename)
+DEFAULT_DATA_DIR = os.path.join(BASE_DIR, "data")
+DATA_DIR = DEFAULT_DATA_DIR
+# Anchored to the app, not the working directory, so launching from elsewhere finds the same library
+OUTPUT_DIR = os.path.join(BASE_DIR, "output")
 
-             
-                    for t in transcript_list:
-                        if t.language_code == 'en' and t.is_generated:
-                            transcript = t.fetch()
-                            break
 
-                    if transcript is None:
-                        for t in transcript_list:
-                            if t.is_translatable:
-                                try:
-                                    transcript = t.translate('en').fetch()
-                                    break
-                                except Exception:
-                                    continue
+def set_data_root(path):
+    # Singletons resolve their files on first use, so this has to run before any of them is created
+    global DATA_DIR
+    DATA_DIR = os.path.abspath(os.path.expanduser(path)) if path else DEFAULT_DATA_DIR
 
-                    if transcript is None:
-                        raise NoTranscriptFound("No suitable transcript found.")
 
-                filename = "transcript/transcript.txt"
-                with open(filename, "w", encoding="utf-8") as f:
-                    for entry in transcript:
-                        text = entry['text'] if isinstance(entry, dict) else entry.text
-                        f.write(f"{text}\n")
+def data_path(*parts):
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
 
-                self.finished.emit(filename)
-                return
 
-            except Exception as e:
-                attempt += 1
+JOB_FILES_MAX_AGE_DAYS = 14
 
-        self.error.emit("Failed to fetch transcript after multiple attempts.")
 
+def job_dir(content):
+    # Content-addressed: concurrent jobs never share a directory and a rerun of the same transcript reuses its own
+    path = os.path.join(DATA_DIR, "jobs", hashlib.sha256(content.encode("utf-8")).hexdigest()[:16])
+    os.makedirs(path, exist_ok=True)
+    return path
 
-class NotesGenerationWorker(QObject):
-    chunk_received = Signal(str)
-    finished = Signal(str)
-    error = Signal(str)
 
-    def __init__(self, transcript, llm_type="local", model="qwen3:4b", api_key=None):
+def prune_job_dirs(keep, max_age_days=JOB_FILES_MAX_AGE_DAYS):
+    # Every generation leaves a bundle and every fetch a transcript; only what a note or an open job points at is kept
+    keep = {os.path.abspath(path) for path in keep if path}
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    try:
+        directories = [entry.path for entry in os.scandir(os.path.join(DATA_DIR, "jobs")) if entry.is_dir()]
+    except OSError:
+        return 0
+    for directory in directories:
+        try:
+            entries = [entry for entry in os.scandir(directory) if entry.is_file()]
+        except OSError:
+            continue
+        transcript = None
+        left = 0
+        for entry in entries:
+            path = os.path.abspath(entry.path)
+            if entry.name == "transcript.txt":
+                transcript = entry
+                continue
+            try:
+                if path not in keep and entry.stat().st_mtime < cutoff:
+                    os.remove(path)
+                    removed += 1
+                    continue
+            except OSError:
+                pass
+            left += 1
+        # The transcript stays as long as anything made from it does
+        if transcript is not None and not left and os.path.abspath(transcript.path) not in keep:
+            try:
+                if transcript.stat().st_mtime < cutoff:
+                    os.remove(transcript.path)
+                    removed += 1
+            except OSError:
+                pass
+        try:
+            # Only succeeds once the directory is empty
+            os.rmdir(directory)
+        except OSError:
+            pass
+    return removed
+
+
+def atomic_temp_path(path):
+    # Unique per writer, so two jobs writing the same file never share a temp file
+    return f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+@contextmanager
+def atomic_write(path, mode="w"):
+    # Readers see the old file or the complete new one, never a truncated one
+    temp_path = atomic_temp_path(path)
+    try:
+        with open(temp_path, mode, encoding=None if "b" in mode else "utf-8") as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+# Free-tier keys are limited to ~20 requests per minute per model
+OPENROUTER_REQUESTS_PER_MINUTE = 20
+OPENROUTER_BURST = 4
+OPENROUTER_MAX_RATE_LIMIT_RETRIES = 5
+
+# Hedged generation: how long both backends stream before their decode rates are compared
+HEDGE_DECISION_WINDOW = 3.0
+HEDGE_RATE_WARMUP = 5.0
+HEDGE_POLL_INTERVAL = 0.05
+
+OLLAMA_PLACEHOLDERS = ("No models found", "Error fetching models", "Ollama not installed")
+OLLAMA_CLIENTS = {}
+OLLAMA_CLIENTS_LOCK = threading.Lock()
+
+
+def ollama_client(host=None):
+    # No host means the library's default client, which honours OLLAMA_HOST
+    if not host:
+        return ollama
+    with OLLAMA_CLIENTS_LOCK:
+        if host not in OLLAMA_CLIENTS:
+            OLLAMA_CLIENTS[host] = ollama.Client(host=host)
+        return OLLAMA_CLIENTS[host]
+
+
+class OllamaConnection(httpx.HTTPTransport):
+    # Transport for one streaming chat. Closing the socket alone does not wake a read blocked on it,
+    # and Ollama sends nothing until prefill is done, so close() shuts the socket down first
+    def __init__(self):
         super().__init__()
-        self.transcript = transcript
-        self.llm_type = llm_type
-        self.model = model
-        self.api_key = api_key
+        self.lock = threading.Lock()
+        self.sockets = []
+        self.closed = False
 
-    def generate_notes(self):
-        try:
-            system_prompt = """
+    def handle_request(self, request):
+        request.extensions["trace"] = self.trace
+        return super().handle_request(request)
+
+    def trace(self, event, info):
+        if event != "connection.connect_tcp.complete":
+            return
+        sock = info["return_value"].get_extra_info("socket")
+        with self.lock:
+            self.sockets.append(sock)
+            closed = self.closed
+        if closed:
+            shutdown_socket(sock)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            sockets = list(self.sockets)
+        for sock in sockets:
+            shutdown_socket(sock)
+        super().close()
+
+
+class OpenRouterStream:
+    # Closing the OpenAI stream alone leaves a read on a quiet connection blocked until the next byte
+    def __init__(self, response):
+        self.response = response
+
+    def __iter__(self):
+        return iter(self.response)
+
+    def close(self):
+        # Once the body is read the connection is back in the shared pool and must be left alone
+        http_response = self.response.response
+        network_stream = http_response.extensions.get("network_stream")
+        if network_stream is not None and not http_response.is_closed:
+            shutdown_socket(network_stream.get_extra_info("socket"))
+        self.response.close()
+
+
+def shutdown_socket(sock):
+    try:
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+
+# Starting point for the router until a backend/model has real measurements on this machine
+ROUTER_PRIORS = {
+    "local": {"latency": 0.5, "prefill_rate": 300.0, "decode_rate": 12.0, "output_ratio": 0.4},
+    "openrouter": {"latency": 1.5, "prefill_rate": 1500.0, "decode_rate": 40.0, "output_ratio": 0.4},
+}
+ROUTER_SMOOTHING = 0.3
+ROUTER_MIN_OUTPUT_TOKENS = 256
+ROUTER_MAX_OUTPUT_TOKENS = 8192
+
+
+NOTES_SYSTEM_PROMPT = """
 You are an expert at transforming YouTube video transcripts into deeply detailed, logically structured, and fully self-contained notes that replicate the depth and value of the original content.
 
 🎯 OBJECTIVE:
@@ -189,57 +344,2958 @@ Before submitting the output, ensure the following:
 - ❌ Misspell or misrepresent any technical terms.
 """
 
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English text
+    return max(1, len(text) // 4)
+
+
+SOUND_TAG = re.compile(r"\[(?:music|applause|laughter|inaudible|silence|noise|cheering)[^\]]*\]", re.IGNORECASE)
+FILLER_WORDS = re.compile(r"\b(?:um+|uh+|erm+|hmm+|ah+)\b[,.]?\s*", re.IGNORECASE)
+REPEATED_WORD = re.compile(r"\b(\w+)(?:\s+\1\b)+", re.IGNORECASE)
+
+
+def compress_transcript(text):
+    # Auto captions repeat fragments and carry filler; dropping them cuts prompt tokens without losing content
+    fragments = []
+    for line in text.splitlines():
+        line = FILLER_WORDS.sub("", SOUND_TAG.sub("", line)).strip()
+        if line and (not fragments or line != fragments[-1]):
+            fragments.append(line)
+    return REPEATED_WORD.sub(r"\1", re.sub(r"\s+", " ", " ".join(fragments))).strip()
+
+
+# 64 bands of 2 rows: pairs from roughly 0.13 Jaccard upwards share a band and get compared, low enough
+# that a clip a third as long as its original (Jaccard about 0.33) is found almost every time
+MINHASH_PERMUTATIONS = 128
+MINHASH_BANDS = 64
+SHINGLE_WORDS = 5
+DUPLICATE_THRESHOLD = 0.8
+# Music videos and the like compress to next to nothing, and nothing matches nothing perfectly
+MIN_DEDUPE_SHINGLES = 20
+MINHASH_MASK = (1 << 64) - 1
+_minhash_rng = random.Random(20240601)
+# Multiply-shift hashing: odd 64-bit multipliers, top 32 bits of the product
+MINHASH_PARAMS = [(_minhash_rng.getrandbits(64) | 1, _minhash_rng.getrandbits(64))
+                  for _ in range(MINHASH_PERMUTATIONS)]
+
+
+def transcript_shingles(text):
+    # Captions of the same talk differ in filler and line breaks, so only the words count
+    words = re.findall(r"\w+", compress_transcript(text).lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash_signature(shingles):
+    # Stable across runs, unlike hash(), because signatures are stored; needs at least one shingle
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=4).digest(), "little")
+              for s in shingles]
+    if np is not None:
+        values = np.array(hashes, dtype=np.uint64)
+        signature = []
+        for a, b in MINHASH_PARAMS:
+            signature.append(int(((values * np.uint64(a) + np.uint64(b)) >> np.uint64(32)).min()))
+        return signature
+    return [min(((a * x + b) & MINHASH_MASK) >> 32 for x in hashes) for a, b in MINHASH_PARAMS]
+
+
+def minhash_bands(signature):
+    rows = len(signature) // MINHASH_BANDS
+    for band in range(MINHASH_BANDS):
+        values = struct.pack(f"<{rows}I", *signature[band * rows:(band + 1) * rows])
+        yield band, int.from_bytes(hashlib.blake2b(values, digest_size=8).digest(), "little", signed=True)
+
+
+LOW_RESOURCE_BROWSER_FLAGS = (
+    "--disable-gpu --disable-gpu-compositing --disable-smooth-scrolling --renderer-process-limit=1 "
+    "--autoplay-policy=user-gesture-required --disable-background-networking"
+)
+LOW_RESOURCE_RENDER_MS = 500
+LOW_RESOURCE_MEMORY_MB = 1500
+LOW_RESOURCE_CHECK_MS = 5000
+LOW_RESOURCE_MODELS = ("qwen3:1.7b", "qwen3:0.6b")
+# Ollama needs a bit more than the weights once the context is allocated
+MODEL_MEMORY_OVERHEAD = 1.2
+MODEL_SIZE = re.compile(r"(\d+(?:\.\d+)?)\s*(KB|MB|GB)\b")
+
+
+def parse_model_size(line):
+    match = MODEL_SIZE.search(line)
+    if not match:
+        return None
+    value, unit = match.groups()
+    return int(float(value) * {"KB": 1e3, "MB": 1e6, "GB": 1e9}[unit])
+
+
+NOTES_BUFFER_BLOCK = 16 * 1024
+
+
+class NotesBuffer:
+    # The only copy of the streamed notes: the worker appends, the view reads what it has not seen yet.
+    # Small chunks are joined into blocks so the buffer stays close to the text's own size.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.waiting = False
+        self.reset()
+
+    def reset(self):
+        self.blocks = []
+        self.starts = []
+        self.tail = []
+        self.tail_length = 0
+        self.length = 0
+
+    def clear(self):
+        with self.lock:
+            self.reset()
+            self.generation += 1
+
+    def append(self, text):
+        # Returns True when the reader has caught up and needs a fresh notification
+        with self.lock:
+            self.tail.append(text)
+            self.tail_length += len(text)
+            self.length += len(text)
+            if self.tail_length >= NOTES_BUFFER_BLOCK:
+                self.starts.append(self.length - self.tail_length)
+                self.blocks.append("".join(self.tail))
+                self.tail = []
+                self.tail_length = 0
+            wake = not self.waiting
+            self.waiting = True
+            return wake
+
+    def __len__(self):
+        return self.length
+
+    def read(self, offset=0, generation=None):
+        # A reader from an older generation gets everything from the start again
+        with self.lock:
+            self.waiting = False
+            if generation is not None and generation != self.generation:
+                offset = 0
+            return self.generation, self.since(offset)
+
+    def peek(self, offset=0, generation=None):
+        # Like read, but for a second reader: the text and the offset it ends at come from one locked state
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                offset = 0
+            return self.generation, self.since(offset), self.length
+
+    def since(self, offset):
+        # Callers hold the lock
+        tail_start = self.length - self.tail_length
+        if offset >= tail_start:
+            return "".join(self.tail)[offset - tail_start:]
+        index = bisect_right(self.starts, offset) - 1
+        return "".join([self.blocks[index][offset - self.starts[index]:], *self.blocks[index + 1:], *self.tail])
+
+    def text(self):
+        with self.lock:
+            return self.since(0)
+
+
+class ThinkFilter:
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        self.in_think = False
+        # Never longer than a tag: only a possible partial tag is held back between chunks
+        self.carry = ""
+
+    def feed(self, text):
+        text = self.carry + text
+        self.carry = ""
+        visible = []
+        pos = 0
+        while True:
+            tag = self.CLOSE_TAG if self.in_think else self.OPEN_TAG
+            index = text.find(tag, pos)
+            if index < 0:
+                keep = self.partial_tag_length(text, tag, pos)
+                end = len(text) - keep
+                if not self.in_think:
+                    visible.append(text[pos:end])
+                self.carry = text[end:]
+                return "".join(visible)
+            if not self.in_think:
+                visible.append(text[pos:index])
+            pos = index + len(tag)
+            self.in_think = not self.in_think
+
+    def flush(self):
+        carry, self.carry = self.carry, ""
+        return "" if self.in_think else carry
+
+    @staticmethod
+    def partial_tag_length(text, tag, start):
+        for length in range(min(len(tag) - 1, len(text) - start), 0, -1):
+            if text.endswith(tag[:length]):
+                return length
+        return 0
+
+
+NOTES_BASE_CSS = """
+    body {
+        color: #000000;
+        font-family: 'Georgia', 'Times New Roman', serif;
+        font-size: 12pt;
+        line-height: 1.6;
+        margin: 0;
+        padding: 0;
+    }
+    h1, h2, h3, h4 {
+        color: #000000;
+        font-weight: bold;
+        margin-top: 1.2em;
+        margin-bottom: 0.5em;
+    }
+    p {
+        margin: 0.75em 0;
+    }
+    ul, ol {
+        margin: 0.75em 0 0.75em 2em;
+        padding-left: 1em;
+    }
+    li {
+        margin-bottom: 0.25em;
+    }
+    blockquote {
+        border-left: 3px solid #888;
+        padding-left: 10px;
+        margin-left: 0;
+        color: #444;
+        font-style: italic;
+    }
+    code {
+        font-family: 'Courier New', monospace;
+        background-color: #f0f0f0;
+        padding: 2px 4px;
+        border-radius: 4px;
+    }
+    pre {
+        font-family: 'Courier New', monospace;
+        background-color: #f0f0f0;
+        padding: 10px;
+        border-radius: 4px;
+        white-space: pre-wrap;
+    }
+    table {
+        width: 100%;
+        border-collapse: collapse;
+        margin: 1em 0;
+    }
+    th, td {
+        border: 1px solid #ccc;
+        padding: 8px;
+        text-align: left;
+    }
+    a {
+        color: #1a0dab;
+        text-decoration: none;
+    }
+    a:hover {
+        text-decoration: underline;
+    }
+"""
+NOTES_PDF_CSS = NOTES_BASE_CSS + """
+    body {
+        color: #000000;
+        font-size: 12pt;
+    }
+    h1, h2, h3, h4 {
+        color: #000000;
+    }
+    blockquote {
+        border-color: #888;
+        color: #444;
+    }
+    code, pre {
+        background-color: #f0f0f0;
+        color: #000000;
+    }
+    a {
+        color: #1a0dab;
+    }
+"""
+NOTES_SCREEN_CSS = NOTES_BASE_CSS + """
+    body {
+        color: #e0e0e0;
+        background-color: #1a1426;
+    }
+    h1, h2, h3, h4 {
+        color: #b388ff;
+    }
+    a {
+        color: #7c4dff;
+    }
+"""
+
+CODE_FENCE = re.compile(r"```[A-Za-z]*")
+PARTIAL_CODE_FENCE = re.compile(r"`{1,3}[A-Za-z]*$")
+HTML_BLOCK_TAG = re.compile(
+    r"<(?:!doctype|html|head|body|h[1-6]|p|div|section|article|ul|ol|table|blockquote|pre)\b", re.IGNORECASE
+)
+HTML_TITLE = re.compile(r"<h1\b[^>]*>(.*?)</h1>", re.IGNORECASE | re.DOTALL)
+HTML_TAG = re.compile(r"<[^>]+>")
+# How much non-HTML text is seen before falling back to Markdown
+NOTES_FORMAT_SAMPLE = 200
+
+
+def detect_notes_format(text, final=False):
+    sample = CODE_FENCE.sub("", text[:2048]).lstrip().lstrip("`")
+    if sample.startswith("<") or HTML_BLOCK_TAG.search(sample):
+        return "html"
+    if final or len(sample) >= NOTES_FORMAT_SAMPLE:
+        return "markdown"
+    return None
+
+
+class NotesHtmlSanitizer(HTMLParser):
+    SKIP_CONTENT = {"script", "style", "head", "title"}
+    DROP_TAGS = {"html", "body", "meta", "link"}
+    VOID_TAGS = {"br", "hr", "img", "col", "wbr", "area", "source", "input"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+        self.pending_text = ""
+        self.open_tags = []
+        self.output_length = 0
+        # Output up to here closes every tag it opens, so it renders the same whatever follows
+        self.settled_length = 0
+
+    def feed_text(self, text):
+        self.feed(text)
+        return self.take()
+
+    def close_text(self):
+        self.close()
+        self.flush_text()
+        return self.take()
+
+    def take(self):
+        output = "".join(self.parts)
+        self.parts.clear()
+        return output
+
+    def emit(self, part):
+        self.parts.append(part)
+        self.output_length += len(part)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_CONTENT:
+            self.skip_depth += 1
+            return
+        if self.skip_depth or tag in self.DROP_TAGS:
+            return
+        self.flush_text()
+        self.emit(self.build_tag(tag, attrs))
+        if tag not in self.VOID_TAGS:
+            self.open_tags.append(tag)
+        elif not self.open_tags:
+            self.settled_length = self.output_length
+
+    def handle_startendtag(self, tag, attrs):
+        if self.skip_depth or tag in self.SKIP_CONTENT or tag in self.DROP_TAGS:
+            return
+        self.flush_text()
+        self.emit(self.build_tag(tag, attrs, closed=True))
+        if not self.open_tags:
+            self.settled_length = self.output_length
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_CONTENT:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth or tag in self.DROP_TAGS:
+            return
+        self.flush_text()
+        self.emit(f"</{tag}>")
+        # Like a browser, a closing tag also closes anything left open inside it (<li> without </li>)
+        if tag in self.open_tags:
+            del self.open_tags[len(self.open_tags) - 1 - self.open_tags[::-1].index(tag):]
+            if not self.open_tags:
+                self.settled_length = self.output_length
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.pending_text += data
+        # Hold back a code fence that may still be cut in half by the stream
+        partial = PARTIAL_CODE_FENCE.search(self.pending_text)
+        if partial:
+            ready, self.pending_text = self.pending_text[:partial.start()], self.pending_text[partial.start():]
+        else:
+            ready, self.pending_text = self.pending_text, ""
+        if ready:
+            self.emit(escape(CODE_FENCE.sub("", ready), quote=False))
+
+    def flush_text(self):
+        if self.pending_text:
+            self.emit(escape(CODE_FENCE.sub("", self.pending_text), quote=False))
+            self.pending_text = ""
+
+    @staticmethod
+    def build_tag(tag, attrs, closed=False):
+        kept = [(name, value) for name, value in attrs if name != "style" and not name.startswith("on")]
+        if tag == "a" and any(name == "href" for name, _ in kept):
+            kept = [(name, value) for name, value in kept if name not in ("target", "rel")]
+            kept += [("target", "_blank"), ("rel", "noopener noreferrer")]
+        attr_text = "".join(
+            f' {name}="{escape(value, quote=True)}"' if value is not None else f" {name}"
+            for name, value in kept
+        )
+        return f"<{tag}{attr_text}{' /' if closed else ''}>"
+
+
+def render_notes_body(text, notes_format=None):
+    sanitizer = NotesHtmlSanitizer()
+    if (notes_format or detect_notes_format(text, final=True)) == "markdown":
+        # Only for models that ignore the HTML instruction in the system prompt
+        text = markdown.markdown(CODE_FENCE.sub("", text))
+    return sanitizer.feed_text(text) + sanitizer.close_text()
+
+
+def split_settled_markdown(text):
+    # Markdown blocks end at a blank line, unless the line is inside a code fence
+    cut = text.rfind("\n\n")
+    while cut >= 0 and text.count("```", 0, cut) % 2:
+        cut = text.rfind("\n\n", 0, cut)
+    return (text[:cut + 2], text[cut + 2:]) if cut >= 0 else ("", text)
+
+
+def append_html(cursor, html):
+    # insertHtml merges the fragment's first block into the one at the cursor, so a heading loses its level;
+    # it gets a block of its own format instead, except lists and tables, which make their own
+    if not html.strip():
+        return
+    fragment = QTextDocument()
+    fragment.setDefaultStyleSheet(cursor.document().defaultStyleSheet())
+    fragment.setHtml(html)
+    first = fragment.begin()
+    starts_table = QTextCursor(first).currentTable() or (
+        not first.text() and first.next().isValid() and QTextCursor(first.next()).currentTable()
+    )
+    cursor.movePosition(QTextCursor.End)
+    if not cursor.document().isEmpty() and not first.textList() and not starts_table:
+        cursor.insertBlock(first.blockFormat(), first.charFormat())
+    cursor.insertFragment(QTextDocumentFragment(fragment))
+
+
+class HtmlTextExtractor(HTMLParser):
+    SKIP_CONTENT = {"script", "style", "head", "title"}
+    BLOCK_TAGS = {"p", "div", "li", "tr", "br", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_CONTENT:
+            self.skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_CONTENT:
+            self.skip_depth = max(0, self.skip_depth - 1)
+
+    def handle_data(self, data):
+        if not self.skip_depth:
+            self.parts.append(data)
+
+
+def html_to_text(html):
+    extractor = HtmlTextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return re.sub(r"\n\s*\n+", "\n", "".join(extractor.parts)).strip()
+
+
+def pdf_to_text(path):
+    if PdfReader is None:
+        return None
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+SECTION_HEADING = re.compile(r"<h[1-3]\b[^>]*>(.*?)</h[1-3]>", re.IGNORECASE | re.DOTALL)
+SECTION_MAX_CHARS = 2000
+
+
+def split_sections(html):
+    matches = list(SECTION_HEADING.finditer(html))
+    if not matches:
+        text = html_to_text(html)
+        return [("", text[:SECTION_MAX_CHARS])] if text else []
+    sections = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(html)
+        text = html_to_text(html[match.end():end])
+        if text:
+            sections.append((html_to_text(match.group(1)), text[:SECTION_MAX_CHARS]))
+    return sections
+
+
+def fts_query(text):
+    # Quote every term so user input can't break FTS5 syntax; the last one matches as a prefix
+    terms = [term.replace('"', '""') for term in text.split()]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms) + "*"
+
+
+def build_notes_document(body, for_pdf=False):
+    css = NOTES_PDF_CSS if for_pdf else NOTES_SCREEN_CSS
+    return (
+        '<!DOCTYPE html><html><head><meta charset="utf-8">'
+        f"<style>{css}</style></head><body>{body}</body></html>"
+    )
+
+
+def extract_title(body, default="notes"):
+    match = HTML_TITLE.search(body)
+    if not match:
+        return default
+    title = unescape(HTML_TAG.sub("", match.group(1))).strip()
+    return title or default
+
+
+def notes_filename(title, ext=".pdf"):
+    heading = re.sub(r'[^\w\-_\. ]', '', title)[:50]
+    return os.path.join(OUTPUT_DIR, f"{heading or 'notes'}{ext}")
+
+
+def write_bundle(path, raw_text, body, metadata):
+    with atomic_write(path, "wb") as f, zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as bundle:
+        bundle.writestr("raw.txt", raw_text)
+        bundle.writestr("notes.html", body)
+        bundle.writestr("meta.json", json.dumps(metadata, indent=2))
+
+
+def read_bundle(path):
+    with zipfile.ZipFile(path) as bundle:
+        raw_text = bundle.read("raw.txt").decode("utf-8")
+        body = bundle.read("notes.html").decode("utf-8")
+        metadata = json.loads(bundle.read("meta.json"))
+    return raw_text, body, metadata
+
+
+def read_note_html(path):
+    # Notes exported before bundles existed kept a plain HTML copy instead
+    if zipfile.is_zipfile(path):
+        return read_bundle(path)[1]
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+VOID_TAGS = {"area", "br", "col", "hr", "img", "input", "source", "wbr"}
+NAV_HEADINGS = {"h1", "h2"}
+
+
+class XhtmlWriter(HTMLParser):
+    # EPUB readers want XML: every element closed, void tags self-closed, only XML entities
+    def __init__(self, out):
+        super().__init__(convert_charrefs=True)
+        self.out = out
+        self.stack = []
+        self.headings = []
+        self.heading = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            self.handle_startendtag(tag, attrs)
+            return
+        if tag in NAV_HEADINGS and self.heading is None:
+            anchor = f"section-{len(self.headings) + 1}"
+            attrs = [(name, value) for name, value in attrs if name != "id"] + [("id", anchor)]
+            self.heading = [tag, anchor, ""]
+            self.headings.append(self.heading)
+        self.out.write(self.build_tag(tag, attrs, ">"))
+        self.stack.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.out.write(self.build_tag(tag, attrs, " />"))
+
+    def handle_endtag(self, tag):
+        if tag not in self.stack:
+            return
+        while self.stack:
+            open_tag = self.stack.pop()
+            self.out.write(f"</{open_tag}>")
+            if open_tag == tag:
+                break
+        if tag in NAV_HEADINGS:
+            self.heading = None
+
+    def handle_data(self, data):
+        self.out.write(escape(data, quote=False))
+        if self.heading is not None:
+            self.heading[2] += data
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self.out.write(f"</{self.stack.pop()}>")
+
+    @staticmethod
+    def build_tag(tag, attrs, end):
+        attr_text = "".join(f' {name}="{escape(value if value is not None else name, quote=True)}"'
+                            for name, value in attrs)
+        return f"<{tag}{attr_text}{end}"
+
+
+class MarkdownWriter(HTMLParser):
+    SKIP_CONTENT = {"script", "style", "head", "title"}
+    BLOCKS = {"p", "div", "section", "article", "header", "footer"}
+    HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+    INLINE = {"strong": "**", "b": "**", "em": "*", "i": "*"}
+
+    def __init__(self, out):
+        super().__init__(convert_charrefs=True)
+        self.out = out
+        self.newlines = 2
+        self.skip_depth = 0
+        self.quote_depth = 0
+        self.in_pre = False
+        self.lists = []
+        self.links = []
+        self.row_cells = 0
+        self.header_done = False
+
+    def write(self, text):
+        for number, line in enumerate(text.split("\n")):
+            if number:
+                self.out.write("\n")
+                self.newlines += 1
+            if line:
+                if self.newlines and self.quote_depth:
+                    self.out.write("> " * self.quote_depth)
+                self.out.write(line)
+                self.newlines = 0
+
+    def block(self, count=2):
+        if self.newlines < count:
+            self.write("\n" * (count - self.newlines))
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_CONTENT:
+            self.skip_depth += 1
+        if self.skip_depth:
+            return
+        if tag in self.HEADINGS:
+            self.block()
+            self.write("#" * self.HEADINGS[tag] + " ")
+        elif tag in self.BLOCKS:
+            if not self.lists:
+                self.block()
+        elif tag in self.INLINE:
+            self.write(self.INLINE[tag])
+        elif tag == "code" and not self.in_pre:
+            self.write("`")
+        elif tag == "pre":
+            self.block()
+            self.write("```\n")
+            self.in_pre = True
+        elif tag in ("ul", "ol"):
+            self.block(1 if self.lists else 2)
+            self.lists.append([tag, 0])
+        elif tag == "li" and self.lists:
+            self.block(1)
+            current = self.lists[-1]
+            current[1] += 1
+            marker = f"{current[1]}. " if current[0] == "ol" else "- "
+            self.write("  " * (len(self.lists) - 1) + marker)
+        elif tag == "blockquote":
+            self.block()
+            self.quote_depth += 1
+        elif tag == "a":
+            self.links.append(dict(attrs).get("href"))
+            self.write("[")
+        elif tag == "br":
+            self.write("  \n")
+        elif tag == "hr":
+            self.block()
+            self.write("---")
+            self.block()
+        elif tag == "table":
+            self.block()
+            self.header_done = False
+        elif tag == "tr":
+            self.block(1)
+            self.write("|")
+            self.row_cells = 0
+        elif tag in ("td", "th"):
+            self.write(" ")
+            self.row_cells += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_TAGS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_CONTENT:
+            self.skip_depth = max(0, self.skip_depth - 1)
+            return
+        if self.skip_depth:
+            return
+        if tag in self.HEADINGS or (tag in self.BLOCKS and not self.lists):
+            self.block()
+        elif tag in self.INLINE:
+            self.write(self.INLINE[tag])
+        elif tag == "code" and not self.in_pre:
+            self.write("`")
+        elif tag == "pre" and self.in_pre:
+            self.block(1)
+            self.write("```")
+            self.block()
+            self.in_pre = False
+        elif tag in ("ul", "ol") and self.lists:
+            self.lists.pop()
+            self.block(1 if self.lists else 2)
+        elif tag == "blockquote" and self.quote_depth:
+            self.block()
+            self.quote_depth -= 1
+        elif tag == "a" and self.links:
+            href = self.links.pop()
+            self.write(f"]({href})" if href else "]")
+        elif tag in ("td", "th"):
+            self.write(" |")
+        elif tag == "tr" and not self.header_done:
+            self.block(1)
+            self.write("|" + " --- |" * self.row_cells)
+            self.header_done = True
+        elif tag == "table":
+            self.block()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.in_pre:
+            self.write(data)
+            return
+        text = re.sub(r"\s+", " ", data)
+        if self.newlines:
+            text = text.lstrip()
+        self.write(text)
+
+    def close(self):
+        super().close()
+        if self.newlines == 0:
+            self.out.write("\n")
+
+
+EPUB_CONTAINER = """<?xml version="1.0" encoding="UTF-8"?>
+<container version="1.0" xmlns="urn:oasis:names:tc:opendocument:xmlns:container">
+  <rootfiles>
+    <rootfile full-path="OEBPS/content.opf" media-type="application/oebps-package+xml"/>
+  </rootfiles>
+</container>
+"""
+
+
+def export_html(body, title, filename):
+    with atomic_write(filename) as out:
+        out.write(f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>{escape(title)}</title>')
+        out.write(f"<style>{NOTES_PDF_CSS}</style></head><body>")
+        out.write(body)
+        out.write("</body></html>\n")
+
+
+def export_markdown(body, title, filename):
+    with atomic_write(filename) as out:
+        writer = MarkdownWriter(out)
+        writer.feed(body)
+        writer.close()
+
+
+def export_epub(body, title, filename):
+    with atomic_write(filename, "wb") as f, zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as epub:
+        # The mimetype entry has to come first and stay uncompressed
+        epub.writestr(zipfile.ZipInfo("mimetype"), "application/epub+zip")
+        epub.writestr("META-INF/container.xml", EPUB_CONTAINER)
+        epub.writestr("OEBPS/style.css", NOTES_BASE_CSS)
+        with io.TextIOWrapper(epub.open("OEBPS/notes.xhtml", "w"), encoding="utf-8") as out:
+            out.write(
+                '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE html>\n'
+                '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+                f'<head><meta charset="utf-8" /><title>{escape(title)}</title>'
+                '<link rel="stylesheet" type="text/css" href="style.css" /></head><body>'
+            )
+            writer = XhtmlWriter(out)
+            writer.feed(body)
+            writer.close()
+            out.write("</body></html>\n")
+        entries = "".join(
+            f'<li><a href="notes.xhtml#{anchor}">{escape(text.strip()) or anchor}</a></li>'
+            for _, anchor, text in writer.headings
+        ) or f'<li><a href="notes.xhtml">{escape(title)}</a></li>'
+        epub.writestr("OEBPS/nav.xhtml", (
+            '<?xml version="1.0" encoding="UTF-8"?>\n<!DOCTYPE html>\n'
+            '<html xmlns="http://www.w3.org/1999/xhtml" xmlns:epub="http://www.idpf.org/2007/ops">'
+            f'<head><meta charset="utf-8" /><title>{escape(title)}</title></head><body>'
+            f'<nav epub:type="toc" id="toc"><h1>Contents</h1><ol>{entries}</ol></nav></body></html>\n'
+        ))
+        epub.writestr("OEBPS/content.opf", (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<package xmlns="http://www.idpf.org/2007/opf" version="3.0" unique-identifier="book-id">'
+            '<metadata xmlns:dc="http://purl.org/dc/elements/1.1/">'
+            f'<dc:identifier id="book-id">{uuid.uuid4().urn}</dc:identifier>'
+            f"<dc:title>{escape(title)}</dc:title><dc:language>en</dc:language>"
+            f'<meta property="dcterms:modified">{datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")}</meta>'
+            "</metadata><manifest>"
+            '<item id="nav" href="nav.xhtml" media-type="application/xhtml+xml" properties="nav"/>'
+            '<item id="notes" href="notes.xhtml" media-type="application/xhtml+xml"/>'
+            '<item id="css" href="style.css" media-type="text/css"/>'
+            '</manifest><spine><itemref idref="notes"/></spine></package>\n'
+        ))
+
+
+# PDF goes through the Chromium export queue; the rest are written in-process
+EXPORT_FORMATS = {"PDF": ".pdf", "HTML": ".html", "Markdown": ".md", "EPUB": ".epub"}
+NOTES_EXPORTERS = {"HTML": export_html, "Markdown": export_markdown, "EPUB": export_epub}
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        # Takes a token and returns how long the caller has to wait before using it
+        with self.lock:
+            self._refill()
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+    def penalize(self, delay):
+        # Pushes the next reservation at least `delay` seconds into the future
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, 1 - delay * self.rate)
+
+
+class OpenRouterClient:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self, base_url=OPENROUTER_BASE_URL):
+        self.base_url = base_url or OPENROUTER_BASE_URL
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=8, max_keepalive_connections=4, keepalive_expiry=120),
+            timeout=httpx.Timeout(600, connect=15),
+        )
+        self.clients = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+        self.request_times = deque()
+        self.requests = 0
+        self.rejections = 0
+        self.wait_time = 0.0
+
+    def client_for(self, api_key):
+        with self.lock:
+            client = self.clients.get(api_key)
+            if client is None:
+                # Retries are handled here so they go through the limiter
+                client = OpenAI(
+                    base_url=self.base_url,
+                    api_key=api_key,
+                    http_client=self.http_client,
+                    max_retries=0,
+                )
+                self.clients[api_key] = client
+            return client
+
+    def set_base_url(self, base_url):
+        base_url = base_url or OPENROUTER_BASE_URL
+        with self.lock:
+            if base_url != self.base_url:
+                # Clients are bound to their base URL, so they are rebuilt on next use
+                self.base_url = base_url
+                self.clients = {}
+
+    def bucket_for(self, api_key, model):
+        with self.lock:
+            bucket = self.buckets.get((api_key, model))
+            if bucket is None:
+                bucket = TokenBucket(OPENROUTER_REQUESTS_PER_MINUTE / 60.0, OPENROUTER_BURST)
+                self.buckets[(api_key, model)] = bucket
+            return bucket
+
+    def stream_chat(self, api_key, model, messages, on_wait=None, cancelled=None, on_send=None):
+        client = self.client_for(api_key)
+        bucket = self.bucket_for(api_key, model)
+        attempt = 0
+        while True:
+            delay = bucket.reserve()
+            if delay > 0:
+                if on_wait:
+                    on_wait(delay)
+                if cancelled is None:
+                    time.sleep(delay)
+                elif cancelled.wait(delay):
+                    # A job cancelled while queued here gives up instead of sending the request later
+                    raise InterruptedError("Request cancelled")
+                with self.lock:
+                    self.wait_time += delay
+            with self.lock:
+                now = time.monotonic()
+                self.requests += 1
+                self.request_times.append(now)
+            if on_send:
+                on_send(now)
+            try:
+                return client.chat.completions.create(model=model, messages=messages, stream=True)
+            except RateLimitError as e:
+                attempt += 1
+                with self.lock:
+                    self.rejections += 1
+                if attempt > OPENROUTER_MAX_RATE_LIMIT_RETRIES:
+                    raise
+                bucket.penalize(self.retry_after(e, attempt))
+
+    @staticmethod
+    def retry_after(error, attempt):
+        headers = error.response.headers if error.response is not None else {}
+        value = headers.get("retry-after")
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    when = parsedate_to_datetime(value)
+                    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+                except (TypeError, ValueError):
+                    pass
+        reset = headers.get("x-ratelimit-reset")
+        if reset:
+            try:
+                # OpenRouter reports the reset time as epoch milliseconds
+                return max(0.0, float(reset) / 1000.0 - time.time())
+            except ValueError:
+                pass
+        return min(2 ** attempt, 60)
+
+    def stats(self):
+        with self.lock:
+            now = time.monotonic()
+            while self.request_times and now - self.request_times[0] > 60:
+                self.request_times.popleft()
+            return {
+                "requests": self.requests,
+                "requests_last_minute": len(self.request_times),
+                "rejections": self.rejections,
+                "wait_time": self.wait_time,
+            }
+
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+TRACE_RECENT_JOBS = 20
+
+
+class NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NULL_SPAN = NullSpan()
+
+
+class Span:
+    def __init__(self, tracer, job, name, attrs):
+        self.tracer = tracer
+        self.job = job
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc is not None:
+            self.attrs["error"] = str(exc)
+        self.tracer.record(self.job, self.name, self.start, time.time(), **self.attrs)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class Tracer:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(data_path("traces", "trace.jsonl"))
+            return cls._instance
+
+    def __init__(self, path):
+        self.path = path
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.file = None
+        self.jobs = {}
+
+    def set_enabled(self, enabled):
+        with self.lock:
+            self.enabled = enabled
+            if not enabled and self.file is not None:
+                self.file.close()
+                self.file = None
+
+    def new_job(self, label):
+        if not self.enabled:
+            return None
+        job = f"{label}-{uuid.uuid4().hex[:8]}"
+        with self.lock:
+            self.jobs[job] = {"label": label, "started": time.time(), "spans": []}
+            while len(self.jobs) > TRACE_RECENT_JOBS:
+                del self.jobs[next(iter(self.jobs))]
+        return job
+
+    def span(self, job, name, **attrs):
+        # Disabled tracing costs one check and hands back a shared do-nothing span
+        if job is None or not self.enabled:
+            return NULL_SPAN
+        return Span(self, job, name, attrs)
+
+    def record(self, job, name, start, end, **attrs):
+        if job is None or not self.enabled:
+            return
+        entry = {"job": job, "name": name, "start": round(start, 4), "duration": round(end - start, 4)}
+        if attrs:
+            entry["attrs"] = attrs
+        with self.lock:
+            if job in self.jobs:
+                self.jobs[job]["spans"].append(entry)
+            try:
+                self.write(json.dumps(entry) + "\n")
+            except OSError:
+                pass
+
+    def record_monotonic(self, job, name, start, end, **attrs):
+        # Backend streams time themselves with time.monotonic()
+        offset = time.time() - time.monotonic()
+        self.record(job, name, start + offset, end + offset, **attrs)
+
+    def write(self, line):
+        if self.file is not None and self.file.tell() + len(line) > TRACE_MAX_BYTES:
+            self.file.close()
+            self.file = None
+            for index in range(TRACE_BACKUPS - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{index}"):
+                    os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        if self.file is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(line)
+        self.file.flush()
+
+    def recent_jobs(self):
+        with self.lock:
+            return [dict(job, id=job_id, spans=list(job["spans"])) for job_id, job in reversed(self.jobs.items())]
+
+
+JOB_RESOURCE_KINDS = ("workers", "threads", "streams", "views")
+JOB_SHUTDOWN_MS = 3000
+
+
+class JobRegistry:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.jobs = {}
+
+    def new_job(self, label):
+        # Unique across runs, so the same id can key the job journal
+        return f"{label}-{uuid.uuid4().hex[:8]}"
+
+    def add(self, job, kind, obj):
+        if job is None:
+            return
+        with self.lock:
+            self.jobs.setdefault(job, {name: {} for name in JOB_RESOURCE_KINDS})[kind][id(obj)] = obj
+
+    def discard(self, job, kind, obj_or_key):
+        if job is None:
+            return
+        key = obj_or_key if isinstance(obj_or_key, int) else id(obj_or_key)
+        with self.lock:
+            resources = self.jobs.get(job)
+            if resources is None:
+                return
+            resources[kind].pop(key, None)
+            if not any(resources.values()):
+                del self.jobs[job]
+
+    def track_thread(self, job, thread, worker=None):
+        # Held here until Qt has destroyed them, so a thread that outlives its view is never collected mid-run
+        thread.finished.connect(thread.deleteLater)
+        self.add(job, "threads", thread)
+        thread_key = id(thread)
+        thread.destroyed.connect(lambda: self.discard(job, "threads", thread_key))
+        if worker is not None:
+            thread.finished.connect(worker.deleteLater)
+            self.add(job, "workers", worker)
+            worker_key = id(worker)
+            worker.destroyed.connect(lambda: self.discard(job, "workers", worker_key))
+
+    def track_view(self, job, view):
+        self.add(job, "views", view)
+        view_key = id(view)
+        view.destroyed.connect(lambda: self.discard(job, "views", view_key))
+
+    def resources(self, job, kind):
+        with self.lock:
+            return list(self.jobs.get(job, {}).get(kind, {}).values())
+
+    def cancel(self, job):
+        if job is None:
+            return
+        for worker in self.resources(job, "workers"):
+            worker.cancel()
+        for stream in self.resources(job, "streams"):
+            # A generator cannot be closed while the worker thread is inside it; those stop at the next chunk
+            if not isinstance(stream, types.GeneratorType):
+                try:
+                    stream.close()
+                except Exception:
+                    pass
+        for thread in self.resources(job, "threads"):
+            if isinstance(thread, QThread):
+                thread.quit()
+            else:
+                thread.cancel()
+
+    def shutdown(self, job=None, timeout_ms=JOB_SHUTDOWN_MS):
+        with self.lock:
+            jobs = [job] if job is not None else list(self.jobs)
+        for name in jobs:
+            self.cancel(name)
+        deadline = time.monotonic() + timeout_ms / 1000
+        running = 0
+        for name in jobs:
+            for thread in self.resources(name, "threads"):
+                remaining = max(0.0, deadline - time.monotonic())
+                if isinstance(thread, QThread):
+                    stopped = thread.wait(int(remaining * 1000))
+                else:
+                    thread.join(remaining)
+                    stopped = not thread.is_alive()
+                running += not stopped
+        return running
+
+    def counts(self, job=None):
+        with self.lock:
+            if job is None:
+                jobs = list(self.jobs.values())
+            else:
+                jobs = [self.jobs[job]] if job in self.jobs else []
+            counts = {kind: sum(len(resources[kind]) for resources in jobs) for kind in JOB_RESOURCE_KINDS}
+        counts["jobs"] = len(jobs)
+        return counts
+
+
+# Stages a job can be picked up again from; anything else is settled apart from queued exports
+JOURNAL_RESUMABLE_STAGES = ("started", "transcript", "generating")
+JOURNAL_PARTIAL_SECONDS = 5
+# Once a job reaches one of these its partial notes file is of no more use
+JOURNAL_DONE_STAGES = ("generated", "closed", "failed", "discarded")
+
+
+class JobJournal:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(data_path("journal.jsonl"))
+            return cls._instance
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = None
+        self.partials = {}
+
+    def record(self, job, stage, **artifacts):
+        if job is None:
+            return
+        if stage == "partial":
+            self.partials[job] = artifacts["partial_path"]
+        elif stage in JOURNAL_DONE_STAGES:
+            self.remove_partial(job)
+        line = json.dumps(dict(job=job, stage=stage, time=round(time.time(), 3), **artifacts)) + "\n"
+        with self.lock:
+            try:
+                if self.file is None:
+                    self.file = open(self.path, "a", encoding="utf-8")
+                self.file.write(line)
+                self.file.flush()
+                # A transition only counts once it would survive a crash straight after it
+                os.fsync(self.file.fileno())
+            except OSError:
+                pass
+
+    def entries(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return []
+        entries = []
+        for line in lines:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # A crash mid-append leaves at most one torn line
+                continue
+        return entries
+
+    def replay(self):
+        jobs = {}
+        for entry in self.entries():
+            state = jobs.setdefault(entry["job"], {"job": entry["job"], "stage": None, "exports": {}})
+            stage = entry["stage"]
+            if stage == "export_queued":
+                state["exports"][entry["filename"]] = entry.get("bundle_path")
+            elif stage in ("exported", "export_failed"):
+                state["exports"].pop(entry["filename"], None)
+            else:
+                if stage == "discarded":
+                    state["exports"] = {}
+                if stage != "partial":
+                    state["stage"] = stage
+                state.update((key, value) for key, value in entry.items() if key not in ("job", "stage"))
+            state["time"] = entry["time"]
+        return jobs
+
+    def remove_partial(self, job):
+        path = self.partials.pop(job, None)
+        if path:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def unfinished(self):
+        jobs = [state for state in self.replay().values()
+                if state["exports"] or state["stage"] in JOURNAL_RESUMABLE_STAGES]
+        # Jobs from the last run still own their partial files until they are resumed or let go
+        self.partials.update((state["job"], state["partial_path"]) for state in jobs if state.get("partial_path"))
+        return sorted(jobs, key=lambda state: state["time"], reverse=True)
+
+    def partial_text(self, state):
+        # Text written after the last journaled offset never made it into the journal, so it is left out
+        try:
+            with open(state["partial_path"], "r", encoding="utf-8") as f:
+                return f.read()[:state["offset"]]
+        except (KeyError, OSError):
+            return ""
+
+    def compact(self, keep):
+        # The journal is append-only while running; startup rewrites it with just the jobs still open
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            entries = [entry for entry in self.entries() if entry["job"] in keep]
+            try:
+                with atomic_write(self.path) as f:
+                    f.writelines(json.dumps(entry) + "\n" for entry in entries)
+            except OSError:
+                pass
+
+
+class TranscriptWorker(QObject):
+    finished = Signal(str)
+    similar_found = Signal(str, list)
+    error = Signal(str)
+
+    def __init__(self, video_id, trace_job=None, index_path=None):
+        super().__init__()
+        self.video_id = video_id
+        self.trace_job = trace_job
+        self.index_path = index_path
+        self.max_retries = 10
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def fetch_transcript(self):
+        tracer = Tracer.instance()
+        attempt = 0
+        while attempt < self.max_retries:
+            if self.cancelled.is_set():
+                return
+            attempt_started = time.time()
+            try:
+                transcript = None
+
+               
+                try:
+                    transcript = YouTubeTranscriptApi.get_transcript(self.video_id, languages=['en'])
+                except NoTranscriptFound:
+           
+                    transcript_list = YouTubeTranscriptApi.list_transcripts(self.video_id)
+
+             
+                    for t in transcript_list:
+                        if t.language_code == 'en' and t.is_generated:
+                            transcript = t.fetch()
+                            break
+
+                    if transcript is None:
+                        for t in transcript_list:
+                            if t.is_translatable:
+                                try:
+                                    transcript = t.translate('en').fetch()
+                                    break
+                                except Exception:
+                                    continue
+
+                    if transcript is None:
+                        raise NoTranscriptFound("No suitable transcript found.")
+
+                text = "".join(
+                    f"{entry['text'] if isinstance(entry, dict) else entry.text}\n" for entry in transcript
+                )
+                filename = os.path.join(job_dir(f"{self.video_id}\n{text}"), "transcript.txt")
+                with atomic_write(filename) as f:
+                    f.write(text)
+
+                tracer.record(self.trace_job, "transcript.fetch", attempt_started, time.time(),
+                              attempt=attempt + 1, entries=len(transcript))
+                matches = self.find_similar(filename, text)
+                if self.cancelled.is_set():
+                    return
+                if matches:
+                    self.similar_found.emit(filename, matches)
+                else:
+                    self.finished.emit(filename)
+                return
+
+            except Exception as e:
+                tracer.record(self.trace_job, "transcript.fetch", attempt_started, time.time(),
+                              attempt=attempt + 1, error=str(e))
+                attempt += 1
+
+        if not self.cancelled.is_set():
+            self.error.emit("Failed to fetch transcript after multiple attempts.")
+
+    def find_similar(self, filename, text):
+        if self.index_path is None:
+            return []
+        try:
+            with Tracer.instance().span(self.trace_job, "transcript.dedupe") as span:
+                shingles = transcript_shingles(text)
+                if len(shingles) < MIN_DEDUPE_SHINGLES:
+                    span.set(shingles=len(shingles), matches=0)
+                    return []
+                signature = minhash_signature(shingles)
+                # Its own connection, since this runs on the worker thread
+                index = TranscriptIndex(self.index_path)
+                try:
+                    matches = index.similar(len(shingles), signature)
+                    index.add(os.path.basename(os.path.dirname(filename)), self.video_id, filename,
+                              len(shingles), signature)
+                finally:
+                    index.conn.close()
+                span.set(shingles=len(shingles), matches=len(matches))
+            return matches
+        except sqlite3.Error:
+            # Duplicate detection only saves work; a broken index must not stop the job
+            return []
+
+
+class BackendRouter:
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls(data_path("router_state.json"), data_path("routing_log.jsonl"))
+            return cls._instance
+
+    def __init__(self, state_path, log_path):
+        self.state_path = state_path
+        self.log_path = log_path
+        self.lock = threading.Lock()
+        self.profiles = {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                self.profiles = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    def profile(self, llm_type, model):
+        profile = self.profiles.get(f"{llm_type}|{model}")
+        if profile is None:
+            profile = dict(ROUTER_PRIORS[llm_type], runs=0)
+        return profile
+
+    def predict(self, llm_type, model, prompt_tokens):
+        profile = self.profile(llm_type, model)
+        output_tokens = min(max(profile["output_ratio"] * prompt_tokens, ROUTER_MIN_OUTPUT_TOKENS),
+                            ROUTER_MAX_OUTPUT_TOKENS)
+        return (profile["latency"]
+                + prompt_tokens / profile["prefill_rate"]
+                + output_tokens / profile["decode_rate"])
+
+    def choose(self, candidates, prompt_tokens):
+        with self.lock:
+            predictions = [
+                {"llm_type": llm_type, "model": model,
+                 "predicted_seconds": self.predict(llm_type, model, prompt_tokens)}
+                for llm_type, model in candidates
+            ]
+            # Measure every candidate once before trusting the priors
+            unmeasured = [p for p in predictions if self.profile(p["llm_type"], p["model"])["runs"] == 0]
+        if unmeasured:
+            best, reason = unmeasured[0], "exploring"
+        else:
+            best, reason = min(predictions, key=lambda p: p["predicted_seconds"]), "fastest predicted"
+        return dict(best, prompt_tokens=prompt_tokens, candidates=predictions, reason=reason)
+
+    def record(self, metrics):
+        with self.lock:
+            key = f"{metrics['llm_type']}|{metrics['model']}"
+            profile = dict(self.profile(metrics["llm_type"], metrics["model"]))
+            # Average the first few runs, then settle into an exponential moving average
+            alpha = max(ROUTER_SMOOTHING, 1.0 / (profile["runs"] + 1))
+
+            def blend(name, observed):
+                profile[name] = (1 - alpha) * profile[name] + alpha * observed
+
+            # Measured when the backend reports it; otherwise this run's latency is taken to be the usual one
+            latency = metrics.get("latency_seconds")
+            if latency is not None:
+                blend("latency", latency)
+            else:
+                latency = profile["latency"]
+            prefill_seconds = metrics["first_token_seconds"] - latency
+            blend("prefill_rate", metrics["prompt_tokens"] / max(prefill_seconds, 0.05))
+            if metrics["output_tokens"] >= 16 and metrics["decode_seconds"] >= 0.5:
+                blend("decode_rate", metrics["output_tokens"] / metrics["decode_seconds"])
+            blend("output_ratio", metrics["output_tokens"] / metrics["prompt_tokens"])
+            profile["runs"] += 1
+            self.profiles[key] = profile
+            try:
+                with atomic_write(self.state_path) as f:
+                    json.dump(self.profiles, f, indent=2)
+            except OSError:
+                pass
+
+    def complete(self, decision, metrics):
+        predicted = decision["predicted_seconds"]
+        for candidate in decision["candidates"]:
+            # A hedged run may have finished on a backend other than the one routed to
+            if candidate["llm_type"] == metrics["llm_type"] and candidate["model"] == metrics["model"]:
+                predicted = candidate["predicted_seconds"]
+        self.record(metrics)
+        entry = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "video_id": decision.get("video_id"),
+            "prompt_tokens": decision["prompt_tokens"],
+            "routed_to": {"llm_type": decision["llm_type"], "model": decision["model"]},
+            "reason": decision["reason"],
+            "ran_on": {"llm_type": metrics["llm_type"], "model": metrics["model"]},
+            "candidates": decision["candidates"],
+            "predicted_seconds": round(predicted, 2),
+            "actual_seconds": round(metrics["total_seconds"], 2),
+            "error_seconds": round(metrics["total_seconds"] - predicted, 2),
+        }
+        with self.lock:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+            except OSError:
+                pass
+        return entry
+
+
+class NotesGenerationWorker(QObject):
+    chunk_received = Signal(str)
+    output_ready = Signal()
+    thinking = Signal(bool)
+    reset = Signal()
+    rate_limited = Signal(float)
+    hedge_decided = Signal(str, str)
+    metrics = Signal(dict)
+    finished = Signal(str)
+    error = Signal(str)
+
+    def __init__(self, transcript, llm_type="local", model="qwen3:4b", api_key=None, hedge=None,
+                 ollama_options=None, trace_job=None, ollama_host=None, notes_buffer=None, job=None):
+        super().__init__()
+        self.job = job
+        self.cancelled = threading.Event()
+        self.notes_buffer = notes_buffer
+        self.trace_job = trace_job
+        self.ollama_host = ollama_host
+        self.transcript = transcript
+        self.llm_type = llm_type
+        self.model = model
+        self.api_key = api_key
+        self.hedge = hedge
+        self.ollama_options = ollama_options
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def generate_notes(self):
+        try:
             messages = [
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": NOTES_SYSTEM_PROMPT},
                 {"role": "user", "content": f"Here is the transcript:\n\n{self.transcript}"}
             ]
 
-            if self.llm_type == "local":
-                # Use Ollama locally
-                response = ollama.chat(model=self.model, messages=messages, stream=True)
-                full_text = ""
+            if self.hedge:
+                self.generate_hedged(messages)
+            else:
+                started = time.monotonic()
+                first_token_at = None
+                think_filter = ThinkFilter()
+                output_chars = 0
+                timing = {}
+                stream = self.stream_backend(self.llm_type, self.model, self.api_key, messages, timing=timing)
+                try:
+                    for content in stream:
+                        if self.cancelled.is_set():
+                            return
+                        if first_token_at is None:
+                            first_token_at = time.monotonic()
+                        output_chars += len(content)
+                        self.emit_content(think_filter, content)
+                finally:
+                    stream.close()
+                self.finish_content(think_filter)
+                self.emit_metrics(self.llm_type, self.model, messages, started, first_token_at, output_chars, timing)
+            if not self.cancelled.is_set():
+                self.finished.emit("")
+
+        except Exception as e:
+            # A cancelled job's view is gone or going; closing its stream is not an error worth showing
+            if not self.cancelled.is_set():
+                self.error.emit(str(e))
+
+    def emit_content(self, think_filter, content):
+        was_thinking = think_filter.in_think
+        visible = think_filter.feed(content)
+        if think_filter.in_think != was_thinking:
+            self.thinking.emit(think_filter.in_think)
+        if visible:
+            self.emit_visible(visible)
+
+    def finish_content(self, think_filter):
+        visible = think_filter.flush()
+        if think_filter.in_think:
+            self.thinking.emit(False)
+        if visible:
+            self.emit_visible(visible)
+
+    def emit_visible(self, text):
+        if self.notes_buffer is None:
+            self.chunk_received.emit(text)
+        elif self.notes_buffer.append(text):
+            # The text stays in the shared buffer; a busy view gets one wake-up, not one per chunk
+            self.output_ready.emit()
+
+    def emit_metrics(self, llm_type, model, messages, started, first_token_at, output_chars, timing):
+        finished = time.monotonic()
+        first_token_at = first_token_at or finished
+        # Waiting in the rate limiter is not the backend's doing, so its clock starts when the request goes out
+        sent = timing.get("sent", started)
+        metrics = {
+            "llm_type": llm_type,
+            "model": model,
+            "prompt_tokens": sum(estimate_tokens(m["content"]) for m in messages),
+            "output_tokens": max(1, output_chars // 4),
+            "queued_seconds": sent - started,
+            "latency_seconds": timing.get("latency"),
+            "first_token_seconds": first_token_at - sent,
+            "decode_seconds": finished - first_token_at,
+            "total_seconds": finished - started,
+        }
+        tracer = Tracer.instance()
+        if sent > started:
+            tracer.record_monotonic(self.trace_job, "llm.queued", started, sent, backend=llm_type, model=model)
+        # Time to first token covers the request and prompt prefill
+        tracer.record_monotonic(self.trace_job, "llm.prefill", sent, first_token_at,
+                                backend=llm_type, model=model, prompt_tokens=metrics["prompt_tokens"])
+        tracer.record_monotonic(self.trace_job, "llm.decode", first_token_at, finished,
+                                backend=llm_type, model=model, output_tokens=metrics["output_tokens"],
+                                tokens_per_second=round(metrics["output_tokens"] / max(metrics["decode_seconds"], 1e-3), 1))
+        self.metrics.emit(metrics)
+
+    def stream_backend(self, llm_type, model, api_key, messages, timing=None, on_stream=None):
+        # timing gets when the request went out and, if the backend says, its fixed latency;
+        # on_stream gets whatever closes this request, for a hedge that has to cut only its loser
+        timing = {} if timing is None else timing
+        registry = JobRegistry.instance()
+        if llm_type == "local":
+            # Use Ollama locally, on a connection of its own so cancelling the job can cut it mid-prefill
+            connection = OllamaConnection()
+            registry.add(self.job, "streams", connection)
+            if on_stream is not None:
+                on_stream(connection)
+            timing["sent"] = time.monotonic()
+            response = ollama.Client(host=self.ollama_host, transport=connection).chat(
+                model=model, messages=messages, stream=True, options=self.ollama_options
+            )
+            try:
                 for chunk in response:
                     content = chunk.get('message', {}).get('content', '')
                     if content:
-                        full_text += content
-                        self.chunk_received.emit(content)
-                self.finished.emit("")
+                        yield content
+                    if chunk.get('done') and chunk.get('load_duration') is not None:
+                        # Reported in nanoseconds with the last chunk
+                        timing["latency"] = chunk.get('load_duration') / 1e9
+            finally:
+                registry.discard(self.job, "streams", connection)
+                response.close()
+                connection.close()
+        else:
+            # Use OpenRouter through the shared, rate limited client
+            response = OpenRouterStream(OpenRouterClient.instance().stream_chat(
+                api_key,
+                model,
+                messages,
+                on_wait=self.rate_limited.emit,
+                cancelled=self.cancelled,
+                on_send=lambda sent: timing.update(sent=sent),
+            ))
+            # The stream is returned once the response headers are in, before any token
+            timing["latency"] = time.monotonic() - timing["sent"]
+            registry.add(self.job, "streams", response)
+            if on_stream is not None:
+                on_stream(response)
+            try:
+                for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    content = chunk.choices[0].delta.content or ""
+                    if content:
+                        yield content
+            finally:
+                registry.discard(self.job, "streams", response)
+                response.close()
+
+    def generate_hedged(self, messages):
+        primary = BackendStream(
+            self.llm_type,
+            lambda stream: self.stream_backend(self.llm_type, self.model, self.api_key, messages,
+                                               timing=stream.timing, on_stream=stream.attach),
+            job=self.job,
+        )
+        secondary = None
+        started = time.monotonic()
+        primary.start()
+
+        winner = None
+        reason = ""
+        buffered = []
+        think_filter = ThinkFilter()
+        while winner is None:
+            if self.cancelled.is_set():
+                for stream in (primary, secondary):
+                    if stream:
+                        stream.cancel()
+                return
+            # The primary keeps streaming live while it is racing
+            for content in primary.drain():
+                self.emit_content(think_filter, content)
+            if secondary:
+                buffered.extend(secondary.drain())
+
+            now = time.monotonic()
+            if secondary is None:
+                if primary.finished_ok():
+                    winner, reason = primary, "primary finished"
+                elif primary.error is not None:
+                    reason = "primary failed"
+                elif primary.first_token_at is None and now - started > self.hedge["deadline"]:
+                    reason = "no first token"
+                elif (primary.first_token_at is not None
+                      and now - primary.first_token_at > HEDGE_RATE_WARMUP
+                      and primary.decode_rate() < self.hedge["min_rate"]):
+                    reason = "slow decode"
+                else:
+                    reason = ""
+                if winner is None and reason:
+                    secondary = BackendStream(
+                        self.hedge["llm_type"],
+                        lambda stream: self.stream_backend(
+                            self.hedge["llm_type"], self.hedge["model"], self.hedge["api_key"], messages,
+                            timing=stream.timing, on_stream=stream.attach
+                        ),
+                        job=self.job,
+                    )
+                    secondary.start()
             else:
-                # Use OpenRouter
-                client = OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=self.api_key,
-                )
+                if primary.finished_ok():
+                    winner, reason = primary, "finished first"
+                elif secondary.finished_ok():
+                    winner, reason = secondary, "finished first"
+                elif primary.error is not None and secondary.error is not None:
+                    raise primary.error
+                elif primary.error is not None:
+                    winner, reason = secondary, "primary failed"
+                elif secondary.error is not None:
+                    winner, reason = primary, "secondary failed"
+                elif primary.first_token_at is None and secondary.first_token_at is not None:
+                    winner, reason = secondary, "first token"
+                elif (primary.first_token_at is not None and secondary.first_token_at is not None
+                      and now - secondary.first_token_at > HEDGE_DECISION_WINDOW):
+                    if secondary.decode_rate() > primary.decode_rate():
+                        winner, reason = secondary, "faster decode"
+                    else:
+                        winner, reason = primary, "faster decode"
+            if winner is None:
+                time.sleep(HEDGE_POLL_INTERVAL)
+
+        loser = secondary if winner is primary else primary
+        if loser:
+            loser.cancel()
+        self.hedge_decided.emit(winner.name, reason)
+        Tracer.instance().record_monotonic(self.trace_job, "llm.hedge", started, time.monotonic(),
+                                           winner=winner.name, reason=reason, raced=secondary is not None)
+
+        if winner is secondary:
+            if self.notes_buffer is not None:
+                self.notes_buffer.clear()
+            self.reset.emit()
+            think_filter = ThinkFilter()
+            buffered.extend(secondary.drain())
+            for content in buffered:
+                self.emit_content(think_filter, content)
+        for content in winner.remaining():
+            if self.cancelled.is_set():
+                winner.cancel()
+                return
+            self.emit_content(think_filter, content)
+        self.finish_content(think_filter)
+        if winner.error is not None:
+            raise winner.error
+        model = self.model if winner is primary else self.hedge["model"]
+        self.emit_metrics(winner.name, model, messages, winner.started_at, winner.first_token_at, winner.chars,
+                          winner.timing)
+
+
+class BackendStream(threading.Thread):
+    def __init__(self, name, source, job=None):
+        super().__init__(daemon=True)
+        self.name = name
+        self.source = source
+        self.job = job
+        self.chunks = queue.Queue()
+        self.cancelled = threading.Event()
+        self.lock = threading.Lock()
+        self.streams = []
+        self.started_at = time.monotonic()
+        self.first_token_at = None
+        self.timing = {}
+        self.tokens = 0
+        self.chars = 0
+        self.done = False
+        self.error = None
+
+    def run(self):
+        self.started_at = time.monotonic()
+        JobRegistry.instance().add(self.job, "threads", self)
+        stream = None
+        try:
+            stream = self.source(self)
+            for content in stream:
+                if self.cancelled.is_set():
+                    break
+                if self.first_token_at is None:
+                    self.first_token_at = time.monotonic()
+                self.tokens += 1
+                self.chars += len(content)
+                self.chunks.put(content)
+        except Exception as e:
+            self.error = e
+        finally:
+            if stream is not None:
+                stream.close()
+            self.done = True
+            self.chunks.put(None)
+            JobRegistry.instance().discard(self.job, "threads", self)
+
+    def attach(self, stream):
+        with self.lock:
+            self.streams.append(stream)
+            cancelled = self.cancelled.is_set()
+        if cancelled:
+            stream.close()
+
+    def cancel(self):
+        # The flag alone only stops it at the next chunk; a loser still waiting on its first one needs the request closed
+        with self.lock:
+            self.cancelled.set()
+            streams = list(self.streams)
+        for stream in streams:
+            try:
+                stream.close()
+            except Exception:
+                pass
+
+    def finished_ok(self):
+        return self.done and self.error is None and not self.cancelled.is_set()
+
+    def decode_rate(self):
+        if self.first_token_at is None:
+            return 0.0
+        elapsed = time.monotonic() - self.first_token_at
+        return self.tokens / elapsed if elapsed > 0 else 0.0
 
-                response = client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    stream=True,
+    def drain(self):
+        items = []
+        while True:
+            try:
+                content = self.chunks.get_nowait()
+            except queue.Empty:
+                break
+            if content is None:
+                # Keep the end marker for remaining()
+                self.chunks.put(None)
+                break
+            items.append(content)
+        return items
+
+    def remaining(self):
+        while True:
+            content = self.chunks.get()
+            if content is None:
+                return
+            yield content
+
+PDF_EXPORT_OPTIONS = {
+    'print_background': True,
+    'format': 'A4',
+    'margin': {
+        'top': '15mm',
+        'right': '15mm',
+        'bottom': '15mm',
+        'left': '15mm'
+    },
+    'display_header_footer': True,
+    'header_template': '<div style="height: 0;"></div>',
+    'footer_template': '<div style="font-size: 10px; width: 100%; text-align: center;"><span class="pageNumber"></span></div>',
+    'prefer_css_page_size': True,
+}
+
+def native_pdf_export(html_content, filename):
+    # Qt's own rich text engine: no browser process, at the cost of a CSS subset
+    document = QTextDocument()
+    document.setHtml(html_content)
+    temp_path = atomic_temp_path(filename)
+    writer = QPdfWriter(temp_path)
+    # print_() adds its own 2 cm margins and page numbers, so the page itself gets none
+    writer.setPageLayout(QPageLayout(
+        QPageSize(QPageSize.A4), QPageLayout.Portrait, QMarginsF(0, 0, 0, 0), QPageLayout.Millimeter
+    ))
+    writer.setResolution(96)
+    try:
+        document.print_(writer)
+        # The file is only complete once the writer is gone
+        del writer
+        os.replace(temp_path, filename)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+MERGED_NOTES_CSS = """
+    .contents li {
+        margin-bottom: 0.4em;
+    }
+    .merged-note {
+        break-before: page;
+    }
+"""
+
+
+def write_merged_document(out, entries, on_note=None):
+    # Notes are read and written one at a time so memory stays flat however many are merged
+    out.write('<!DOCTYPE html><html><head><meta charset="utf-8">')
+    out.write(f"<style>{NOTES_PDF_CSS}{MERGED_NOTES_CSS}</style></head><body>")
+    out.write('<section class="contents"><h1>Contents</h1><ol>')
+    for number, entry in enumerate(entries, 1):
+        out.write(f'<li><a href="#note-{number}">{escape(entry["title"])}</a></li>')
+    out.write("</ol></section>")
+    for number, entry in enumerate(entries, 1):
+        out.write(f'<section class="merged-note" id="note-{number}">')
+        out.write(render_notes_body(read_note_html(entry["source_path"]), notes_format="html"))
+        out.write("</section>")
+        if on_note:
+            on_note(number)
+    out.write("</body></html>")
+
+
+class PdfExportWorker(QObject):
+    progress = Signal(str, str, int)
+    finished = Signal(str)
+    error = Signal(str, str)
+
+    def __init__(self):
+        super().__init__()
+        self.playwright = None
+        self.browser = None
+
+    def ensure_browser(self):
+        if self.browser is None:
+            # The browser stays up while exports are queued behind each other
+            self.playwright = sync_playwright().start()
+            self.browser = self.playwright.chromium.launch()
+        return self.browser
+
+    def export(self, html_content, filename, native=False, job=""):
+        tracer, job = Tracer.instance(), job or None
+        try:
+            self.progress.emit(filename, "layout", 10)
+            if native:
+                with tracer.span(job, "pdf.native", chars=len(html_content)):
+                    native_pdf_export(html_content, filename)
+                self.progress.emit(filename, "done", 100)
+                self.finished.emit(filename)
+                return
+            with tracer.span(job, "pdf.browser", running=self.browser is not None):
+                browser = self.ensure_browser()
+            page = browser.new_page()
+            try:
+                with tracer.span(job, "pdf.layout", chars=len(html_content)):
+                    page.set_content(html_content)
+                self.progress.emit(filename, "print", 50)
+                with tracer.span(job, "pdf.print") as span:
+                    pdf_bytes = page.pdf(**PDF_EXPORT_OPTIONS)
+                    span.set(bytes=len(pdf_bytes))
+            finally:
+                page.close()
+
+            self.progress.emit(filename, "write", 90)
+            with tracer.span(job, "pdf.write"), atomic_write(filename, "wb") as f:
+                f.write(pdf_bytes)
+            self.progress.emit(filename, "done", 100)
+            self.finished.emit(filename)
+        except Exception as e:
+            self.error.emit(filename, str(e))
+
+    def merge(self, entries, filename, job=""):
+        tracer, job = Tracer.instance(), job or None
+        fd, html_path = tempfile.mkstemp(suffix=".html")
+        temp_path = atomic_temp_path(filename)
+        try:
+            with tracer.span(job, "pdf.collect", notes=len(entries)), os.fdopen(fd, "w", encoding="utf-8") as out:
+                write_merged_document(
+                    out, entries,
+                    lambda done: self.progress.emit(filename, "collect", 40 * done // len(entries)),
                 )
+            with tracer.span(job, "pdf.browser", running=self.browser is not None):
+                browser = self.ensure_browser()
+            page = browser.new_page()
+            try:
+                # One navigation and one print for the whole set; Chromium reads the file itself
+                with tracer.span(job, "pdf.layout"):
+                    page.goto(QUrl.fromLocalFile(html_path).toString(), timeout=0)
+                self.progress.emit(filename, "print", 50)
+                with tracer.span(job, "pdf.print"):
+                    page.pdf(path=temp_path, outline=True, tagged=True, **PDF_EXPORT_OPTIONS)
+            finally:
+                page.close()
+            self.progress.emit(filename, "write", 90)
+            os.replace(temp_path, filename)
+            self.progress.emit(filename, "done", 100)
+            self.finished.emit(filename)
+        except Exception as e:
+            self.error.emit(filename, str(e))
+        finally:
+            os.remove(html_path)
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def close_browser(self):
+        if self.browser is not None:
+            self.browser.close()
+            self.browser = None
+        if self.playwright is not None:
+            self.playwright.stop()
+            self.playwright = None
+
+
+class PdfExportQueue(QObject):
+    submit = Signal(str, str, bool, str)
+    submit_merge = Signal(list, str, str)
+    close_requested = Signal()
+    progress = Signal(str, str, int)
+    finished = Signal(str, dict)
+    error = Signal(str, str)
 
-                full_text = ""
-                for chunk in response:
-                    content = chunk.choices[0].delta.content or ""
-                    if content:
-                        full_text += content
-                        self.chunk_received.emit(content)
-                self.finished.emit("")
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pending = []
+        self.metadata = {}
+        self.thread = QThread()
+        self.worker = PdfExportWorker()
+        self.worker.moveToThread(self.thread)
+        # Queued connections run the jobs one at a time, in order, on the export thread
+        self.submit.connect(self.worker.export)
+        self.submit_merge.connect(self.worker.merge)
+        self.close_requested.connect(self.worker.close_browser)
+        self.worker.progress.connect(self.progress)
+        self.worker.finished.connect(self.on_job_finished)
+        self.worker.error.connect(self.on_job_error)
+        self.thread.start()
+
+    def enqueue(self, html_content, filename, metadata=None, native=False, trace_job=None):
+        self.pending.append(filename)
+        self.metadata[filename] = dict(metadata or {})
+        self.submit.emit(html_content, filename, native, trace_job or "")
+        return len(self.pending)
+
+    def enqueue_merge(self, entries, filename, metadata=None, trace_job=None):
+        self.pending.append(filename)
+        self.metadata[filename] = dict(metadata or {})
+        self.submit_merge.emit(entries, filename, trace_job or "")
+        return len(self.pending)
+
+    def on_job_finished(self, filename):
+        metadata = self.metadata.get(filename, {})
+        self.job_done(filename)
+        self.finished.emit(filename, metadata)
+
+    def on_job_error(self, filename, error_msg):
+        self.job_done(filename)
+        self.error.emit(filename, error_msg)
+
+    def job_done(self, filename):
+        self.metadata.pop(filename, None)
+        if filename in self.pending:
+            self.pending.remove(filename)
+        if not self.pending:
+            self.close_requested.emit()
+
+    def shutdown(self):
+        self.close_requested.emit()
+        self.thread.quit()
+        self.thread.wait()
+
+
+def optimize_pdf(pdf_path):
+    before = os.path.getsize(pdf_path)
+    temp_path = atomic_temp_path(pdf_path)
+    try:
+        ghostscript = shutil.which("gs") or shutil.which("gswin64c")
+        if ghostscript:
+            # pdfwrite rebuilds the file: fonts subset, duplicate images shared, streams recompressed
+            subprocess.run([
+                ghostscript, "-q", "-dBATCH", "-dNOPAUSE", "-dSAFER", "-sDEVICE=pdfwrite",
+                "-dSubsetFonts=true", "-dCompressFonts=true", "-dDetectDuplicateImages=true",
+                "-dCompatibilityLevel=1.7", f"-sOutputFile={temp_path}", pdf_path,
+            ], check=True, capture_output=True)
+        elif PdfWriter is not None:
+            writer = PdfWriter(clone_from=pdf_path)
+            for page in writer.pages:
+                page.compress_content_streams(level=9)
+            writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+            with open(temp_path, "wb") as f:
+                writer.write(f)
+        else:
+            raise RuntimeError("install Ghostscript or pypdf to shrink PDFs")
+        after = os.path.getsize(temp_path)
+        if after >= before:
+            return before, before
+        os.replace(temp_path, pdf_path)
+        return before, after
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+class PdfOptimizer(QObject):
+    optimized = Signal(str, int, int)
+    error = Signal(str, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.executor = None
+
+    def submit(self, pdf_path):
+        if self.executor is None:
+            # A separate process keeps Ghostscript/pypdf work off the GUI's interpreter lock
+            self.executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        future = self.executor.submit(optimize_pdf, pdf_path)
+        future.add_done_callback(lambda future: self.on_done(pdf_path, future))
+
+    def on_done(self, pdf_path, future):
+        if future.cancelled():
+            return
+        try:
+            before, after = future.result()
+        except Exception as e:
+            self.error.emit(pdf_path, str(e))
+            return
+        self.optimized.emit(pdf_path, before, after)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+def format_bytes(size):
+    for unit in ("B", "KB", "MB"):
+        if abs(size) < 1024:
+            return f"{size:.0f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+YOUTUBE_URL = "https://www.youtube.com"
+YOUTUBE_CACHE_MB = 200
+YOUTUBE_DISCARD_AFTER_MS = 5 * 60 * 1000
+# Chromium rebuilds these on demand; cookies and local storage (the signed-in session) are left alone
+WEB_PROFILE_DISPOSABLE = (
+    "Cache", "Code Cache", "GPUCache", "DawnGraphiteCache", "DawnWebGPUCache",
+    os.path.join("Service Worker", "CacheStorage"), os.path.join("Service Worker", "ScriptCache"),
+)
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def trim_web_profile(path, limit):
+    # Must run before the profile is opened, while Chromium holds none of these files
+    before = directory_size(path)
+    if before <= limit:
+        return 0
+    for name in WEB_PROFILE_DISPOSABLE:
+        shutil.rmtree(os.path.join(path, name), ignore_errors=True)
+    return before - directory_size(path)
+
+
+class ResourceMonitor:
+    # Covers the app and its children, which is where QtWebEngineProcess and Chromium live
+    def __init__(self):
+        self.last = None
+
+    def sample(self):
+        if psutil is None:
+            return None
+        rss = cpu_seconds = 0
+        count = 0
+        process = psutil.Process()
+        for process in [process] + process.children(recursive=True):
+            try:
+                rss += process.memory_info().rss
+                times = process.cpu_times()
+                cpu_seconds += times.user + times.system
+                count += 1
+            except psutil.Error:
+                continue
+        now = time.monotonic()
+        cpu_percent = None
+        if self.last is not None and now > self.last[0]:
+            cpu_percent = max(0.0, 100 * (cpu_seconds - self.last[1]) / (now - self.last[0]))
+        self.last = (now, cpu_seconds)
+        return {"rss": rss, "cpu_percent": cpu_percent, "processes": count}
+
+
+SNIPPET_ROLE = Qt.UserRole + 1
+SEARCH_DEBOUNCE_MS = 150
+OUTPUT_WATCH_DEBOUNCE_MS = 300
+
+
+def unique_path(path, taken=()):
+    root, ext = os.path.splitext(path)
+    candidate = path
+    counter = 2
+    while os.path.exists(candidate) or candidate in taken:
+        candidate = f"{root} ({counter}){ext}"
+        counter += 1
+    return candidate
+
+
+class NotesLibrary:
+    COLUMNS = (
+        "video_id", "title", "model", "backend", "created_at", "generation_seconds",
+        "prompt_tokens", "output_tokens", "file_size", "pdf_path", "html_path", "bundle_path",
+    )
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY,
+                video_id TEXT,
+                title TEXT NOT NULL,
+                model TEXT,
+                backend TEXT,
+                created_at TEXT NOT NULL,
+                generation_seconds REAL,
+                prompt_tokens INTEGER,
+                output_tokens INTEGER,
+                file_size INTEGER,
+                pdf_path TEXT NOT NULL UNIQUE,
+                html_path TEXT,
+                bundle_path TEXT
+            );
+            CREATE INDEX IF NOT EXISTS notes_by_created ON notes(created_at DESC);
+            CREATE INDEX IF NOT EXISTS notes_by_video ON notes(video_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+                title, body, tokenize = 'porter unicode61'
+            );
+        """)
+        if "bundle_path" not in {row["name"] for row in self.conn.execute("PRAGMA table_info(notes)")}:
+            self.conn.execute("ALTER TABLE notes ADD COLUMN bundle_path TEXT")
+        # Title matches weigh more than body matches; ORDER BY rank lets FTS5 only build snippets for the top hits
+        self.conn.execute("INSERT INTO notes_fts (notes_fts, rank) VALUES ('rank', 'bm25(5.0, 1.0)')")
+        self.conn.commit()
+
+    def add(self, **fields):
+        fields.setdefault("created_at", datetime.now().isoformat(timespec="seconds"))
+        if fields.get("file_size") is None and os.path.exists(fields["pdf_path"]):
+            fields["file_size"] = os.path.getsize(fields["pdf_path"])
+        names = [name for name in self.COLUMNS if name in fields]
+        # Updated in place so a re-export keeps its id, which notes_fts and the semantic sections are keyed on
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names if name != "pdf_path")
+        self.conn.execute(
+            f"INSERT INTO notes ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})"
+            f" ON CONFLICT(pdf_path) DO UPDATE SET {updates}",
+            [fields[name] for name in names],
+        )
+        self.conn.commit()
+        return self.find(fields["pdf_path"])
+
+    def get(self, note_id):
+        return self.conn.execute("SELECT * FROM notes WHERE id = ?", (note_id,)).fetchone()
+
+    def find(self, pdf_path):
+        return self.conn.execute("SELECT * FROM notes WHERE pdf_path = ?", (pdf_path,)).fetchone()
+
+    def bundle_paths(self):
+        return {row[0] for row in self.conn.execute("SELECT DISTINCT bundle_path FROM notes WHERE bundle_path IS NOT NULL")}
+
+    def notes_for_video(self, video_id):
+        return self.conn.execute(
+            "SELECT * FROM notes WHERE video_id = ? ORDER BY created_at DESC", (video_id,)
+        ).fetchall()
+
+    def remove(self, pdf_path):
+        row = self.find(pdf_path)
+        if row is None:
+            return None
+        self.conn.execute("DELETE FROM notes WHERE id = ?", (row["id"],))
+        self.conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (row["id"],))
+        self.conn.commit()
+        if row["html_path"] and os.path.exists(row["html_path"]):
+            os.remove(row["html_path"])
+        # Re-exports of one generation share its bundle, so it goes with the last PDF made from it
+        if row["bundle_path"] and os.path.exists(row["bundle_path"]) and not self.conn.execute(
+            "SELECT 1 FROM notes WHERE bundle_path = ?", (row["bundle_path"],)
+        ).fetchone():
+            os.remove(row["bundle_path"])
+        return row
+
+    def update_file_size(self, pdf_path, file_size):
+        self.conn.execute("UPDATE notes SET file_size = ? WHERE pdf_path = ?", (file_size, pdf_path))
+        self.conn.commit()
+
+    def rename(self, old_path, new_path):
+        self.conn.execute("UPDATE notes SET pdf_path = ? WHERE pdf_path = ?", (new_path, old_path))
+        self.conn.commit()
+
+    def notes(self, limit=-1, after=None):
+        # Keyset paging stays correct when new notes are inserted at the top between pages
+        if after is None:
+            return self.conn.execute(
+                "SELECT * FROM notes ORDER BY created_at DESC, id DESC LIMIT ?", (limit,)
+            )
+        return self.conn.execute(
+            "SELECT * FROM notes WHERE (created_at, id) < (?, ?) ORDER BY created_at DESC, id DESC LIMIT ?",
+            (after["created_at"], after["id"], limit),
+        )
 
+    def index_text(self, note_id, title, text):
+        self.conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (note_id,))
+        self.conn.execute(
+            "INSERT INTO notes_fts (rowid, title, body) VALUES (?, ?, ?)", (note_id, title, text)
+        )
+        self.conn.commit()
+
+    def unindexed(self):
+        return self.conn.execute(
+            "SELECT * FROM notes WHERE id NOT IN (SELECT rowid FROM notes_fts)"
+        ).fetchall()
+
+    def search(self, text, limit=100):
+        query = fts_query(text)
+        if query is None:
+            return []
+        return self.conn.execute(
+            """
+            SELECT notes.*, snippet(notes_fts, 1, '«', '»', '…', 12) AS snippet
+            FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid
+            WHERE notes_fts MATCH ?
+            ORDER BY rank
+            LIMIT ?
+            """,
+            (query, limit),
+        ).fetchall()
+
+    def reconcile(self, directory):
+        # Picks up PDFs made before the index existed and forgets ones deleted behind our back
+        on_disk = {}
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.lower().endswith(".pdf"):
+                on_disk[os.path.abspath(entry.path)] = entry
+        known = {row["pdf_path"]: row["id"] for row in self.conn.execute("SELECT id, pdf_path FROM notes")}
+        for path in set(known) - set(on_disk):
+            self.conn.execute("DELETE FROM notes WHERE id = ?", (known[path],))
+            self.conn.execute("DELETE FROM notes_fts WHERE rowid = ?", (known[path],))
+        for path in set(on_disk) - known:
+            stat = on_disk[path].stat()
+            self.conn.execute(
+                "INSERT INTO notes (title, created_at, file_size, pdf_path) VALUES (?, ?, ?, ?)",
+                (
+                    os.path.splitext(os.path.basename(path))[0],
+                    datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+                    stat.st_size,
+                    path,
+                ),
+            )
+        self.conn.commit()
+
+
+EMBEDDING_MODEL = "nomic-embed-text"
+
+
+def embed_texts(model, texts, host=None):
+    response = ollama_client(host).embed(model=model, input=texts)
+    return np.asarray(response["embeddings"], dtype=np.float32)
+
+
+class SemanticIndex:
+    def __init__(self, db_path, vectors_path, model):
+        self.model = model
+        self.vectors_path = vectors_path
+        self.meta_path = vectors_path + ".json"
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sections (
+                row INTEGER PRIMARY KEY,
+                note_id INTEGER NOT NULL,
+                heading TEXT,
+                preview TEXT
+            );
+            CREATE INDEX IF NOT EXISTS sections_by_note ON sections(note_id);
+        """)
+        self.dim = None
+        self.meta_stamp = None
+        self.matrix_cache = None
+        self.refresh_meta()
+        if self.dim is None:
+            # Vectors from another embedding model are not comparable, start over
+            self.clear()
+        self.truncate_to_rows()
+
+    def refresh_meta(self):
+        # The GUI and the embedding worker each hold an instance; either may have written the first vectors
+        try:
+            stat = os.stat(self.meta_path)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            self.dim = self.meta_stamp = None
+            return
+        if stamp == self.meta_stamp:
+            return
+        self.meta_stamp = stamp
+        self.dim = None
+        try:
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta["model"] == self.model:
+                self.dim = meta["dim"]
+        except (OSError, ValueError, KeyError):
+            self.meta_stamp = None
+
+    def clear(self):
+        with self.conn:
+            self.conn.execute("DELETE FROM sections")
+        for path in (self.vectors_path, self.meta_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def truncate_to_rows(self):
+        # Vectors written by a run that died before committing its rows are dropped
+        if not self.dim or not os.path.exists(self.vectors_path):
+            return
+        rows = self.conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM sections").fetchone()[0]
+        if self.count() > rows:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(rows * self.dim * 4)
+
+    def count(self):
+        self.refresh_meta()
+        if not self.dim or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (self.dim * 4)
+
+    def add(self, note_id, sections, vectors):
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            with atomic_write(self.meta_path) as f:
+                json.dump({"model": self.model, "dim": self.dim}, f)
+        start = self.count()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO sections (row, note_id, heading, preview) VALUES (?, ?, ?, ?)",
+                [(start + i, note_id, heading, text[:300]) for i, (heading, text) in enumerate(sections)],
+            )
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors.astype(np.float32).tobytes())
+
+    def remove(self, note_id):
+        # Rows stay in the matrix as tombstones; they no longer map to a section
+        with self.conn:
+            self.conn.execute("DELETE FROM sections WHERE note_id = ?", (note_id,))
+
+    def embedded_note_ids(self):
+        return {row[0] for row in self.conn.execute("SELECT DISTINCT note_id FROM sections")}
+
+    def matrix(self):
+        rows = self.count()
+        if rows == 0:
+            return None
+        if self.matrix_cache is None or self.matrix_cache.shape != (rows, self.dim):
+            self.matrix_cache = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self.matrix_cache
+
+    def search(self, vector, k=20):
+        matrix = self.matrix()
+        if matrix is None:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query /= max(float(np.linalg.norm(query)), 1e-12)
+        scores = matrix @ query
+        # Over-fetch so tombstones and several hits in one note still leave k notes
+        candidates = min(len(scores), k * 4)
+        top = np.argpartition(-scores, candidates - 1)[:candidates]
+        top = top[np.argsort(-scores[top])]
+        placeholders = ", ".join("?" for _ in top)
+        found = {
+            row["row"]: row for row in self.conn.execute(
+                f"""
+                SELECT sections.row, sections.heading, sections.preview, notes.*
+                FROM sections JOIN notes ON notes.id = sections.note_id
+                WHERE sections.row IN ({placeholders})
+                """,
+                [int(row) for row in top],
+            )
+        }
+        results = []
+        seen = set()
+        for row in top:
+            match = found.get(int(row))
+            if match is None or match["id"] in seen:
+                continue
+            seen.add(match["id"])
+            results.append((float(scores[row]), match))
+            if len(results) == k:
+                break
+        return results
+
+
+class TranscriptIndex:
+    # MinHash signatures of every fetched transcript, banded so a lookup only reads the buckets it falls in
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                key TEXT PRIMARY KEY,
+                video_id TEXT,
+                transcript_file TEXT,
+                shingles INTEGER NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS transcript_bands (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                key TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS transcript_bands_by_bucket ON transcript_bands(band, bucket);
+        """)
+        self.conn.commit()
+
+    def add(self, key, video_id, transcript_file, shingles, signature):
+        with self.conn:
+            self.conn.execute("DELETE FROM transcript_bands WHERE key = ?", (key,))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO transcripts (key, video_id, transcript_file, shingles, signature)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, video_id, transcript_file, shingles, struct.pack(f"<{len(signature)}I", *signature)),
+            )
+            self.conn.executemany(
+                "INSERT INTO transcript_bands (band, bucket, key) VALUES (?, ?, ?)",
+                [(band, bucket, key) for band, bucket in minhash_bands(signature)],
+            )
+
+    def similar(self, shingles, signature, threshold=DUPLICATE_THRESHOLD):
+        candidates = set()
+        for band, bucket in minhash_bands(signature):
+            candidates.update(row[0] for row in self.conn.execute(
+                "SELECT key FROM transcript_bands WHERE band = ? AND bucket = ?", (band, bucket)
+            ))
+        matches = []
+        for key in candidates:
+            row = self.conn.execute("SELECT * FROM transcripts WHERE key = ?", (key,)).fetchone()
+            other = struct.unpack(f"<{len(signature)}I", row["signature"])
+            similarity = sum(a == b for a, b in zip(signature, other)) / len(signature)
+            # A clip is a small part of the original, so its Jaccard is low but nearly all of it is contained
+            overlap = similarity * (shingles + row["shingles"]) / (1 + similarity)
+            containment = min(1.0, overlap / max(shingles, 1))
+            if max(similarity, containment) >= threshold:
+                matches.append({"key": key, "video_id": row["video_id"], "transcript_file": row["transcript_file"],
+                                "similarity": similarity, "containment": containment})
+        return sorted(matches, key=lambda match: (match["similarity"], match["containment"]), reverse=True)
+
+
+class EmbeddingWorker(QObject):
+    indexed = Signal(int, int)
+    query_embedded = Signal(str, object)
+    query_failed = Signal(str, str)
+    error = Signal(str)
+
+    def __init__(self, db_path, vectors_path, model, ollama_host=None):
+        super().__init__()
+        self.db_path = db_path
+        self.vectors_path = vectors_path
+        self.model = model
+        self.ollama_host = ollama_host
+        self.index = None
+        self.backlog = deque()
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def ensure_index(self):
+        # Created lazily so the sqlite connection belongs to the worker thread
+        if self.index is None:
+            self.index = SemanticIndex(self.db_path, self.vectors_path, self.model)
+        return self.index
+
+    def index_note(self, note_id, source_path):
+        try:
+            index = self.ensure_index()
+            sections = split_sections(read_note_html(source_path))
+            if not sections:
+                return
+            vectors = embed_texts(self.model, [f"{heading}\n{text}" for heading, text in sections], self.ollama_host)
+            index.remove(note_id)
+            index.add(note_id, sections, vectors)
+            self.indexed.emit(note_id, len(sections))
         except Exception as e:
             self.error.emit(str(e))
 
+    def embed_query(self, text):
+        # A cold model can take a while to load; the GUI thread only waits for the signal
+        try:
+            self.query_embedded.emit(text, embed_texts(self.model, [text], self.ollama_host)[0])
+        except Exception as e:
+            self.query_failed.emit(text, str(e))
+
+    def backfill(self):
+        index = self.ensure_index()
+        embedded = index.embedded_note_ids()
+        rows = index.conn.execute(
+            "SELECT id, COALESCE(bundle_path, html_path) AS source_path FROM notes"
+            " WHERE COALESCE(bundle_path, html_path) IS NOT NULL"
+        ).fetchall()
+        self.backlog.extend((row["id"], row["source_path"]) for row in rows if row["id"] not in embedded)
+        self.backfill_next()
+
+    def backfill_next(self):
+        # One note per turn of the event loop, so a search query queued meanwhile is not stuck behind the backlog
+        if self.cancelled.is_set() or not self.backlog:
+            return
+        note_id, source_path = self.backlog.popleft()
+        if os.path.exists(source_path):
+            self.index_note(note_id, source_path)
+        QTimer.singleShot(0, self.backfill_next)
+
+
+class LibraryBackfillWorker(QObject):
+    finished = Signal(int)
+
+    def __init__(self, db_path):
+        super().__init__()
+        self.db_path = db_path
+        self.cancelled = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def run(self):
+        # Runs on its own connection so the GUI thread's connection is never shared
+        library = NotesLibrary(self.db_path)
+        indexed = 0
+        for row in library.unindexed():
+            if self.cancelled.is_set():
+                break
+            try:
+                source_path = row["bundle_path"] or row["html_path"]
+                if source_path and os.path.exists(source_path):
+                    text = html_to_text(read_note_html(source_path))
+                else:
+                    text = pdf_to_text(row["pdf_path"])
+            except Exception:
+                continue
+            if text is not None:
+                library.index_text(row["id"], row["title"], text)
+                indexed += 1
+        library.conn.close()
+        self.finished.emit(indexed)
+
+
+THUMBNAIL_ROLE = Qt.UserRole + 2
+THUMBNAIL_SIZE = QSize(48, 64)
+THUMBNAIL_MEMORY_ITEMS = 300
+
+
+def thumbnail_file(cache_dir, pdf_path):
+    # Keyed by mtime and size so an overwritten PDF never shows the old page
+    stat = os.stat(pdf_path)
+    key = hashlib.sha1(f"{pdf_path}|{stat.st_mtime_ns}|{stat.st_size}".encode()).hexdigest()
+    return os.path.join(cache_dir, f"{key}.png")
+
+
+class ThumbnailTask(QRunnable):
+    def __init__(self, pdf_path, cache_dir, signals):
+        super().__init__()
+        self.pdf_path = pdf_path
+        self.cache_dir = cache_dir
+        self.signals = signals
+
+    def run(self):
+        try:
+            cache_path = thumbnail_file(self.cache_dir, self.pdf_path)
+            if not os.path.exists(cache_path):
+                document = QPdfDocument()
+                if document.load(self.pdf_path) != QPdfDocument.Error.None_ or document.pageCount() == 0:
+                    raise ValueError("unreadable PDF")
+                page = document.pagePointSize(0).toSize().scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio)
+                image = document.render(0, page)
+                document.close()
+                temp_path = atomic_temp_path(cache_path)
+                if image.isNull() or not image.save(temp_path, "PNG"):
+                    raise ValueError("render failed")
+                os.replace(temp_path, cache_path)
+            self.signals.rendered.emit(self.pdf_path, cache_path)
+        except Exception:
+            self.signals.rendered.emit(self.pdf_path, "")
+
+
+class ThumbnailCache(QObject):
+    rendered = Signal(str, str)
+    ready = Signal(str)
+
+    def __init__(self, cache_dir, parent=None, threads=2):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.pixmaps = {}
+        self.pending = set()
+        self.sequence = 0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(threads)
+        self.rendered.connect(self.on_rendered)
+
+    def thumbnail(self, pdf_path):
+        if pdf_path in self.pixmaps:
+            # Re-insert so the dict order doubles as the LRU order
+            pixmap = self.pixmaps.pop(pdf_path)
+            self.pixmaps[pdf_path] = pixmap
+            return pixmap
+        if QPdfDocument is not None and pdf_path not in self.pending:
+            self.pending.add(pdf_path)
+            # Newest requests first, so rows scrolled past do not hold up the ones on screen
+            self.sequence += 1
+            self.pool.start(ThumbnailTask(pdf_path, self.cache_dir, self), self.sequence)
+        return None
+
+    def on_rendered(self, pdf_path, cache_path):
+        if pdf_path not in self.pending:
+            return
+        self.pending.discard(pdf_path)
+        # A failed render is remembered as a null pixmap so the placeholder sticks instead of retrying
+        self.pixmaps[pdf_path] = QPixmap(cache_path) if cache_path else QPixmap()
+        while len(self.pixmaps) > THUMBNAIL_MEMORY_ITEMS:
+            del self.pixmaps[next(iter(self.pixmaps))]
+        self.ready.emit(pdf_path)
+
+    def forget(self, pdf_path):
+        self.pixmaps.pop(pdf_path, None)
+        self.pending.discard(pdf_path)
+        try:
+            os.remove(thumbnail_file(self.cache_dir, pdf_path))
+        except OSError:
+            pass
+
+    def release(self):
+        # Rendered thumbnails stay on disk, so visible rows just reload them
+        self.pixmaps.clear()
+
+    def shutdown(self):
+        self.pool.clear()
+        self.pool.waitForDone()
+
+
+class NotesListModel(QAbstractListModel):
+    PAGE_SIZE = 200
+
+    def __init__(self, library, thumbnails, parent=None):
+        super().__init__(parent)
+        self.library = library
+        self.thumbnails = thumbnails
+        self.rows = []
+        self.exhausted = False
+        self.waiting = {}
+        thumbnails.ready.connect(self.on_thumbnail_ready)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        after = self.rows[-1] if self.rows else None
+        page = [dict(row) for row in self.library.notes(self.PAGE_SIZE, after)]
+        self.exhausted = len(page) < self.PAGE_SIZE
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.DisplayRole:
+            return os.path.basename(row["pdf_path"])
+        if role == Qt.UserRole:
+            return row["pdf_path"]
+        if role == Qt.ToolTipRole:
+            details = [row["title"], row["created_at"].replace("T", " ")]
+            if row["model"]:
+                details.append(f"{row['model']} ({row['backend']})")
+            if row["output_tokens"]:
+                details.append(f"{row['output_tokens']} tokens in {row['generation_seconds'] or 0:.0f}s")
+            return "\n".join(details)
+        if role == SNIPPET_ROLE:
+            return row.get("snippet")
+        if role == THUMBNAIL_ROLE:
+            pixmap = self.thumbnails.thumbnail(row["pdf_path"])
+            if pixmap is None:
+                self.waiting[row["pdf_path"]] = QPersistentModelIndex(index)
+            return pixmap
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.UserRole):
+            return False
+        row = self.rows[index.row()]
+        if role == Qt.UserRole:
+            row["pdf_path"] = value
+        else:
+            row["pdf_path"] = os.path.join(os.path.dirname(row["pdf_path"]), value)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def on_thumbnail_ready(self, pdf_path):
+        persistent = self.waiting.pop(pdf_path, None)
+        if persistent is not None and persistent.isValid():
+            index = self.index(persistent.row())
+            self.dataChanged.emit(index, index, [THUMBNAIL_ROLE])
+
+    def reset_all(self):
+        self.beginResetModel()
+        self.rows = []
+        self.exhausted = False
+        self.waiting.clear()
+        self.endResetModel()
+
+    def set_results(self, rows):
+        self.beginResetModel()
+        self.rows = rows
+        self.exhausted = True
+        self.waiting.clear()
+        self.endResetModel()
+
+    def insert_note(self, row):
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self.rows.insert(0, dict(row))
+        self.endInsertRows()
+        return self.index(0)
+
+    def rename_path(self, old_path, new_path):
+        number = self.row_for_path(old_path)
+        if number < 0:
+            return False
+        self.rows[number]["pdf_path"] = new_path
+        index = self.index(number)
+        self.dataChanged.emit(index, index)
+        return True
+
+    def row_for_path(self, pdf_path):
+        for number, row in enumerate(self.rows):
+            if row["pdf_path"] == pdf_path:
+                return number
+        return -1
+
+    def remove_path(self, pdf_path):
+        number = self.row_for_path(pdf_path)
+        if number < 0:
+            return False
+        self.beginRemoveRows(QModelIndex(), number, number)
+        del self.rows[number]
+        self.endRemoveRows()
+        return True
+
+
+class OutputWatcher(QObject):
+    added = Signal(str)
+    removed = Signal(str)
+    renamed = Signal(str, str)
+
+    def __init__(self, directory, parent=None):
+        super().__init__(parent)
+        self.directory = os.path.abspath(directory)
+        self.snapshot = self.scan()
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(OUTPUT_WATCH_DEBOUNCE_MS)
+        self.timer.timeout.connect(self.apply_changes)
+        self.watcher = QFileSystemWatcher([self.directory], self)
+        # A batch job writing many files fires a burst of change signals; only the last one triggers a scan
+        self.watcher.directoryChanged.connect(self.timer.start)
+
+    def scan(self):
+        snapshot = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return snapshot
+        for entry in entries:
+            try:
+                if entry.is_file() and entry.name.lower().endswith(".pdf"):
+                    # DirEntry.stat() leaves st_ino at 0 on Windows; os.stat fills it in
+                    snapshot[os.path.abspath(entry.path)] = os.stat(entry.path)
+            except OSError:
+                continue
+        return snapshot
+
+    def apply_changes(self):
+        current = self.scan()
+        gone = {path: self.snapshot[path] for path in set(self.snapshot) - set(current)}
+        new = {path: current[path] for path in set(current) - set(self.snapshot)}
+        self.snapshot = current
+        # A rename keeps the inode, so a vanished and an appeared path sharing one are the same file
+        moved_to = {self.identity(stat): path for path, stat in new.items() if stat.st_ino}
+        for path, stat in gone.items():
+            if stat.st_ino and self.identity(stat) in moved_to:
+                new_path = moved_to.pop(self.identity(stat))
+                del new[new_path]
+                self.renamed.emit(path, new_path)
+            else:
+                self.removed.emit(path)
+        for path in sorted(new, key=lambda path: new[path].st_mtime):
+            self.added.emit(path)
+
+    @staticmethod
+    def identity(stat):
+        return stat.st_dev, stat.st_ino, stat.st_size
+
+
 class PDFListDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent_widget = parent  
     def sizeHint(self, option, index):
-        text = index.data(Qt.DisplayRole)
-        font = option.font
-        fm = QFontMetrics(font)
+        # Every row is the same height so the view never has to measure the whole library
         margin = 15
-        width = self.parent_widget.width() - 2 * margin 
-        rect = fm.boundingRect(0, 0, width, 0, Qt.TextWordWrap, text)
-        return QSize(width, rect.height() + 2 * margin)
+        width = self.parent_widget.width() - 2 * margin
+        return QSize(width, THUMBNAIL_SIZE.height() + 2 * margin)
 
     def paint(self, painter, option, index):
         painter.save()
@@ -253,10 +3309,27 @@ class PDFListDelegate(QStyledItemDelegate):
         else:
             painter.setPen(QColor("#e0e0e0"))
         
-        text = index.data(Qt.DisplayRole)
         margin = 15
-        text_rect = option.rect.adjusted(margin, margin, -margin, -margin)
-        painter.drawText(text_rect, Qt.TextWordWrap, text)
+        thumb_rect = QRect(option.rect.topLeft() + QPoint(margin, margin), THUMBNAIL_SIZE)
+        pixmap = index.data(THUMBNAIL_ROLE)
+        if pixmap is not None and not pixmap.isNull():
+            scaled = pixmap.size().scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio)
+            painter.drawPixmap(QRect(thumb_rect.topLeft(), scaled), pixmap)
+        else:
+            painter.fillRect(thumb_rect, QColor("#2a1e42"))
+            painter.drawRect(thumb_rect.adjusted(0, 0, -1, -1))
+
+        text = index.data(Qt.DisplayRole)
+        text_rect = option.rect.adjusted(2 * margin + THUMBNAIL_SIZE.width(), margin, -margin, -margin)
+        fm = QFontMetrics(option.font)
+        painter.drawText(text_rect, Qt.TextSingleLine, fm.elidedText(text, Qt.ElideMiddle, text_rect.width()))
+
+        snippet = index.data(SNIPPET_ROLE)
+        if snippet:
+            if not option.state & QStyle.State_Selected:
+                painter.setPen(QColor("#a0a0a0"))
+            painter.setClipRect(text_rect)
+            painter.drawText(text_rect.adjusted(0, fm.height() + 5, 0, 0), Qt.TextWordWrap, snippet)
         
         painter.restore()
 
@@ -286,6 +3359,7 @@ class PDFListDelegate(QStyledItemDelegate):
                 model.setData(index, new_name, Qt.DisplayRole)
                 model.setData(index, new_path, Qt.UserRole)
                 if self.parent_widget:
+                    self.parent_widget.library.rename(pdf_path, new_path)
                     self.parent_widget.show_notification(f"Renamed to: {new_name}")
             except Exception as e:
                 if self.parent_widget:
@@ -293,22 +3367,43 @@ class PDFListDelegate(QStyledItemDelegate):
 
 
 class YouTubeNotesView(QWidget):
-    def __init__(self, web_view, transcript_file, llm_type="local", model="qwen3:4b", api_key=None):
+    def __init__(self, web_view, transcript_file, llm_type="local", model="qwen3:4b", api_key=None, hedge=None,
+                 route=None, video_id=None, low_resource=False, ollama_options=None, trace_job=None,
+                 ollama_host=None, job=None, partial_text=None):
         super().__init__()
+        self.job = job
+        JobRegistry.instance().track_view(job, self)
+        self.journal = JobJournal.instance()
+        self.trace_job = trace_job
+        self.ollama_host = ollama_host
         self.web_view = web_view
+        self.low_resource = low_resource
+        self.ollama_options = ollama_options
+        self.video_id = video_id
         self.transcript_file = transcript_file
-        self.current_markdown = ""
+        self.notes_buffer = NotesBuffer()
         self.llm_type = llm_type
         self.model = model
         self.api_key = api_key
+        self.hedge = hedge
+        self.route = route
+        self.generation_metrics = None
+        self.bundle_path = None
         self.parent_window = None
-        
-        self.pending_think_content = ""
-        self.in_think_block = False
+        self.is_thinking = False
+        self.reset_render_state()
+        # Coalesces streamed chunks into a few repaints a second in low-resource mode
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.setInterval(LOW_RESOURCE_RENDER_MS)
+        self.render_timer.timeout.connect(self.refresh_notes)
 
         self.init_ui()
         self.load_transcript()
-        self.start_notes_generation()
+        if partial_text:
+            self.restore_partial(partial_text)
+        else:
+            self.start_notes_generation()
 
     
 
@@ -402,6 +3497,7 @@ class YouTubeNotesView(QWidget):
             }
         """)
         self.notes_panel.setOpenExternalLinks(True)
+        self.notes_panel.document().setDefaultStyleSheet(NOTES_SCREEN_CSS)
         notes_layout.addWidget(self.notes_panel, 1)
 
         self.continue_button = QPushButton("Generate PDF")
@@ -421,8 +3517,39 @@ class YouTubeNotesView(QWidget):
                 color: #666666;
             }
         """)
-        self.continue_button.clicked.connect(self.on_continue_clicked)
-        notes_layout.addWidget(self.continue_button)
+        self.continue_button.clicked.connect(self.on_continue_clicked)
+
+        self.export_format = QComboBox()
+        self.export_format.addItems(list(EXPORT_FORMATS))
+        self.export_format.setFixedHeight(36)
+        self.export_format.setStyleSheet("""
+            QComboBox {
+                background-color: #2a1e42;
+                color: #00ff88;
+                border: none;
+                border-radius: 8px;
+                padding: 0 10px;
+                font-size: 13px;
+            }
+            QComboBox::drop-down {
+                border: none;
+            }
+        """)
+        self.export_format.setCurrentText(
+            QSettings("Abhiiishek-rana", "FAIL-UP").value("export_format", "PDF", type=str)
+        )
+        self.export_format.currentTextChanged.connect(self.on_export_format_changed)
+        self.on_export_format_changed(self.export_format.currentText())
+
+        export_layout = QHBoxLayout()
+        export_layout.addWidget(self.continue_button, 1)
+        export_layout.addWidget(self.export_format)
+        notes_layout.addLayout(export_layout)
+
+        self.export_status = QLabel()
+        self.export_status.setStyleSheet("color: #a0a0a0; font-size: 11px; padding-top: 4px;")
+        self.export_status.hide()
+        notes_layout.addWidget(self.export_status)
 
         self.splitter.addWidget(video_container)
         self.splitter.addWidget(notes_container)
@@ -442,196 +3569,166 @@ class YouTubeNotesView(QWidget):
         try:
             with open(self.transcript_file, "r", encoding="utf-8") as f:
                 self.transcript = f.read()
+            if self.low_resource:
+                self.transcript = compress_transcript(self.transcript)
         except Exception as e:
             self.notes_panel.setPlainText(f"Error loading transcript: {str(e)}")
 
-    def get_loading_indicator(self):
-        return """
+    def get_loading_indicator(self, message="Generating notes..."):
+        return f"""
         <div style="text-align: center; padding: 20px;">
-            <div style="margin-bottom: 15px; color: #b388ff;">Generating notes...</div>
+            <div style="margin-bottom: 15px; color: #b388ff;">{message}</div>
             <div style="width: 50px; height: 50px; margin: 0 auto;
                 border: 5px solid #3a0841;
                 border-top: 5px solid #7c4dff;
                 border-radius: 50%;
                 animation: spin 1s linear infinite;"></div>
             <style>
-                @keyframes spin {
-                    0% { transform: rotate(0deg); }
-                    100% { transform: rotate(360deg); }
-                }
+                @keyframes spin {{
+                    0% {{ transform: rotate(0deg); }}
+                    100% {{ transform: rotate(360deg); }}
+                }}
             </style>
         </div>
         """
 
-    def process_text_chunk(self, text):
-        result = ""
-        remaining = text
-        while remaining:
-            if not self.in_think_block:
-                think_start = remaining.find('<think>')
-                if think_start >= 0:
-                    result += remaining[:think_start]
-                    remaining = remaining[think_start + len('<think>'):]
-                    self.in_think_block = True
-                else:
-                    result += remaining
-                    break
-            else:
-                think_end = remaining.find('</think>')
-                if think_end >= 0:
-                    remaining = remaining[think_end + len('</think>'):]
-                    self.in_think_block = False
-                else:
-                    self.pending_think_content += remaining
-                    remaining = ""
-        return result
-
-    def append_to_notes_panel(self, text):
-        if self.pending_think_content:
-            text = self.pending_think_content + text
-            self.pending_think_content = ""
-        
-        clean_text = self.process_text_chunk(text)
-        if clean_text and not self.in_think_block:
-            self.current_markdown += clean_text
-            html = self.markdown_to_html(self.current_markdown, for_pdf=False)
-            if self.in_think_block:
-                html += self.get_loading_indicator()
-            self.notes_panel.setHtml(html)
-            self.notes_panel.moveCursor(QTextCursor.End)
-
-    def markdown_to_html(self, markdown_text, for_pdf=False):
-        clean_text = re.sub(r'<style.*?>.*?</style>', '', markdown_text, flags=re.DOTALL)
-        clean_text = re.sub(r'style="[^"]*"', '', clean_text)
-        clean_text = re.sub(r'```html?', '', clean_text)
-        clean_text = re.sub(r'```', '', clean_text)
-        html = markdown.markdown(clean_text)
-        soup = BeautifulSoup(html, 'html.parser')
-        for pre in soup.find_all('pre'):
-            if not pre.code:
-                pre.wrap(soup.new_tag('code'))\
-        
-        for a in soup.find_all('a', href=True):
-            a['target'] = '_blank'
-            a['rel'] = 'noopener noreferrer'
-
-
-        style = soup.new_tag('style')
-        style.string = """
-        body {
-            color: #000000;
-            font-family: 'Georgia', 'Times New Roman', serif;
-            font-size: 12pt;
-            line-height: 1.6;
-            margin: 0;
-            padding: 0;
-        }
-        h1, h2, h3, h4 {
-            color: #000000;
-            font-weight: bold;
-            margin-top: 1.2em;
-            margin-bottom: 0.5em;
-        }
-        p {
-            margin: 0.75em 0;
-        }
-        ul, ol {
-            margin: 0.75em 0 0.75em 2em;
-            padding-left: 1em;
-        }
-        li {
-            margin-bottom: 0.25em;
-        }
-        blockquote {
-            border-left: 3px solid #888;
-            padding-left: 10px;
-            margin-left: 0;
-            color: #444;
-            font-style: italic;
-        }
-        code {
-            font-family: 'Courier New', monospace;
-            background-color: #f0f0f0;
-            padding: 2px 4px;
-            border-radius: 4px;
-        }
-        pre {
-            font-family: 'Courier New', monospace;
-            background-color: #f0f0f0;
-            padding: 10px;
-            border-radius: 4px;
-            white-space: pre-wrap;
-        }
-        table {
-            width: 100%;
-            border-collapse: collapse;
-            margin: 1em 0;
-        }
-        th, td {
-            border: 1px solid #ccc;
-            padding: 8px;
-            text-align: left;
-        }
-        a {
-            color: #1a0dab;
-            text-decoration: none;
-        }
-        a:hover {
-            text-decoration: underline;
-        }
-    """
-        if for_pdf:
-            style.string += """
-        body {
-            color: #000000;
-            font-size: 12pt;
-        }
-        h1, h2, h3, h4 {
-            color: #000000;
-        }
-        blockquote {
-            border-color: #888;
-            color: #444;
-        }
-        code, pre {
-            background-color: #f0f0f0;
-            color: #000000;
-        }
-        a {
-            color: #1a0dab;
-        }
-        """
-        else:
-            style.string += """
-        body {
-            color: #e0e0e0;
-            background-color: #1a1426;
-        }
-        h1, h2, h3, h4 {
-            color: #b388ff;
-        }
-        a {
-            color: #7c4dff;
-        }
-        """
-        if soup.head:
-            soup.head.insert(0, style)
-        elif soup.html:
-            soup.html.insert(0, style)
+    def reset_render_state(self):
+        self.buffer_generation = self.notes_buffer.generation
+        self.notes_format = None
+        self.notes_sanitizer = None
+        self.notes_body = ""
+        self.settled_length = 0
+        self.markdown_tail = ""
+        self.rendered_length = 0
+        # What the panel already shows: the settled part of notes_body, then a tail redrawn on each flush
+        self.panel_settled = None
+        self.panel_tail_at = 0
+
+    def on_output_ready(self):
+        if self.low_resource:
+            if not self.render_timer.isActive():
+                self.render_timer.start()
+            return
+        self.refresh_notes()
+
+    def refresh_notes(self):
+        with Tracer.instance().span(self.trace_job, "render.flush", chars=len(self.notes_buffer)):
+            self.update_notes_body()
+            self.render_notes()
+        if self.job is not None and time.monotonic() - self.journaled_at >= JOURNAL_PARTIAL_SECONDS:
+            self.journal_partial()
+
+    def journal_partial(self):
+        # Appends only what is new, so the partial file up to the journaled offset is always whole
+        self.journaled_at = time.monotonic()
+        generation, text, length = self.notes_buffer.peek(self.journaled_length, self.journaled_generation)
+        # A hedge switch or retry clears the buffer; the partial file then starts over
+        append = generation == self.journaled_generation and self.journaled_length > 0
+        if not text and append:
+            return
+        try:
+            with open(self.partial_path(), "a" if append else "w", encoding="utf-8") as f:
+                f.write(text)
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError:
+            return
+        self.journaled_generation = generation
+        self.journaled_length = length
+        self.journal.record(self.job, "partial", partial_path=self.partial_path(), offset=self.journaled_length)
+
+    def partial_path(self):
+        # Per job, since a rerun of the same transcript shares the job directory
+        return os.path.join(os.path.dirname(os.path.abspath(self.transcript_file)), f"{self.job}.partial.txt")
+
+    def update_notes_body(self, final=False):
+        generation, new_text = self.notes_buffer.read(self.rendered_length, self.buffer_generation)
+        if generation != self.buffer_generation:
+            # A hedge switch restarted the output before its reset signal got here
+            self.reset_render_state()
+            self.buffer_generation = generation
+        if self.notes_format is None:
+            self.notes_format = detect_notes_format(new_text, final=final)
+            if self.notes_format is None:
+                # Too little to tell yet; it is read again from the same offset next time
+                return
+            if self.notes_format == "html":
+                self.notes_sanitizer = NotesHtmlSanitizer()
+        self.rendered_length += len(new_text)
+        if self.notes_format == "html":
+            # Only the new text goes through the sanitizer
+            self.notes_body += self.notes_sanitizer.feed_text(new_text)
+            if final:
+                self.notes_body += self.notes_sanitizer.close_text()
+            self.settled_length = len(self.notes_body) if final else self.notes_sanitizer.settled_length
+        elif self.notes_format == "markdown":
+            if final:
+                # Rendered whole once, so lists split by blank lines come out as they would in an export
+                self.notes_body = render_notes_body(self.notes_buffer.text(), notes_format="markdown")
+                self.settled_length = len(self.notes_body)
+                self.markdown_tail = ""
+                self.panel_settled = None
+                return
+            settled, self.markdown_tail = split_settled_markdown(self.markdown_tail + new_text)
+            body = self.notes_body[:self.settled_length]
+            if settled:
+                body += render_notes_body(settled, notes_format="markdown")
+                self.settled_length = len(body)
+            self.notes_body = body + render_notes_body(self.markdown_tail, notes_format="markdown")
+
+    def render_notes(self):
+        if not self.notes_body:
+            self.notes_panel.setHtml(
+                self.get_loading_indicator("Thinking..." if self.is_thinking else "Generating notes...")
+            )
+            self.panel_settled = None
+            return
+        scroll_bar = self.notes_panel.verticalScrollBar()
+        following = scroll_bar.value() >= scroll_bar.maximum() - 4
+        position = scroll_bar.value()
+        cursor = QTextCursor(self.notes_panel.document())
+        if self.panel_settled is None:
+            self.notes_panel.clear()
+            self.panel_settled = 0
+            self.panel_tail_at = 0
         else:
-            soup.insert(0, style)
-
-        return str(soup)
+            cursor.setPosition(self.panel_tail_at)
+            cursor.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
+            cursor.removeSelectedText()
+        # Only what settled since the last flush is added; the unfinished tail is all that is redrawn
+        if self.settled_length > self.panel_settled:
+            append_html(cursor, self.notes_body[self.panel_settled:self.settled_length])
+            self.panel_settled = self.settled_length
+        cursor.movePosition(QTextCursor.End)
+        self.panel_tail_at = cursor.position()
+        tail = self.notes_body[self.settled_length:]
+        if self.is_thinking:
+            tail += self.get_loading_indicator("Thinking...")
+        if tail:
+            append_html(cursor, tail)
+        scroll_bar.setValue(scroll_bar.maximum() if following else position)
+
+    def on_thinking(self, active):
+        self.is_thinking = active
+        self.render_notes()
 
+    def markdown_to_html(self, markdown_text, for_pdf=False):
+        return build_notes_document(render_notes_body(markdown_text), for_pdf=for_pdf)
 
     def start_notes_generation(self):
         if not hasattr(self, 'transcript'):
             return
         
         self.notes_panel.setHtml(self.get_loading_indicator())
-        self.current_markdown = ""
-        self.pending_think_content = ""
-        self.in_think_block = False
+        # A fresh buffer per run, so a worker still winding down cannot write into the new one
+        self.notes_buffer = NotesBuffer()
+        self.bundle_path = None
+        self.is_thinking = False
+        self.reset_render_state()
+        self.journaled_generation = self.notes_buffer.generation
+        self.journaled_length = 0
+        self.journaled_at = time.monotonic()
+        self.journal.record(self.job, "generating", llm_type=self.llm_type, model=self.model)
         self.continue_button.setEnabled(False)
         QApplication.processEvents()
 
@@ -640,86 +3737,154 @@ class YouTubeNotesView(QWidget):
             self.transcript,
             llm_type=self.llm_type,
             model=self.model,
-            api_key=self.api_key
+            api_key=self.api_key,
+            hedge=self.hedge,
+            ollama_options=self.ollama_options,
+            trace_job=self.trace_job,
+            ollama_host=self.ollama_host,
+            notes_buffer=self.notes_buffer,
+            job=self.job
         )
         self.notes_worker.moveToThread(self.notes_thread)
 
-        self.notes_worker.chunk_received.connect(self.append_to_notes_panel)
+        self.notes_worker.output_ready.connect(self.on_output_ready)
+        self.notes_worker.thinking.connect(self.on_thinking)
+        self.notes_worker.rate_limited.connect(self.on_rate_limited)
+        self.notes_worker.reset.connect(self.on_generation_reset)
+        self.notes_worker.hedge_decided.connect(self.on_hedge_decided)
+        self.notes_worker.metrics.connect(self.on_generation_metrics)
         self.notes_worker.finished.connect(self.on_notes_generated)
         self.notes_worker.error.connect(self.on_notes_error)
         self.notes_thread.started.connect(self.notes_worker.generate_notes)
-        self.notes_thread.finished.connect(self.notes_thread.deleteLater)
+        JobRegistry.instance().track_thread(self.job, self.notes_thread, self.notes_worker)
 
         self.notes_thread.start()
 
     def on_notes_generated(self, notes):
+        self.render_timer.stop()
+        self.update_notes_body(final=True)
+        self.render_notes()
+        self.save_bundle()
+        self.journal.record(self.job, "generated", bundle_path=self.bundle_path)
         self.continue_button.setEnabled(True)
         self.notes_thread.quit()
         self.notes_thread.wait()
 
+    def restore_partial(self, text):
+        # Notes cut off by the last exit, kept as they are instead of generating them again
+        self.notes_buffer.append(text)
+        self.update_notes_body(final=True)
+        self.render_notes()
+        self.save_bundle()
+        self.journal.record(self.job, "generated", bundle_path=self.bundle_path, restored=True)
+        self.continue_button.setEnabled(True)
+
+    def save_bundle(self):
+        # Keeps the raw output so the notes can be re-exported later without the model
+        if not len(self.notes_buffer):
+            return
+        body = self.current_body()
+        metadata = dict(self.notes_metadata(body), notes_format=self.notes_format,
+                        created_at=datetime.now().isoformat(timespec="seconds"))
+        # Kept in the job's own directory, beside the transcript it was generated from
+        bundle_path = os.path.join(os.path.dirname(os.path.abspath(self.transcript_file)), f"{uuid.uuid4().hex}.zip")
+        try:
+            write_bundle(bundle_path, self.notes_buffer.text(), body, metadata)
+            self.bundle_path = bundle_path
+        except OSError as e:
+            self.show_notification(f"Could not save notes bundle: {str(e)}")
+
+    def current_body(self):
+        return self.notes_body if self.notes_format else render_notes_body(self.notes_buffer.text())
+
+    def notes_metadata(self, body):
+        metrics = self.generation_metrics or {}
+        return {
+            "video_id": self.video_id,
+            "title": extract_title(body),
+            "model": metrics.get("model", self.model),
+            "backend": metrics.get("llm_type", self.llm_type),
+            "generation_seconds": metrics.get("total_seconds"),
+            "prompt_tokens": metrics.get("prompt_tokens"),
+            "output_tokens": metrics.get("output_tokens"),
+        }
+
+    def on_generation_reset(self):
+        self.render_timer.stop()
+        self.notes_panel.setHtml(self.get_loading_indicator())
+        self.is_thinking = False
+        # The worker has already cleared the buffer; only the view's read position goes back
+        self.reset_render_state()
+        self.journaled_length = 0
+
+    def on_hedge_decided(self, winner, reason):
+        settings = QSettings("Abhiiishek-rana", "FAIL-UP")
+        key = f"hedge_wins/{winner}"
+        settings.setValue(key, settings.value(key, 0, type=int) + 1)
+        if winner != self.llm_type:
+            self.show_notification(f"Switched to {winner} ({reason})")
+
+    def on_generation_metrics(self, metrics):
+        self.generation_metrics = metrics
+        router = BackendRouter.instance()
+        if self.route:
+            router.complete(self.route, metrics)
+        else:
+            router.record(metrics)
+
+    def on_rate_limited(self, delay):
+        self.show_notification(f"OpenRouter rate limit reached, retrying in {delay:.0f}s")
+
     def on_notes_error(self, error_msg):
         self.notes_panel.setHtml(f"""
         <div style='color: #ff6b6b; padding: 10px; border-left: 3px solid #ff6b6b; margin-left: 0;'>
             Error generating notes: {error_msg}
         </div>
         """)
+        self.journal.record(self.job, "failed", error=error_msg)
         self.continue_button.setEnabled(True)
         self.notes_thread.quit()
         self.notes_thread.wait()
 
+    def on_export_format_changed(self, export_format):
+        self.continue_button.setText(f"Generate {export_format}")
+        QSettings("Abhiiishek-rana", "FAIL-UP").setValue("export_format", export_format)
+
     def on_continue_clicked(self):
+        export_format = self.export_format.currentText()
         try:                                                           
-            html_content = self.markdown_to_html(self.current_markdown, for_pdf=True)
-            soup = BeautifulSoup(html_content, 'html.parser')
-            main_heading = "notes"
-            h1 = soup.find('h1')
-            if h1:
-                main_heading = h1.get_text().strip()
-                main_heading = re.sub(r'[^\w\-_\. ]', '', main_heading)
-                if len(main_heading) > 50:
-                    main_heading = main_heading[:50]
-            
-            if not os.path.exists("output"):
-                os.makedirs("output")
-            
-            filename = f"output/{main_heading}.pdf" 
-            
-            with sync_playwright() as p:
-                browser = p.chromium.launch()
-                page = browser.new_page() 
-                page.set_content(html_content) 
-                page.pdf(
-                    path=filename,
-                    print_background=True,
-                    format='A4',
-                    margin={
-                        'top': '15mm',
-                        'right': '15mm',
-                        'bottom': '15mm',
-                        'left': '15mm'
-                    },
-                    display_header_footer=True,
-                    header_template='<div style="height: 0;"></div>',
-                    footer_template='<div style="font-size: 10px; width: 100%; text-align: center;"><span class="pageNumber"></span></div>',
-                    prefer_css_page_size=True
-                )
-                browser.close()
+            body = self.current_body()
             
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+            if export_format != "PDF":
+                title = extract_title(body)
+                filename = unique_path(notes_filename(title, EXPORT_FORMATS[export_format]))
+                with Tracer.instance().span(self.trace_job, f"export.{export_format.lower()}"):
+                    NOTES_EXPORTERS[export_format](body, title, filename)
+                self.show_notification(f"{export_format} saved as: {filename}")
+                return
+
+            with Tracer.instance().span(self.trace_job, "pdf.prepare"):
+                html_content = build_notes_document(body, for_pdf=True)
+                metadata = dict(self.notes_metadata(body), bundle_path=self.bundle_path, text=html_to_text(body))
+            filename = notes_filename(metadata["title"])
+
             if self.parent_window:
-                self.parent_window.load_pdf_list()
-                self.parent_window.stacked_layout.setCurrentWidget(self.parent_window.pdf_list_view)
-                
-                for i in range(self.parent_window.pdf_list.count()):
-                    item = self.parent_window.pdf_list.item(i)
-                    if os.path.basename(item.data(Qt.UserRole)) == os.path.basename(filename):
-                        self.parent_window.pdf_list.setCurrentItem(item)
-                        self.parent_window.open_pdf(item)
-                        break
-                
-                self.parent_window.show_notification(f"PDF saved as: {filename}")
+                filename, queued = self.parent_window.export_pdf(html_content, filename, metadata,
+                                                                 trace_job=self.trace_job, job=self.job)
+                self.export_status.setText(
+                    f"Queued {os.path.basename(filename)} ({queued} in queue)" if queued > 1
+                    else f"Exporting {os.path.basename(filename)}..."
+                )
+                self.export_status.show()
             
         except Exception as e:
-            self.show_notification(f"Error generating PDF: {str(e)}")
+            self.show_notification(f"Error generating {export_format}: {str(e)}")
+
+    def on_export_progress(self, filename, stage, percent):
+        self.export_status.setText(f"{os.path.basename(filename)}: {stage} ({percent}%)")
+        self.export_status.show()
 
     def show_notification(self, message):
         notification = QLabel(message, self)
@@ -744,6 +3909,211 @@ class YouTubeNotesView(QWidget):
         self.splitter.setSizes([self.width() // 2, self.width() // 2])
         super().resizeEvent(event)
 
+TRACE_COLORS = {"transcript": "#4fc3f7", "llm": "#b388ff", "render": "#00ff88", "pdf": "#ffb74d", "export": "#ffb74d"}
+TRACE_REFRESH_MS = 1000
+
+
+class TraceWaterfall(QWidget):
+    ROW_HEIGHT = 22
+    LABEL_WIDTH = 170
+    AXIS_HEIGHT = 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+        self.origin = 0.0
+        self.total = 1.0
+
+    def set_spans(self, spans):
+        # One row per stage; repeated spans such as render flushes share their row
+        rows = {}
+        for span in sorted(spans, key=lambda span: span["start"]):
+            rows.setdefault(span["name"], []).append(span)
+        self.rows = list(rows.items())
+        if spans:
+            self.origin = min(span["start"] for span in spans)
+            self.total = max(max(span["start"] + span["duration"] for span in spans) - self.origin, 1e-3)
+        self.setMinimumHeight(self.AXIS_HEIGHT + self.ROW_HEIGHT * max(len(self.rows), 1) + 10)
+        self.update()
+
+    def bar_rect(self, row, span):
+        width = max(self.width() - self.LABEL_WIDTH - 10, 1)
+        x = self.LABEL_WIDTH + (span["start"] - self.origin) / self.total * width
+        y = self.AXIS_HEIGHT + row * self.ROW_HEIGHT
+        return QRectF(x, y + 4, max(span["duration"] / self.total * width, 2), self.ROW_HEIGHT - 8)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#1f1a30"))
+        painter.setPen(QColor("#a0a0a0"))
+        if not self.rows:
+            painter.drawText(self.rect(), Qt.AlignCenter, "No spans recorded for this job")
+            return
+        painter.drawText(QRect(self.LABEL_WIDTH, 0, self.width() - self.LABEL_WIDTH - 10, self.AXIS_HEIGHT),
+                         Qt.AlignVCenter | Qt.AlignRight, f"{self.total:.2f}s")
+        metrics = painter.fontMetrics()
+        for row, (name, spans) in enumerate(self.rows):
+            y = self.AXIS_HEIGHT + row * self.ROW_HEIGHT
+            total = sum(span["duration"] for span in spans)
+            label = f"{name} ×{len(spans)} {total:.2f}s" if len(spans) > 1 else f"{name} {total:.2f}s"
+            painter.setPen(QColor("#e0e0e0"))
+            painter.drawText(QRect(5, y, self.LABEL_WIDTH - 10, self.ROW_HEIGHT), Qt.AlignVCenter,
+                             metrics.elidedText(label, Qt.ElideRight, self.LABEL_WIDTH - 10))
+            color = QColor(TRACE_COLORS.get(name.split(".")[0], "#a0a0a0"))
+            for span in spans:
+                painter.fillRect(self.bar_rect(row, span),
+                                 QColor("#ff6b6b") if "error" in span.get("attrs", {}) else color)
+
+    def span_at(self, pos):
+        row = (pos.y() - self.AXIS_HEIGHT) // self.ROW_HEIGHT
+        if not 0 <= row < len(self.rows):
+            return None
+        for span in self.rows[row][1]:
+            if self.bar_rect(row, span).adjusted(-2, 0, 2, 0).contains(pos):
+                return span
+        return None
+
+    def event(self, event):
+        if event.type() == QEvent.ToolTip:
+            span = self.span_at(event.pos())
+            if span is None:
+                QToolTip.hideText()
+            else:
+                lines = [f"{span['name']}: {span['duration'] * 1000:.1f}ms at +{span['start'] - self.origin:.2f}s"]
+                lines += [f"{key}: {value}" for key, value in span.get("attrs", {}).items()]
+                QToolTip.showText(event.globalPos(), "\n".join(lines), self)
+            return True
+        return super().event(event)
+
+
+def summarize_trace(spans):
+    by_name = {}
+    for span in spans:
+        by_name.setdefault(span["name"], []).append(span)
+    parts = []
+    fetches = by_name.get("transcript.fetch", [])
+    if fetches:
+        parts.append(f"transcript {sum(span['duration'] for span in fetches):.2f}s in {len(fetches)} attempt(s)")
+    for span in by_name.get("llm.prefill", [])[-1:]:
+        parts.append(f"first token {span['duration']:.2f}s")
+    for span in by_name.get("llm.decode", [])[-1:]:
+        parts.append(f"decode {span['attrs'].get('tokens_per_second', 0)} tokens/s")
+    flushes = by_name.get("render.flush", [])
+    if flushes:
+        durations = [span["duration"] * 1000 for span in flushes]
+        parts.append(f"{len(flushes)} renders, {sum(durations) / len(durations):.1f}ms avg, {max(durations):.1f}ms max")
+    pdf = [span for name, group in by_name.items() if name.startswith("pdf.") for span in group]
+    if pdf:
+        parts.append(f"PDF {sum(span['duration'] for span in pdf):.2f}s")
+    return "  |  ".join(parts) or "Nothing measured yet"
+
+
+class PerformancePanel(QWidget):
+    def __init__(self, tracer, settings, parent=None):
+        super().__init__(parent, Qt.Window)
+        self.tracer = tracer
+        self.settings = settings
+        self.setWindowTitle("Performance")
+        self.resize(900, 420)
+        self.setStyleSheet("""
+            QWidget { background-color: #1f1a30; color: #e0e0e0; }
+            QComboBox, QPushButton {
+                background-color: #2a2540;
+                border: 1px solid #b388ff;
+                border-radius: 4px;
+                padding: 4px 8px;
+            }
+            QPushButton:hover { background-color: #3a3450; }
+        """)
+
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        self.tracing_checkbox = QCheckBox("Record traces")
+        self.tracing_checkbox.setChecked(tracer.enabled)
+        self.tracing_checkbox.toggled.connect(self.on_tracing_toggled)
+        self.job_dropdown = QComboBox()
+        self.job_dropdown.setMinimumWidth(300)
+        self.job_dropdown.currentIndexChanged.connect(self.show_selected_job)
+        open_button = QPushButton("Open Trace Folder")
+        open_button.clicked.connect(self.open_trace_folder)
+        controls.addWidget(self.tracing_checkbox)
+        controls.addWidget(self.job_dropdown, 1)
+        controls.addWidget(open_button)
+        layout.addLayout(controls)
+
+        self.summary_label = QLabel()
+        self.summary_label.setStyleSheet("color: #a0a0a0; font-size: 11px;")
+        self.summary_label.setWordWrap(True)
+        layout.addWidget(self.summary_label)
+
+        self.lifecycle_label = QLabel()
+        self.lifecycle_label.setStyleSheet("color: #a0a0a0; font-size: 11px;")
+        layout.addWidget(self.lifecycle_label)
+
+        self.waterfall = TraceWaterfall()
+        scroll_area = QScrollArea()
+        scroll_area.setWidgetResizable(True)
+        scroll_area.setWidget(self.waterfall)
+        layout.addWidget(scroll_area, 1)
+
+        self.jobs = []
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(TRACE_REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def on_tracing_toggled(self, enabled):
+        self.tracer.set_enabled(enabled)
+        self.settings.setValue("tracing_enabled", enabled)
+
+    def refresh(self):
+        counts = JobRegistry.instance().counts()
+        self.lifecycle_label.setText("Live: " + ", ".join(f"{counts[kind]} {kind}" for kind in ("jobs",) + JOB_RESOURCE_KINDS))
+        selected = self.job_dropdown.currentData()
+        self.jobs = self.tracer.recent_jobs()
+        self.job_dropdown.blockSignals(True)
+        self.job_dropdown.clear()
+        for job in self.jobs:
+            started = datetime.fromtimestamp(job["started"]).strftime("%H:%M:%S")
+            self.job_dropdown.addItem(f"{started}  {job['label']}  ({len(job['spans'])} spans)", job["id"])
+        index = self.job_dropdown.findData(selected)
+        self.job_dropdown.setCurrentIndex(index if index >= 0 else 0)
+        self.job_dropdown.blockSignals(False)
+        self.show_selected_job()
+
+    def show_selected_job(self):
+        job_id = self.job_dropdown.currentData()
+        spans = next((job["spans"] for job in self.jobs if job["id"] == job_id), [])
+        self.waterfall.set_spans(spans)
+        if not self.jobs:
+            self.summary_label.setText(
+                "No jobs traced yet" if self.tracer.enabled else "Turn on Record traces, then generate some notes"
+            )
+        else:
+            self.summary_label.setText(summarize_trace(spans))
+
+    def open_trace_folder(self):
+        folder_path = os.path.dirname(self.tracer.path)
+        os.makedirs(folder_path, exist_ok=True)
+        try:
+            if sys.platform == "win32":
+                os.startfile(folder_path)
+            elif sys.platform == "darwin":
+                subprocess.run(["open", folder_path])
+            else:
+                subprocess.run(["xdg-open", folder_path])
+        except Exception:
+            pass
+
+
 class SplashScreen(QDialog):
     finished = Signal()
 
@@ -872,6 +4242,9 @@ class UpdateButton(QPushButton):
         self.setGraphicsEffect(glow)
 
 class IconOnlyButtonApp(QWidget):
+    embedding_requested = Signal(int, str)
+    query_requested = Signal(str)
+
     def __init__(self):
         super().__init__()
         self.setWindowTitle("FAIL UP")
@@ -887,6 +4260,40 @@ class IconOnlyButtonApp(QWidget):
         self.current_llm_type = self.settings.value("llm_type", "local")
         self.current_model = self.settings.value("model", "qwen3:4b")
         self.api_key = self.settings.value("api_key", "")
+        self.ollama_host = self.settings.value("ollama_host", "", type=str)
+        self.openrouter_base_url = self.settings.value("openrouter_base_url", "", type=str)
+        OpenRouterClient.instance().set_base_url(self.openrouter_base_url)
+        self.local_model = self.settings.value(
+            "local_model", self.current_model if self.current_llm_type == "local" else "qwen3:4b"
+        )
+        self.openrouter_model = self.settings.value(
+            "openrouter_model", self.current_model if self.current_llm_type == "openrouter" else "qwen/qwen3-8b:free"
+        )
+        self.hedge_enabled = self.settings.value("hedge_enabled", False, type=bool)
+        self.hedge_deadline = self.settings.value("hedge_deadline", 20.0, type=float)
+        self.hedge_min_rate = self.settings.value("hedge_min_rate", 5.0, type=float)
+        self.route_enabled = self.settings.value("route_enabled", False, type=bool)
+        self.semantic_enabled = self.settings.value("semantic_enabled", False, type=bool)
+        self.embedding_model = self.settings.value("embedding_model", EMBEDDING_MODEL)
+        self.optimize_pdfs = self.settings.value("optimize_pdfs", False, type=bool)
+        self.youtube_cache_mb = self.settings.value("youtube_cache_mb", YOUTUBE_CACHE_MB, type=int)
+        self.resource_monitor = ResourceMonitor()
+        self.low_resource = self.settings.value("low_resource", False, type=bool)
+        self.memory_budget_mb = self.settings.value("memory_budget_mb", LOW_RESOURCE_MEMORY_MB, type=int)
+        self.cpu_threads = self.settings.value("cpu_threads", max(1, (os.cpu_count() or 2) // 2), type=int)
+        self.ollama_model_sizes = {}
+        self.budget_warned = False
+        self.tracer = Tracer.instance()
+        self.tracer.set_enabled(self.settings.value("tracing_enabled", False, type=bool))
+        self.trace_job = None
+        self.job_registry = JobRegistry.instance()
+        self.current_job = None
+        self.library_job = self.job_registry.new_job("library")
+        self.journal = JobJournal.instance()
+        self.export_jobs = {}
+        self.performance_panel = None
+        # Deliberately not in the UI: the panel is a diagnostics tool
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, self.show_performance_panel)
         
         self.previous_size = QSize(800, 600)
         self.previous_state = Qt.WindowNoState
@@ -896,12 +4303,20 @@ class IconOnlyButtonApp(QWidget):
         self.stacked_layout = QStackedLayout()
         self.setLayout(self.stacked_layout)
 
+        self.library = NotesLibrary(data_path("library.db"))
+        self.youtube_notes_view = None
+
         self.create_main_view()
         self.create_youtube_view()
         self.create_pdf_views()
         self.create_settings_ui()
 
-        self.youtube_notes_view = None
+        self.export_queue = PdfExportQueue(self)
+        self.export_queue.finished.connect(self.on_pdf_exported)
+        self.export_queue.error.connect(self.on_pdf_export_error)
+        self.pdf_optimizer = PdfOptimizer(self)
+        self.pdf_optimizer.optimized.connect(self.on_pdf_optimized)
+        self.pdf_optimizer.error.connect(self.on_pdf_optimize_error)
 
         self.stacked_layout.setCurrentWidget(self.main_view)
         
@@ -909,6 +4324,87 @@ class IconOnlyButtonApp(QWidget):
         self.notification_timer = QTimer()
         self.notification_timer.setSingleShot(True)
         self.notification_timer.timeout.connect(self.clear_notification)
+        # After the window is up, so the question has something to sit on
+        QTimer.singleShot(0, self.offer_resume)
+
+    def offer_resume(self):
+        jobs = self.journal.unfinished()
+        self.journal.compact({state["job"] for state in jobs})
+        self.prune_job_files(jobs)
+        if not jobs:
+            return
+        lines = []
+        for state in jobs:
+            when = datetime.fromtimestamp(state["time"]).strftime("%d %b %H:%M")
+            if state["stage"] in JOURNAL_RESUMABLE_STAGES:
+                detail = {"started": "fetching the transcript", "transcript": "transcript ready",
+                          "generating": f"generating, {state.get('offset', 0)} characters saved"}[state["stage"]]
+                lines.append(f"{when}  {state.get('video_id', 'video')}: {detail}")
+            for filename in state["exports"]:
+                lines.append(f"{when}  exporting {os.path.basename(filename)}")
+        reply = QMessageBox.question(
+            self, "Resume Unfinished Notes",
+            "These jobs were still running when FAIL-UP last closed:\n\n" + "\n".join(lines)
+            + "\n\nPick them up where they stopped?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+        )
+        if reply != QMessageBox.Yes:
+            for state in jobs:
+                self.journal.record(state["job"], "discarded")
+            return
+        generation = None
+        for state in jobs:
+            for filename, bundle_path in state["exports"].items():
+                if os.path.exists(filename):
+                    # Written in full before the exit, only the journal entry was missing
+                    self.journal.record(state["job"], "exported", filename=filename)
+                elif bundle_path and os.path.exists(bundle_path):
+                    self.reexport_pdf(bundle_path, job=state["job"], filename=filename)
+                else:
+                    self.journal.record(state["job"], "export_failed", filename=filename, error="bundle missing")
+            if state["stage"] in JOURNAL_RESUMABLE_STAGES:
+                # One notes view at a time: the newest job is resumed, older ones are let go
+                if generation is None and state.get("video_id"):
+                    generation = state
+                else:
+                    self.journal.record(state["job"], "discarded")
+        if generation is not None:
+            self.resume_generation(generation)
+
+    def prune_job_files(self, jobs):
+        keep = self.library.bundle_paths()
+        for state in jobs:
+            keep.update(state.get(key) for key in ("transcript_file", "bundle_path", "partial_path"))
+            keep.update(state["exports"].values())
+        prune_job_dirs(keep)
+
+    def resume_generation(self, state):
+        video_id = state["video_id"]
+        self.show_youtube()
+        self.web_view.load(QUrl(f"{YOUTUBE_URL}/watch?v={video_id}"))
+        self.current_video_id = video_id
+        self.current_job = state["job"]
+        self.trace_job = self.tracer.new_job(video_id)
+        transcript_file = state.get("transcript_file")
+        if transcript_file and os.path.exists(transcript_file):
+            partial_text = self.journal.partial_text(state)
+            if partial_text:
+                reply = QMessageBox.question(
+                    self, "Resume Notes",
+                    f"{len(partial_text)} characters of notes were saved before FAIL-UP closed.\n\n"
+                    "Keep them as they are? No generates the notes again from the start.",
+                    QMessageBox.Yes | QMessageBox.No, QMessageBox.Yes
+                )
+                if reply == QMessageBox.Yes:
+                    self.on_transcript_finished(transcript_file, partial_text=partial_text)
+                    self.show_notification("Restored the notes saved before the last exit")
+                    return
+            # The transcript stage already finished, so only generation runs again
+            self.on_transcript_finished(transcript_file)
+        else:
+            self.youtube_notes_button.setEnabled(False)
+            self.show_notification("Fetching transcript...")
+            self.fetch_transcript_with_retry()
 
     def create_main_view(self):
         self.main_view = QWidget()
@@ -982,10 +4478,55 @@ class IconOnlyButtonApp(QWidget):
             }
         """)
         list_layout.addWidget(title_label)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search notes...")
+        self.search_input.setClearButtonEnabled(True)
+        self.search_input.setStyleSheet("""
+            QLineEdit {
+                background-color: #2a1e42;
+                color: #e0e0e0;
+                border: 1px solid #7c4dff;
+                border-radius: 4px;
+                padding: 6px;
+                font-size: 14px;
+            }
+        """)
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        self.search_input.returnPressed.connect(self.run_search)
+
+        self.search_mode = QComboBox()
+        self.search_mode.addItems(["Keyword", "Semantic"])
+        self.search_mode.setStyleSheet("""
+            QComboBox {
+                background-color: #2a1e42;
+                color: #e0e0e0;
+                border: 1px solid #7c4dff;
+                border-radius: 4px;
+                padding: 5px;
+            }
+            QComboBox::drop-down {
+                border: none;
+            }
+        """)
+        self.search_mode.currentIndexChanged.connect(self.run_search)
+        search_layout = QHBoxLayout()
+        search_layout.addWidget(self.search_input, 1)
+        search_layout.addWidget(self.search_mode)
+        list_layout.addLayout(search_layout)
         
-        self.pdf_list = QListWidget()
+        self.thumbnails = ThumbnailCache(data_path("thumbs"), self, threads=1 if self.low_resource else 2)
+        self.notes_model = NotesListModel(self.library, self.thumbnails, self)
+        self.pdf_list = QListView()
+        self.pdf_list.setModel(self.notes_model)
+        self.pdf_list.setUniformItemSizes(True)
+        self.pdf_list.setMouseTracking(True)
         self.pdf_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #1a1426;
                 color: #e0e0e0;
                 border: 1px solid #3a0841;
@@ -994,7 +4535,8 @@ class IconOnlyButtonApp(QWidget):
             }
         """)
         self.pdf_list.setItemDelegate(PDFListDelegate(self))
-        self.pdf_list.itemClicked.connect(self.show_pdf_viewer_view)
+        self.pdf_list.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.pdf_list.clicked.connect(self.on_pdf_clicked)
         
         self.pdf_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.pdf_list.customContextMenuRequested.connect(self.show_pdf_context_menu)
@@ -1057,48 +4599,257 @@ class IconOnlyButtonApp(QWidget):
         
         self.stacked_layout.addWidget(self.pdf_viewer_view)
 
-    def show_pdf_list_view(self):
+        os.makedirs(OUTPUT_DIR, exist_ok=True)
+        self.library.reconcile(OUTPUT_DIR)
         self.load_pdf_list()
+        self.backfill_thread = None
+        self.backfill_requested = False
+        self.start_library_backfill()
+        self.start_semantic_index()
+
+        self.output_watcher = OutputWatcher(OUTPUT_DIR, self)
+        self.output_watcher.added.connect(self.on_output_added)
+        self.output_watcher.removed.connect(self.on_output_removed)
+        self.output_watcher.renamed.connect(self.on_output_renamed)
+
+    def start_library_backfill(self):
+        if self.backfill_thread is not None:
+            self.backfill_requested = True
+            return
+        if not self.library.unindexed():
+            return
+        self.backfill_requested = False
+        self.backfill_thread = QThread()
+        self.backfill_worker = LibraryBackfillWorker(data_path("library.db"))
+        self.backfill_worker.moveToThread(self.backfill_thread)
+        self.backfill_thread.started.connect(self.backfill_worker.run)
+        self.backfill_worker.finished.connect(self.backfill_thread.quit)
+        self.backfill_thread.finished.connect(self.on_library_backfill_finished)
+        self.job_registry.track_thread(self.library_job, self.backfill_thread, self.backfill_worker)
+        self.backfill_thread.start()
+
+    def on_library_backfill_finished(self):
+        self.backfill_thread = None
+        if self.backfill_requested:
+            self.start_library_backfill()
+
+    def on_output_added(self, pdf_path):
+        # Our own exports are added by on_pdf_exported with their full metadata
+        if pdf_path in self.export_queue.pending or self.library.find(pdf_path) is not None:
+            return
+        try:
+            stat = os.stat(pdf_path)
+        except OSError:
+            return
+        row = self.library.add(
+            title=os.path.splitext(os.path.basename(pdf_path))[0],
+            created_at=datetime.fromtimestamp(stat.st_mtime).isoformat(timespec="seconds"),
+            file_size=stat.st_size,
+            pdf_path=pdf_path,
+        )
+        if not self.search_input.text().strip():
+            self.notes_model.insert_note(row)
+        self.start_library_backfill()
+
+    def on_output_removed(self, pdf_path):
+        row = self.library.remove(pdf_path)
+        if row is not None and self.semantic_index is not None:
+            self.semantic_index.remove(row["id"])
+        self.thumbnails.forget(pdf_path)
+        self.notes_model.remove_path(pdf_path)
+
+    def on_output_renamed(self, old_path, new_path):
+        self.library.rename(old_path, new_path)
+        self.thumbnails.forget(old_path)
+        self.notes_model.rename_path(old_path, new_path)
+
+    def start_semantic_index(self):
+        self.semantic_index = None
+        self.search_mode.setVisible(self.semantic_enabled and np is not None)
+        if not self.semantic_enabled or np is None:
+            return
+        vectors_path = data_path("embeddings", "sections.f32")
+        self.semantic_index = SemanticIndex(data_path("library.db"), vectors_path, self.embedding_model)
+        self.embedding_thread = QThread()
+        self.embedding_worker = EmbeddingWorker(data_path("library.db"), vectors_path, self.embedding_model,
+                                                self.ollama_host)
+        self.embedding_worker.moveToThread(self.embedding_thread)
+        self.embedding_requested.connect(self.embedding_worker.index_note)
+        self.query_requested.connect(self.embedding_worker.embed_query)
+        self.embedding_worker.query_embedded.connect(self.on_query_embedded)
+        self.embedding_worker.query_failed.connect(self.on_query_failed)
+        self.embedding_thread.started.connect(self.embedding_worker.backfill)
+        self.job_registry.track_thread(self.library_job, self.embedding_thread, self.embedding_worker)
+        self.embedding_thread.start()
+
+    def run_search(self):
+        text = self.search_input.text().strip()
+        if not text:
+            self.load_pdf_list()
+            return
+        if self.semantic_index is not None and self.search_mode.currentText() == "Semantic":
+            # Each query costs an embedding call, so semantic search runs on Enter only
+            if self.sender() is self.search_timer:
+                return
+            self.run_semantic_search(text)
+            return
+        try:
+            rows = self.library.search(text)
+        except sqlite3.OperationalError:
+            rows = []
+        self.notes_model.set_results([dict(row, snippet=row["snippet"].replace("\n", " ")) for row in rows])
+
+    def run_semantic_search(self, text):
+        self.show_notification("Searching...")
+        self.query_requested.emit(text)
+
+    def on_query_failed(self, text, error_msg):
+        if text == self.search_input.text().strip():
+            self.show_notification(f"Embedding failed: {error_msg}")
+
+    def on_query_embedded(self, text, vector):
+        # An answer to an older query is dropped once the search box has moved on
+        if text != self.search_input.text().strip() or self.semantic_index is None:
+            return
+        self.clear_notification()
+        rows = []
+        try:
+            for score, row in self.semantic_index.search(vector):
+                heading = f"{row['heading']}: " if row["heading"] else ""
+                rows.append(dict(row, snippet=f"{score:.2f}  {heading}{row['preview']}".replace("\n", " ")))
+        except Exception as e:
+            self.show_notification(f"Semantic search failed: {str(e)}")
+            return
+        self.notes_model.set_results(rows)
+
+    def show_pdf_list_view(self):
+        self.pause_youtube_media()
         self.stacked_layout.setCurrentWidget(self.pdf_list_view)
 
     def show_pdf_viewer_view(self, item):
-        pdf_path = item.data(Qt.UserRole)
+        self.open_pdf_path(item.data(Qt.UserRole))
+
+    def open_pdf_path(self, pdf_path):
         pdf_url = QUrl.fromLocalFile(os.path.abspath(pdf_path))
         self.pdf_web_view.load(pdf_url)
         self.stacked_layout.setCurrentWidget(self.pdf_viewer_view)
 
-    def load_pdf_list(self):
+    def pause_youtube_media(self):
         if hasattr(self, 'web_view'):
-            self.web_view.page().runJavaScript("""
-            var videos = document.getElementsByTagName('video');
-            for (var i = 0; i < videos.length; i++) {
-                videos[i].pause();
-            }
-            var audios = document.getElementsByTagName('audio');
-            for (var i = 0; i < audios.length; i++) {
-                audios[i].pause();
-            }
-        """)
-        self.pdf_list.clear()
-        
-        if not os.path.exists("output"):
-            os.makedirs("output")
+            try:
+                self.web_view.page().runJavaScript("""
+                var videos = document.getElementsByTagName('video');
+                for (var i = 0; i < videos.length; i++) {
+                    videos[i].pause();
+                }
+                var audios = document.getElementsByTagName('audio');
+                for (var i = 0; i < audios.length; i++) {
+                    audios[i].pause();
+                }
+            """)
+            except RuntimeError:
+                pass 
+
+    def load_pdf_list(self):
+        # Rows are paged in by the model as the view scrolls
+        self.notes_model.reset_all()
+
+    def on_pdf_clicked(self, index):
+        # Ctrl/Shift clicks build a selection for merging instead of opening the note
+        if QApplication.keyboardModifiers() & (Qt.ControlModifier | Qt.ShiftModifier):
             return
-        
-        pdf_files = [f for f in os.listdir("output") if f.lower().endswith('.pdf')]
-        for pdf_file in sorted(pdf_files, reverse=True):
-            item = QListWidgetItem(pdf_file)
-            item.setData(Qt.UserRole, os.path.join("output", pdf_file))
-            self.pdf_list.addItem(item)
+        self.show_pdf_viewer_view(index)
+
+    def merge_pdfs(self, indexes):
+        entries = []
+        for index in sorted(indexes, key=lambda index: index.row()):
+            row = self.library.find(index.data(Qt.UserRole))
+            if row is None:
+                continue
+            source_path = row["bundle_path"] or row["html_path"]
+            if source_path and os.path.exists(source_path):
+                entries.append({"title": row["title"], "source_path": source_path})
+        skipped = len(indexes) - len(entries)
+        if not entries:
+            self.show_notification("None of the selected notes have a saved source to merge")
+            return
+        title = f"Merged notes ({len(entries)})"
+        filename = os.path.abspath(unique_path(notes_filename(title), taken=self.export_queue.pending))
+        metadata = {"title": title, "text": "\n".join(entry["title"] for entry in entries)}
+        self.export_queue.enqueue_merge(entries, filename, metadata, trace_job=self.tracer.new_job("merge"))
+        self.show_notification(
+            f"Merging {len(entries)} notes into {os.path.basename(filename)}"
+            + (f" ({skipped} without a saved source skipped)" if skipped else "")
+        )
+
+    def export_pdf(self, html_content, filename, metadata=None, trace_job=None, job=None):
+        # Same-titled notes get their own file instead of overwriting each other
+        filename = os.path.abspath(unique_path(filename, taken=self.export_queue.pending))
+        metadata = dict(metadata or {})
+        if job is not None:
+            self.export_jobs[filename] = job
+            self.journal.record(job, "export_queued", filename=filename, bundle_path=metadata.get("bundle_path"))
+        # Low-resource mode typesets with Qt instead of starting Chromium
+        return filename, self.export_queue.enqueue(html_content, filename, metadata, native=self.low_resource,
+                                                   trace_job=trace_job)
+
+    def on_pdf_exported(self, filename, metadata):
+        self.journal.record(self.export_jobs.pop(filename, None), "exported", filename=filename)
+        row = self.library.add(pdf_path=filename, **metadata)
+        self.library.index_text(row["id"], row["title"], metadata.get("text", ""))
+        if self.semantic_index is not None and row["bundle_path"]:
+            self.embedding_requested.emit(row["id"], row["bundle_path"])
+        index = self.notes_model.insert_note(row)
+        # Only take the user to the PDF if they are still on the notes they exported
+        if self.youtube_notes_view and self.stacked_layout.currentWidget() is self.youtube_notes_view:
+            self.stacked_layout.setCurrentWidget(self.pdf_list_view)
+            self.pdf_list.setCurrentIndex(index)
+            self.open_pdf(index)
+        self.show_notification(f"PDF saved as: {filename}")
+        if self.optimize_pdfs:
+            self.pdf_optimizer.submit(filename)
+
+    def on_pdf_export_error(self, filename, error_msg):
+        self.journal.record(self.export_jobs.pop(filename, None), "export_failed", filename=filename, error=error_msg)
+        self.show_notification(f"Error generating PDF: {error_msg}")
+
+    def shrink_pdfs(self, indexes):
+        for index in indexes:
+            self.pdf_optimizer.submit(index.data(Qt.UserRole))
+        self.show_notification(f"Shrinking {len(indexes)} PDF{'s' if len(indexes) > 1 else ''} in the background")
+
+    def on_pdf_optimized(self, filename, before, after):
+        saved = before - after
+        total = self.settings.value("pdf_bytes_saved", 0, type=int) + saved
+        self.settings.setValue("pdf_bytes_saved", total)
+        self.settings.setValue("pdfs_optimized", self.settings.value("pdfs_optimized", 0, type=int) + 1)
+        if saved:
+            self.library.update_file_size(filename, after)
+        self.show_notification(
+            f"Shrunk {os.path.basename(filename)}: {format_bytes(before)} -> {format_bytes(after)} "
+            f"({100 * saved / max(before, 1):.0f}% smaller, {format_bytes(total)} saved in total)"
+        )
+
+    def on_pdf_optimize_error(self, filename, error_msg):
+        self.show_notification(f"Could not shrink {os.path.basename(filename)}: {error_msg}")
+
+    def open_pdf(self, item):
+        self.show_pdf_viewer_view(item)
 
     def show_pdf_context_menu(self, position):
-        item = self.pdf_list.itemAt(position)
-        if not item:
+        item = self.pdf_list.indexAt(position)
+        if not item.isValid():
             return
         
         menu = QMenu()
+
+        selected = self.pdf_list.selectionModel().selectedRows()
+        if len(selected) > 1 and item in selected:
+            merge_action = QAction(f"Merge {len(selected)} Notes into One PDF", self)
+            merge_action.triggered.connect(lambda: self.merge_pdfs(selected))
+            menu.addAction(merge_action)
+            menu.addSeparator()
         
-       
         delete_action = QAction("Delete", self)
         delete_action.triggered.connect(lambda: self.delete_pdf(item))
         menu.addAction(delete_action)
@@ -1107,10 +4858,54 @@ class IconOnlyButtonApp(QWidget):
         open_folder_action = QAction("Open Containing Folder", self)
         open_folder_action.triggered.connect(lambda: self.open_containing_folder(item))
         menu.addAction(open_folder_action)
+
+        targets = selected if item in selected else [item]
+        shrink_action = QAction("Shrink PDF" if len(targets) == 1 else f"Shrink {len(targets)} PDFs", self)
+        shrink_action.triggered.connect(lambda: self.shrink_pdfs(targets))
+        menu.addAction(shrink_action)
+
+        row = self.library.find(item.data(Qt.UserRole))
+        if row is not None and row["bundle_path"] and os.path.exists(row["bundle_path"]):
+            reexport_action = QAction("Re-export PDF", self)
+            reexport_action.triggered.connect(lambda: self.reexport_pdf(row["bundle_path"]))
+            menu.addAction(reexport_action)
+            export_menu = menu.addMenu("Export As")
+            for export_format in NOTES_EXPORTERS:
+                export_action = QAction(export_format, self)
+                export_action.triggered.connect(
+                    lambda checked=False, fmt=export_format: self.export_bundle(row["bundle_path"], fmt)
+                )
+                export_menu.addAction(export_action)
         
         menu.exec_(self.pdf_list.viewport().mapToGlobal(position))
 
 
+    def reexport_pdf(self, bundle_path, job=None, filename=None):
+        try:
+            raw_text, body, metadata = read_bundle(bundle_path)
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            self.show_notification(f"Could not read notes bundle: {str(e)}")
+            return
+        # Rendered again from the raw output so renderer and stylesheet changes apply
+        body = render_notes_body(raw_text, metadata.get("notes_format"))
+        metadata.pop("created_at", None)
+        metadata.update(title=extract_title(body), bundle_path=bundle_path, text=html_to_text(body))
+        filename, _ = self.export_pdf(
+            build_notes_document(body, for_pdf=True), filename or notes_filename(metadata["title"]), metadata, job=job
+        )
+        self.show_notification(f"Re-exporting {os.path.basename(filename)}")
+
+    def export_bundle(self, bundle_path, export_format):
+        try:
+            raw_text, body, metadata = read_bundle(bundle_path)
+            body = render_notes_body(raw_text, metadata.get("notes_format"))
+            title = extract_title(body)
+            filename = unique_path(notes_filename(title, EXPORT_FORMATS[export_format]))
+            NOTES_EXPORTERS[export_format](body, title, filename)
+            self.show_notification(f"{export_format} saved as: {filename}")
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile) as e:
+            self.show_notification(f"Error exporting {export_format}: {str(e)}")
+
     def delete_pdf(self, item):
         pdf_path = item.data(Qt.UserRole)
         
@@ -1123,8 +4918,12 @@ class IconOnlyButtonApp(QWidget):
         
         if reply == QMessageBox.Yes:
             try:
+                self.thumbnails.forget(pdf_path)
                 os.remove(pdf_path)
-                self.pdf_list.takeItem(self.pdf_list.row(item))
+                row = self.library.remove(pdf_path)
+                if row is not None and self.semantic_index is not None:
+                    self.semantic_index.remove(row["id"])
+                self.notes_model.remove_path(pdf_path)
                 self.show_notification(f"Deleted: {os.path.basename(pdf_path)}")
             except Exception as e:
                 self.show_notification(f"Error deleting file: {str(e)}")
@@ -1207,7 +5006,7 @@ class IconOnlyButtonApp(QWidget):
         home_glow.setColor(QColor(255, 107, 107, 150))
         home_glow.setOffset(0, 0)
         self.youtube_home_button.setGraphicsEffect(home_glow)
-        self.youtube_home_button.clicked.connect(lambda: self.web_view.load(QUrl("https://www.youtube.com")))
+        self.youtube_home_button.clicked.connect(lambda: self.web_view.load(QUrl(YOUTUBE_URL)))
         nav_layout.addWidget(self.youtube_home_button)
         
         self.youtube_notes_button = QPushButton("Create Notes")
@@ -1242,10 +5041,16 @@ class IconOnlyButtonApp(QWidget):
         
         # Setup persistent YouTube session
         profile_path = os.path.join(BASE_DIR, "yt_profile")
+        cache_limit = self.youtube_cache_mb * 1024 * 1024
+        self.youtube_cache_freed = trim_web_profile(profile_path, cache_limit)
         yt_profile = QWebEngineProfile("YouTubeProfile", self)
         yt_profile.setPersistentCookiesPolicy(QWebEngineProfile.ForcePersistentCookies)
         yt_profile.setCachePath(profile_path)
         yt_profile.setPersistentStoragePath(profile_path)
+        yt_profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+        yt_profile.setHttpCacheMaximumSize(cache_limit)
+        self.youtube_profile = yt_profile
+        self.youtube_profile_path = profile_path
 
         yt_profile.settings().setAttribute(QWebEngineSettings.LocalStorageEnabled, True)
         yt_profile.settings().setAttribute(QWebEngineSettings.PluginsEnabled, True)
@@ -1258,12 +5063,37 @@ class IconOnlyButtonApp(QWidget):
         settings.setAttribute(QWebEngineSettings.PluginsEnabled, True)
         settings.setAttribute(QWebEngineSettings.FullScreenSupportEnabled, True)
         settings.setAttribute(QWebEngineSettings.JavascriptEnabled, True)
-        settings.setAttribute(QWebEngineSettings.PlaybackRequiresUserGesture, False)
-        self.web_view.load(QUrl("https://www.youtube.com"))
+        settings.setAttribute(QWebEngineSettings.PlaybackRequiresUserGesture, self.low_resource)
+        # YouTube is only loaded the first time its view is opened
         self.web_view.loadFinished.connect(self.on_youtube_load_finished)
         layout.addWidget(self.web_view)
         self.stacked_layout.addWidget(self.youtube_view)
 
+        self.youtube_discard_timer = QTimer(self)
+        self.youtube_discard_timer.setSingleShot(True)
+        self.youtube_discard_timer.setInterval(YOUTUBE_DISCARD_AFTER_MS)
+        self.youtube_discard_timer.timeout.connect(self.discard_youtube_page)
+        self.stacked_layout.currentChanged.connect(self.update_youtube_lifecycle)
+
+    def update_youtube_lifecycle(self):
+        page = self.web_view.page()
+        current = self.stacked_layout.currentWidget()
+        if current is self.youtube_view or (current is not None and current is self.youtube_notes_view):
+            self.youtube_discard_timer.stop()
+            # Active reloads a discarded page on its own
+            if page.lifecycleState() != QWebEnginePage.LifecycleState.Active:
+                page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        elif page.lifecycleState() == QWebEnginePage.LifecycleState.Active and not page.url().isEmpty():
+            self.pause_youtube_media()
+            # Frozen keeps the DOM but stops timers and scripts; the renderer is dropped later if it stays hidden
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            self.youtube_discard_timer.start()
+
+    def discard_youtube_page(self):
+        page = self.web_view.page()
+        if page.lifecycleState() == QWebEnginePage.LifecycleState.Frozen:
+            page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)
+
     def on_youtube_load_finished(self, success):
         if success:
             self.youtube_notes_button.setEnabled(True)
@@ -1295,6 +5125,12 @@ class IconOnlyButtonApp(QWidget):
             self.retry_count = 0
             self.max_retries = 10
             self.current_video_id = video_id
+            self.trace_job = self.tracer.new_job(video_id)
+            # A second click must not orphan the fetch that is still running
+            self.job_registry.cancel(self.current_job)
+            self.journal.record(self.current_job, "closed")
+            self.current_job = self.job_registry.new_job(video_id)
+            self.journal.record(self.current_job, "started", video_id=video_id)
             self.fetch_transcript_with_retry()
         
         except Exception as e:
@@ -1304,43 +5140,154 @@ class IconOnlyButtonApp(QWidget):
     def fetch_transcript_with_retry(self):
         try:
             self.worker_thread = QThread()
-            self.worker = TranscriptWorker(self.current_video_id)
+            self.worker = TranscriptWorker(self.current_video_id, trace_job=self.trace_job,
+                                           index_path=data_path("library.db"))
             self.worker.moveToThread(self.worker_thread)
             self.worker.finished.connect(self.on_transcript_finished)
+            self.worker.similar_found.connect(self.on_similar_transcript)
             self.worker.error.connect(self.handle_transcript_error)
+            self.worker.finished.connect(self.worker_thread.quit)
+            self.worker.similar_found.connect(self.worker_thread.quit)
+            self.worker.error.connect(self.worker_thread.quit)
             self.worker_thread.started.connect(self.worker.fetch_transcript)
-            self.worker_thread.finished.connect(self.worker_thread.deleteLater)
+            self.job_registry.track_thread(self.current_job, self.worker_thread, self.worker)
             self.worker_thread.start()
         
         except Exception as e:
             self.handle_transcript_error(e)
 
-    def on_transcript_finished(self, filename):
+    def on_transcript_finished(self, filename, partial_text=None):
         self.retry_count = 0
-        self.worker_thread.quit()
-        self.worker_thread.wait()
         self.youtube_notes_button.setEnabled(True)
+        self.journal.record(self.current_job, "transcript", video_id=self.current_video_id, transcript_file=filename)
     
     
+        llm_type, model, route = self.current_llm_type, self.current_model, None
+        if self.route_enabled:
+            route = self.route_job(filename)
+            if route:
+                llm_type, model = route["llm_type"], route["model"]
+        if llm_type == "local" and self.low_resource:
+            model = self.fit_model_to_budget(model)
+
         self.youtube_notes_view = YouTubeNotesView(
             self.web_view, 
             filename,
-            llm_type=self.current_llm_type,
-            model=self.current_model,
-            api_key=self.api_key if self.current_llm_type == "openrouter" else None
+            llm_type=llm_type,
+            model=model,
+            api_key=self.api_key if llm_type == "openrouter" else None,
+            hedge=self.hedge_config(llm_type),
+            route=route,
+            video_id=self.current_video_id,
+            low_resource=self.low_resource,
+            ollama_options={"num_thread": self.cpu_threads} if self.low_resource else None,
+            trace_job=self.trace_job,
+            ollama_host=self.ollama_host,
+            job=self.current_job,
+            partial_text=partial_text
         )
         self.youtube_notes_view.parent_window = self
+        self.export_queue.progress.connect(self.youtube_notes_view.on_export_progress)
         
        
         if self.stacked_layout.indexOf(self.youtube_notes_view) == -1:
             self.stacked_layout.addWidget(self.youtube_notes_view)
             
         self.stacked_layout.setCurrentWidget(self.youtube_notes_view)
-        self.show_notification("Transcript loaded. Generating notes...")
-
+        if route:
+            self.show_notification(
+                f"Transcript loaded. Generating with {model} (~{route['predicted_seconds']:.0f}s predicted)"
+            )
+        else:
+            self.show_notification("Transcript loaded. Generating notes...")
+
+
+    def on_similar_transcript(self, filename, matches):
+        existing = None
+        for match in matches:
+            notes = [row for row in self.library.notes_for_video(match["video_id"]) if os.path.exists(row["pdf_path"])]
+            if notes:
+                existing = notes[0]
+                break
+        if existing is None:
+            self.on_transcript_finished(filename)
+            return
+        if match["video_id"] == self.current_video_id:
+            detail = "You already have notes for this video"
+        elif match["similarity"] >= DUPLICATE_THRESHOLD:
+            detail = f"This transcript is {match['similarity']:.0%} the same as one you already have notes for"
+        else:
+            detail = f"{match['containment']:.0%} of this transcript is part of one you already have notes for"
+        box = QMessageBox(self)
+        box.setWindowTitle("Existing Notes Found")
+        box.setText(f"{detail}:\n\n{existing['title']} ({existing['created_at'][:10]})")
+        open_button = box.addButton("Open Existing Notes", QMessageBox.AcceptRole)
+        box.addButton("Generate Anyway", QMessageBox.RejectRole)
+        box.setDefaultButton(open_button)
+        box.exec()
+        if box.clickedButton() is not open_button:
+            self.on_transcript_finished(filename)
+            return
+        self.retry_count = 0
+        self.youtube_notes_button.setEnabled(True)
+        self.journal.record(self.current_job, "closed")
+        self.pause_youtube_media()
+        self.open_pdf_path(existing["pdf_path"])
+        self.show_notification("Opened your existing notes")
+
+    def model_fits_budget(self, model):
+        size = self.ollama_model_sizes.get(model)
+        return size is None or size * MODEL_MEMORY_OVERHEAD <= self.memory_budget_mb * 1024 * 1024
+
+    def fit_model_to_budget(self, model):
+        if self.model_fits_budget(model):
+            return model
+        fits = [name for name in self.ollama_model_sizes if self.model_fits_budget(name)]
+        if not fits:
+            self.show_notification(
+                f"{model} needs more than the {self.memory_budget_mb} MB budget. "
+                f"Try pulling {' or '.join(LOW_RESOURCE_MODELS)}"
+            )
+            return model
+        smaller = max(fits, key=self.ollama_model_sizes.get)
+        self.show_notification(f"{model} is over the memory budget, using {smaller} instead")
+        return smaller
+
+    def route_job(self, transcript_file):
+        candidates = []
+        if self.local_model and self.local_model not in OLLAMA_PLACEHOLDERS:
+            candidates.append(("local", self.local_model))
+        if self.api_key and self.openrouter_model:
+            candidates.append(("openrouter", self.openrouter_model))
+        if len(candidates) < 2:
+            return None
+        prompt_tokens = estimate_tokens(NOTES_SYSTEM_PROMPT) + os.path.getsize(transcript_file) // 4
+        decision = BackendRouter.instance().choose(candidates, prompt_tokens)
+        decision["video_id"] = self.current_video_id
+        return decision
+
+    def hedge_config(self, primary_llm_type):
+        if not self.hedge_enabled:
+            return None
+        if primary_llm_type == "local":
+            llm_type, model, api_key = "openrouter", self.openrouter_model, self.api_key
+            if not api_key:
+                return None
+        else:
+            llm_type, model, api_key = "local", self.local_model, None
+        if not model:
+            return None
+        return {
+            "llm_type": llm_type,
+            "model": model,
+            "api_key": api_key,
+            "deadline": self.hedge_deadline,
+            "min_rate": self.hedge_min_rate,
+        }
 
     def handle_transcript_error(self, error_msg):
         self.youtube_notes_button.setEnabled(True)
+        self.journal.record(self.current_job, "failed", error=str(error_msg))
         if "No transcript found" in str(error_msg):
             msg = "No transcript available for this video"
         elif "Video unavailable" in str(error_msg):
@@ -1456,12 +5403,19 @@ class IconOnlyButtonApp(QWidget):
         
         self.populate_ollama_models()
         
-        index = self.model_dropdown.findText(self.current_model)
+        index = self.model_dropdown.findText(self.local_model)
         if index >= 0:
             self.model_dropdown.setCurrentIndex(index)
         
+        self.ollama_host_label = QLabel("Ollama host:")
+        self.ollama_host_label.setStyleSheet("color: #b388ff;")
+        self.ollama_host_input = QLineEdit(self.ollama_host)
+        self.ollama_host_input.setPlaceholderText("Default (OLLAMA_HOST or http://127.0.0.1:11434)")
+
         local_llm_layout.addWidget(self.model_label)
         local_llm_layout.addWidget(self.model_dropdown)
+        local_llm_layout.addWidget(self.ollama_host_label)
+        local_llm_layout.addWidget(self.ollama_host_input)
         local_llm_layout.addStretch()
         
         self.openrouter_container = QWidget()
@@ -1503,15 +5457,26 @@ class IconOnlyButtonApp(QWidget):
             }
         """)
         
-        if self.current_llm_type == "openrouter":
-            index = self.openrouter_model_dropdown.findText(self.current_model)
-            if index >= 0:
-                self.openrouter_model_dropdown.setCurrentIndex(index)
+        index = self.openrouter_model_dropdown.findText(self.openrouter_model)
+        if index >= 0:
+            self.openrouter_model_dropdown.setCurrentIndex(index)
         
         openrouter_layout.addWidget(self.api_key_label)
         openrouter_layout.addWidget(self.api_key_input)
         openrouter_layout.addWidget(self.openrouter_model_label)
         openrouter_layout.addWidget(self.openrouter_model_dropdown)
+        self.openrouter_base_url_label = QLabel("API base URL:")
+        self.openrouter_base_url_label.setStyleSheet("color: #b388ff;")
+        self.openrouter_base_url_input = QLineEdit(self.openrouter_base_url)
+        self.openrouter_base_url_input.setPlaceholderText(OPENROUTER_BASE_URL)
+        self.openrouter_base_url_input.setStyleSheet(self.api_key_input.styleSheet())
+        self.ollama_host_input.setStyleSheet(self.api_key_input.styleSheet())
+        openrouter_layout.addWidget(self.openrouter_base_url_label)
+        openrouter_layout.addWidget(self.openrouter_base_url_input)
+
+        self.openrouter_stats_label = QLabel()
+        self.openrouter_stats_label.setStyleSheet("color: #a0a0a0; font-size: 11px;")
+        openrouter_layout.addWidget(self.openrouter_stats_label)
         openrouter_layout.addStretch()
         
         self.local_llm_container.setVisible(self.current_llm_type == "local")
@@ -1564,10 +5529,161 @@ class IconOnlyButtonApp(QWidget):
         llm_layout.addWidget(self.openrouter_radio)
         llm_layout.addWidget(self.openrouter_container)
         llm_layout.addWidget(refresh_button)
-        llm_layout.addWidget(save_button)
         llm_group.setLayout(llm_layout)
         
         content_layout.addWidget(llm_group)
+
+        hedge_group = QGroupBox("Backend Selection")
+        hedge_group.setStyleSheet(llm_group.styleSheet())
+        hedge_layout = QVBoxLayout()
+        hedge_layout.setSpacing(10)
+
+        self.route_checkbox = QCheckBox("Pick the fastest backend for each video from measured throughput")
+        self.route_checkbox.setStyleSheet("color: #e0e0e0;")
+        self.route_checkbox.setChecked(self.route_enabled)
+        hedge_layout.addWidget(self.route_checkbox)
+
+        self.route_stats_label = QLabel()
+        self.route_stats_label.setStyleSheet("color: #a0a0a0; font-size: 11px;")
+        hedge_layout.addWidget(self.route_stats_label)
+
+        self.hedge_checkbox = QCheckBox("Race Ollama and OpenRouter when the selected backend is slow")
+        self.hedge_checkbox.setStyleSheet("color: #e0e0e0;")
+        self.hedge_checkbox.setChecked(self.hedge_enabled)
+        hedge_layout.addWidget(self.hedge_checkbox)
+
+        spin_style = """
+            QDoubleSpinBox, QSpinBox {
+                background-color: #2a1e42;
+                color: #e0e0e0;
+                border: 1px solid #7c4dff;
+                border-radius: 4px;
+                padding: 5px;
+            }
+        """
+        hedge_form = QGridLayout()
+        deadline_label = QLabel("First token deadline (s):")
+        deadline_label.setStyleSheet("color: #b388ff;")
+        self.hedge_deadline_spin = QDoubleSpinBox()
+        self.hedge_deadline_spin.setRange(1, 600)
+        self.hedge_deadline_spin.setValue(self.hedge_deadline)
+        self.hedge_deadline_spin.setStyleSheet(spin_style)
+        min_rate_label = QLabel("Minimum decode rate (tokens/s):")
+        min_rate_label.setStyleSheet("color: #b388ff;")
+        self.hedge_min_rate_spin = QDoubleSpinBox()
+        self.hedge_min_rate_spin.setRange(0, 500)
+        self.hedge_min_rate_spin.setValue(self.hedge_min_rate)
+        self.hedge_min_rate_spin.setStyleSheet(spin_style)
+        hedge_form.addWidget(deadline_label, 0, 0)
+        hedge_form.addWidget(self.hedge_deadline_spin, 0, 1)
+        hedge_form.addWidget(min_rate_label, 1, 0)
+        hedge_form.addWidget(self.hedge_min_rate_spin, 1, 1)
+        hedge_layout.addLayout(hedge_form)
+
+        self.hedge_stats_label = QLabel()
+        self.hedge_stats_label.setStyleSheet("color: #a0a0a0; font-size: 11px;")
+        hedge_layout.addWidget(self.hedge_stats_label)
+        hedge_group.setLayout(hedge_layout)
+
+        content_layout.addWidget(hedge_group)
+
+        library_group = QGroupBox("Notes Library")
+        library_group.setStyleSheet(llm_group.styleSheet())
+        library_layout = QVBoxLayout()
+        library_layout.setSpacing(10)
+        self.semantic_checkbox = QCheckBox("Semantic search with local Ollama embeddings")
+        self.semantic_checkbox.setStyleSheet("color: #e0e0e0;")
+        self.semantic_checkbox.setChecked(self.semantic_enabled)
+        self.semantic_checkbox.setEnabled(np is not None)
+        if np is None:
+            self.semantic_checkbox.setToolTip("Install numpy to enable semantic search")
+        library_layout.addWidget(self.semantic_checkbox)
+        embedding_label = QLabel("Embedding model:")
+        embedding_label.setStyleSheet("color: #b388ff;")
+        self.embedding_model_input = QLineEdit(self.embedding_model)
+        self.embedding_model_input.setStyleSheet(self.api_key_input.styleSheet())
+        library_layout.addWidget(embedding_label)
+        library_layout.addWidget(self.embedding_model_input)
+        self.optimize_checkbox = QCheckBox("Shrink PDFs after export (Ghostscript, or pypdf as a fallback)")
+        self.optimize_checkbox.setStyleSheet("color: #e0e0e0;")
+        self.optimize_checkbox.setChecked(self.optimize_pdfs)
+        library_layout.addWidget(self.optimize_checkbox)
+        self.optimize_stats_label = QLabel()
+        self.optimize_stats_label.setStyleSheet("color: #a0a0a0; font-size: 11px;")
+        library_layout.addWidget(self.optimize_stats_label)
+        library_group.setLayout(library_layout)
+
+        content_layout.addWidget(library_group)
+
+        resources_group = QGroupBox("Resources")
+        resources_group.setStyleSheet(llm_group.styleSheet())
+        resources_layout = QVBoxLayout()
+        resources_layout.setSpacing(10)
+        cache_form = QGridLayout()
+        cache_label = QLabel("YouTube cache limit (MB):")
+        cache_label.setStyleSheet("color: #b388ff;")
+        self.youtube_cache_spin = QSpinBox()
+        self.youtube_cache_spin.setRange(20, 5000)
+        self.youtube_cache_spin.setValue(self.youtube_cache_mb)
+        self.youtube_cache_spin.setStyleSheet(spin_style)
+        clear_cache_button = QPushButton("Clear YouTube Cache")
+        clear_cache_button.setStyleSheet(refresh_button.styleSheet())
+        clear_cache_button.clicked.connect(self.clear_youtube_cache)
+        cache_form.addWidget(cache_label, 0, 0)
+        cache_form.addWidget(self.youtube_cache_spin, 0, 1)
+        cache_form.addWidget(clear_cache_button, 0, 2)
+        resources_layout.addLayout(cache_form)
+        self.low_resource_checkbox = QCheckBox("Low-resource mode (browser changes apply after restart)")
+        self.low_resource_checkbox.setStyleSheet("color: #e0e0e0;")
+        self.low_resource_checkbox.setChecked(self.low_resource)
+        self.low_resource_checkbox.setToolTip(
+            "Trims transcripts, repaints notes less often, exports PDFs without Chromium, "
+            "limits Ollama threads and keeps local models within the memory budget"
+        )
+        resources_layout.addWidget(self.low_resource_checkbox)
+        budget_form = QGridLayout()
+        budget_label = QLabel("Memory budget (MB):")
+        budget_label.setStyleSheet("color: #b388ff;")
+        self.memory_budget_spin = QSpinBox()
+        self.memory_budget_spin.setRange(256, 65536)
+        self.memory_budget_spin.setSingleStep(256)
+        self.memory_budget_spin.setValue(self.memory_budget_mb)
+        self.memory_budget_spin.setStyleSheet(spin_style)
+        threads_label = QLabel("Ollama CPU threads:")
+        threads_label.setStyleSheet("color: #b388ff;")
+        self.cpu_threads_spin = QSpinBox()
+        self.cpu_threads_spin.setRange(1, os.cpu_count() or 1)
+        self.cpu_threads_spin.setValue(self.cpu_threads)
+        self.cpu_threads_spin.setStyleSheet(spin_style)
+        budget_form.addWidget(budget_label, 0, 0)
+        budget_form.addWidget(self.memory_budget_spin, 0, 1)
+        budget_form.addWidget(threads_label, 1, 0)
+        budget_form.addWidget(self.cpu_threads_spin, 1, 1)
+        data_root_label = QLabel("Data folder (after restart):")
+        data_root_label.setStyleSheet("color: #b388ff;")
+        self.data_root_input = QLineEdit(self.settings.value("data_root", "", type=str))
+        self.data_root_input.setPlaceholderText(DEFAULT_DATA_DIR)
+        self.data_root_input.setStyleSheet(self.api_key_input.styleSheet())
+        budget_form.addWidget(data_root_label, 2, 0)
+        budget_form.addWidget(self.data_root_input, 2, 1, 1, 2)
+        resources_layout.addLayout(budget_form)
+        self.resource_stats_label = QLabel()
+        self.resource_stats_label.setStyleSheet("color: #a0a0a0; font-size: 11px;")
+        resources_layout.addWidget(self.resource_stats_label)
+        resources_group.setLayout(resources_layout)
+
+        self.resource_timer = QTimer(self)
+        self.resource_timer.setInterval(2000)
+        self.resource_timer.timeout.connect(self.update_resource_stats)
+
+        self.budget_timer = QTimer(self)
+        self.budget_timer.setInterval(LOW_RESOURCE_CHECK_MS)
+        self.budget_timer.timeout.connect(self.check_memory_budget)
+        if self.low_resource and self.resource_monitor.sample() is not None:
+            self.budget_timer.start()
+
+        content_layout.addWidget(resources_group)
+        content_layout.addWidget(save_button)
         content_layout.addStretch()
         
         scroll_area.setWidget(content_widget)
@@ -1576,15 +5692,25 @@ class IconOnlyButtonApp(QWidget):
 
     def populate_ollama_models(self):
         self.model_dropdown.clear()
+        self.ollama_model_sizes = {}
         try:
-            result = subprocess.run(['ollama', 'list'], capture_output=True, text=True)
+            env = dict(os.environ, OLLAMA_HOST=self.ollama_host) if self.ollama_host else None
+            result = subprocess.run(['ollama', 'list'], capture_output=True, text=True, env=env)
             if result.returncode == 0:
                 lines = result.stdout.split('\n')
                 if len(lines) > 1:
                     for line in lines[1:]:
                         if line.strip():
                             model_name = line.split()[0]
+                            size = parse_model_size(line)
+                            if size is not None:
+                                self.ollama_model_sizes[model_name] = size
                             self.model_dropdown.addItem(model_name)
+                            if self.low_resource and not self.model_fits_budget(model_name):
+                                item = self.model_dropdown.model().item(self.model_dropdown.count() - 1)
+                                item.setEnabled(False)
+                                # Keep the name as-is so the saved selection still matches
+                                item.setToolTip(f"Needs more than the {self.memory_budget_mb} MB memory budget")
                 else:
                     self.model_dropdown.addItem("No models found")
             else:
@@ -1595,22 +5721,91 @@ class IconOnlyButtonApp(QWidget):
             self.show_notification("Ollama is not installed or not in PATH")
 
     def save_settings(self):
+        self.local_model = self.model_dropdown.currentText()
+        self.openrouter_model = self.openrouter_model_dropdown.currentText()
+        self.api_key = self.api_key_input.text()
+        ollama_host = self.ollama_host_input.text().strip()
+        self.openrouter_base_url = self.openrouter_base_url_input.text().strip()
+        OpenRouterClient.instance().set_base_url(self.openrouter_base_url)
+        self.settings.setValue("openrouter_base_url", self.openrouter_base_url)
+        host_changed = ollama_host != self.ollama_host
+        if host_changed:
+            self.ollama_host = ollama_host
+            self.settings.setValue("ollama_host", self.ollama_host)
+            self.populate_ollama_models()
+            index = self.model_dropdown.findText(self.local_model)
+            if index >= 0:
+                self.model_dropdown.setCurrentIndex(index)
+            else:
+                self.local_model = self.model_dropdown.currentText()
         if self.local_llm_radio.isChecked():
             self.current_llm_type = "local"
-            self.current_model = self.model_dropdown.currentText()
-            self.api_key = ""
+            self.current_model = self.local_model
         else:
             self.current_llm_type = "openrouter"
-            self.current_model = self.openrouter_model_dropdown.currentText()
-            self.api_key = self.api_key_input.text()
+            self.current_model = self.openrouter_model
             if not self.api_key:
                 self.show_notification("Please enter your OpenRouter API key")
                 return
-        
+
+        self.hedge_enabled = self.hedge_checkbox.isChecked()
+        self.hedge_deadline = self.hedge_deadline_spin.value()
+        self.hedge_min_rate = self.hedge_min_rate_spin.value()
+        self.route_enabled = self.route_checkbox.isChecked()
+        if self.hedge_enabled and self.hedge_config(self.current_llm_type) is None:
+            self.show_notification("Hedged generation needs both an Ollama model and an OpenRouter API key")
+            return
+
         self.settings.setValue("llm_type", self.current_llm_type)
         self.settings.setValue("model", self.current_model)
         self.settings.setValue("api_key", self.api_key)
+        self.settings.setValue("local_model", self.local_model)
+        self.settings.setValue("openrouter_model", self.openrouter_model)
+        self.settings.setValue("hedge_enabled", self.hedge_enabled)
+        self.settings.setValue("hedge_deadline", self.hedge_deadline)
+        self.settings.setValue("hedge_min_rate", self.hedge_min_rate)
+        self.settings.setValue("route_enabled", self.route_enabled)
+        self.optimize_pdfs = self.optimize_checkbox.isChecked()
+        self.youtube_cache_mb = self.youtube_cache_spin.value()
+        self.settings.setValue("youtube_cache_mb", self.youtube_cache_mb)
+        self.youtube_profile.setHttpCacheMaximumSize(self.youtube_cache_mb * 1024 * 1024)
+        self.settings.setValue("optimize_pdfs", self.optimize_pdfs)
+        low_resource = self.low_resource_checkbox.isChecked()
+        memory_budget_mb = self.memory_budget_spin.value()
+        self.cpu_threads = self.cpu_threads_spin.value()
+        self.settings.setValue("cpu_threads", self.cpu_threads)
+        data_root = self.data_root_input.text().strip()
+        data_root_changed = data_root != self.settings.value("data_root", "", type=str)
+        self.settings.setValue("data_root", data_root)
+        if (low_resource, memory_budget_mb) != (self.low_resource, self.memory_budget_mb):
+            self.low_resource, self.memory_budget_mb = low_resource, memory_budget_mb
+            self.settings.setValue("low_resource", self.low_resource)
+            self.settings.setValue("memory_budget_mb", self.memory_budget_mb)
+            self.thumbnails.pool.setMaxThreadCount(1 if self.low_resource else 2)
+            self.web_view.settings().setAttribute(QWebEngineSettings.PlaybackRequiresUserGesture, self.low_resource)
+            # Re-list so models over the new budget are greyed out
+            self.populate_ollama_models()
+            index = self.model_dropdown.findText(self.local_model)
+            if index >= 0:
+                self.model_dropdown.setCurrentIndex(index)
+        self.budget_warned = False
+        if self.low_resource and self.resource_monitor.sample() is not None:
+            self.budget_timer.start()
+        else:
+            self.budget_timer.stop()
+
+        semantic_enabled = self.semantic_checkbox.isChecked()
+        embedding_model = self.embedding_model_input.text().strip() or EMBEDDING_MODEL
+        if host_changed or (semantic_enabled, embedding_model) != (self.semantic_enabled, self.embedding_model):
+            self.semantic_enabled, self.embedding_model = semantic_enabled, embedding_model
+            self.settings.setValue("semantic_enabled", self.semantic_enabled)
+            self.settings.setValue("embedding_model", self.embedding_model)
+            self.stop_semantic_index()
+            self.start_semantic_index()
         
+        if data_root_changed:
+            self.show_notification("Settings saved. The new data folder is used after a restart")
+            return
         self.show_notification(f"Settings saved. Using {self.current_llm_type} model: {self.current_model}")
 
     def resizeEvent(self, event):
@@ -1644,18 +5839,15 @@ class IconOnlyButtonApp(QWidget):
 
         self.setMinimumSize(1000, 700)
 
-   
-        if self.youtube_notes_view:
-            self.stacked_layout.removeWidget(self.youtube_notes_view)
-            self.youtube_notes_view.deleteLater()
-            self.youtube_notes_view = None
+        self.close_youtube_notes_view()
 
   
         self.stacked_layout.setCurrentWidget(self.youtube_view)
 
  
         self.web_view.show()
-        self.web_view.load(QUrl("https://www.youtube.com"))
+        if self.web_view.url().isEmpty():
+            self.web_view.load(QUrl(YOUTUBE_URL))
 
     
         if self.previous_state & Qt.WindowFullScreen:
@@ -1670,30 +5862,87 @@ class IconOnlyButtonApp(QWidget):
         self.clear_notification()
         self.previous_state = self.windowState()
         self.previous_size = self.size()
+        self.update_openrouter_stats()
+        self.update_hedge_stats()
+        self.update_optimize_stats()
         self.stacked_layout.setCurrentWidget(self.settings_container)
+        self.youtube_profile_size = directory_size(self.youtube_profile_path)
+        self.update_resource_stats()
+        self.resource_timer.start()
 
-    def switch_back_to_main_view(self):
-        if hasattr(self, 'web_view'):
-            try:
-                self.web_view.page().runJavaScript("""
-                var videos = document.getElementsByTagName('video');
-                for (var i = 0; i < videos.length; i++) {
-                    videos[i].pause();
-                }
-                var audios = document.getElementsByTagName('audio');
-                for (var i = 0; i < audios.length; i++) {
-                    audios[i].pause();
-                }
-            """)
-            except RuntimeError:
-                pass 
+    def update_resource_stats(self):
+        if self.stacked_layout.currentWidget() is not self.settings_container:
+            self.resource_timer.stop()
+            return
+        lines = [f"YouTube profile on disk: {format_bytes(self.youtube_profile_size)}"
+                 + (f" ({format_bytes(self.youtube_cache_freed)} trimmed at startup)"
+                    if self.youtube_cache_freed else "")]
+        usage = self.resource_monitor.sample()
+        if usage is None:
+            lines.append("Install psutil to see memory and CPU use")
+        else:
+            cpu = f"{usage['cpu_percent']:.1f}% CPU" if usage["cpu_percent"] is not None else "measuring CPU..."
+            lines.append(f"App and browser processes ({usage['processes']}): {format_bytes(usage['rss'])} RSS, {cpu}")
+            if self.low_resource:
+                lines.append(f"Memory budget: {format_bytes(self.memory_budget_mb * 1024 * 1024)}"
+                             + (" (over)" if usage["rss"] > self.memory_budget_mb * 1024 * 1024 else ""))
+        state = self.web_view.page().lifecycleState()
+        lines.append(f"YouTube page: {state.name.lower()}")
+        self.resource_stats_label.setText("\n".join(lines))
+
+    def check_memory_budget(self):
+        usage = self.resource_monitor.sample()
+        if usage is None or usage["rss"] <= self.memory_budget_mb * 1024 * 1024:
+            self.budget_warned = False
+            return
+        self.thumbnails.release()
+        QPixmapCache.clear()
+        if self.stacked_layout.currentWidget() is not self.youtube_view:
+            self.youtube_discard_timer.stop()
+            page = self.web_view.page()
+            if page.lifecycleState() == QWebEnginePage.LifecycleState.Active:
+                page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            self.discard_youtube_page()
+        if not self.budget_warned:
+            self.budget_warned = True
+            self.show_notification(
+                f"Using {format_bytes(usage['rss'])}, over the {self.memory_budget_mb} MB budget. Freed caches"
+            )
+
+    def clear_youtube_cache(self):
+        self.youtube_profile.clearHttpCache()
+        # clearHttpCache finishes asynchronously, so the new size shows up the next time settings open
+        self.show_notification(f"Clearing YouTube cache ({format_bytes(self.youtube_profile_size)} on disk)")
+
+    def update_optimize_stats(self):
+        count = self.settings.value("pdfs_optimized", 0, type=int)
+        saved = self.settings.value("pdf_bytes_saved", 0, type=int)
+        self.optimize_stats_label.setText(f"Shrunk {count} PDFs, {format_bytes(saved)} saved")
+
+    def update_hedge_stats(self):
+        local_wins = self.settings.value("hedge_wins/local", 0, type=int)
+        openrouter_wins = self.settings.value("hedge_wins/openrouter", 0, type=int)
+        self.hedge_stats_label.setText(f"Wins: Ollama {local_wins}  |  OpenRouter {openrouter_wins}")
+
+        router = BackendRouter.instance()
+        lines = []
+        for llm_type, model in (("local", self.local_model), ("openrouter", self.openrouter_model)):
+            profile = router.profile(llm_type, model)
+            label = "Ollama" if llm_type == "local" else "OpenRouter"
+            lines.append(f"{label} {model}: {profile['decode_rate']:.1f} tokens/s over {profile['runs']} runs")
+        self.route_stats_label.setText("\n".join(lines))
+
+    def update_openrouter_stats(self):
+        stats = OpenRouterClient.instance().stats()
+        self.openrouter_stats_label.setText(
+            f"Requests: {stats['requests']} ({stats['requests_last_minute']}/min)  |  "
+            f"Rate limited: {stats['rejections']}  |  "
+            f"Waited: {stats['wait_time']:.1f}s"
+        )
 
-   
-        if self.youtube_notes_view:
-            self.youtube_view.layout().addWidget(self.web_view) 
-            self.stacked_layout.removeWidget(self.youtube_notes_view)
-            self.youtube_notes_view.deleteLater()
-            self.youtube_notes_view = None
+    def switch_back_to_main_view(self):
+        self.pause_youtube_media()
+        self.close_youtube_notes_view()
 
         self.clear_notification()
 
@@ -1708,6 +5957,49 @@ class IconOnlyButtonApp(QWidget):
         self.setMinimumSize(800, 600)
         self.stacked_layout.setCurrentWidget(self.main_view)
 
+    def close_youtube_notes_view(self, resumable=False):
+        if not self.youtube_notes_view:
+            return
+        if not resumable:
+            self.journal.record(self.youtube_notes_view.job, "closed")
+        # Stops the job's worker and stream; its thread finishes and is deleted in the background
+        self.job_registry.cancel(self.youtube_notes_view.job)
+        self.export_queue.progress.disconnect(self.youtube_notes_view.on_export_progress)
+        # The shared web view must leave the notes view before it is deleted, or it is deleted with it
+        self.youtube_view.layout().addWidget(self.web_view)
+        self.stacked_layout.removeWidget(self.youtube_notes_view)
+        self.youtube_notes_view.deleteLater()
+        self.youtube_notes_view = None
+
+    def show_performance_panel(self):
+        if self.performance_panel is None:
+            self.performance_panel = PerformancePanel(self.tracer, self.settings, self)
+        self.performance_panel.show()
+        self.performance_panel.raise_()
+        self.performance_panel.activateWindow()
+
+    def stop_semantic_index(self):
+        if getattr(self, "embedding_thread", None) is not None:
+            self.embedding_requested.disconnect(self.embedding_worker.index_note)
+            self.query_requested.disconnect(self.embedding_worker.embed_query)
+            self.embedding_worker.query_embedded.disconnect(self.on_query_embedded)
+            self.embedding_worker.query_failed.disconnect(self.on_query_failed)
+            self.embedding_worker.cancel()
+            self.embedding_thread.quit()
+            # An embed call already in flight is left to finish on its own; the job registry still owns the thread
+            self.embedding_thread.wait(JOB_SHUTDOWN_MS)
+            self.embedding_thread = None
+
+    def closeEvent(self, event):
+        # Whatever is still running on exit stays in the journal and is offered again next start
+        self.close_youtube_notes_view(resumable=True)
+        self.stop_semantic_index()
+        self.job_registry.shutdown()
+        self.export_queue.shutdown()
+        self.thumbnails.shutdown()
+        self.pdf_optimizer.shutdown()
+        super().closeEvent(event)
+
     def show_notification(self, message):
         self.clear_notification()
         
@@ -1740,6 +6032,13 @@ class IconOnlyButtonApp(QWidget):
                 self.current_notification = None
 
 if __name__ == "__main__":
+    startup_settings = QSettings("Abhiiishek-rana", "FAIL-UP")
+    set_data_root(startup_settings.value("data_root", "", type=str))
+    # Chromium reads its flags once, when QApplication starts
+    if startup_settings.value("low_resource", False, type=bool):
+        os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(
+            filter(None, [os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS"), LOW_RESOURCE_BROWSER_FLAGS])
+        )
     app = QApplication(sys.argv)
     app.setStyleSheet("""
         QToolTip {
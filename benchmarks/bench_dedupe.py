@@ -0,0 +1,122 @@
+"""Near-duplicate transcript lookups as the library grows.
+
+    python benchmarks/bench_dedupe.py [--library 1000,5000] [--chars 8000] [--queries 50] [--min-recall 0.95]
+
+For each --library size a TranscriptIndex is filled with that many synthetic
+transcripts (bench_low_resource's generator, one seed each), then queried with
+three kinds of transcript built from random library entries:
+
+  reupload  the same talk with filler words, line breaks and a few lines changed
+  clip      a contiguous third of the talk
+  fresh     a transcript that is not in the library
+
+Reports lookup time percentiles next to a linear scan over every stored
+signature, so the banded lookup can be seen staying flat while the scan grows,
+and the share of reuploads and clips found plus any fresh transcript wrongly
+matched. Exits with status 1 when recall drops below --min-recall.
+"""
+import argparse
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app
+from bench_low_resource import synthetic_transcript
+from bench_search import percentile
+
+
+def reupload(text, rng):
+    lines = text.split("\n")
+    for _ in range(max(1, len(lines) // 50)):
+        lines[rng.randrange(len(lines))] = synthetic_transcript(60, seed=rng.random())
+    # Caption tracks of a re-upload break lines in different places
+    words = " ".join(lines).split()
+    wrapped, position = [], 0
+    while position < len(words):
+        step = rng.randint(5, 12)
+        wrapped.append(" ".join(words[position:position + step]))
+        position += step
+    return "\n".join(wrapped)
+
+
+def clip(text, rng):
+    lines = text.split("\n")
+    length = len(lines) // 3
+    start = rng.randrange(len(lines) - length)
+    return "\n".join(lines[start:start + length])
+
+
+def linear_scan(index, shingles, signature):
+    matches = 0
+    for row in index.conn.execute("SELECT shingles, signature FROM transcripts"):
+        other = struct.unpack(f"<{len(signature)}I", row["signature"])
+        similarity = sum(a == b for a, b in zip(signature, other)) / len(signature)
+        overlap = similarity * (shingles + row["shingles"]) / (1 + similarity)
+        if max(similarity, overlap / max(shingles, 1)) >= app.DUPLICATE_THRESHOLD:
+            matches += 1
+    return matches
+
+
+def run(size, chars, queries, directory):
+    index = app.TranscriptIndex(os.path.join(directory, f"dedupe-{size}.db"))
+    start = time.perf_counter()
+    for seed in range(size):
+        shingles = app.transcript_shingles(synthetic_transcript(chars, seed=seed))
+        index.add(str(seed), f"video{seed}", None, len(shingles), app.minhash_signature(shingles))
+    build_seconds = time.perf_counter() - start
+
+    rng = random.Random(size)
+    timings, scans, found, wrong = [], [], {"reupload": 0, "clip": 0}, 0
+    for query in range(queries):
+        seed = rng.randrange(size)
+        original = synthetic_transcript(chars, seed=seed)
+        for kind, text in (("reupload", reupload(original, rng)), ("clip", clip(original, rng)),
+                           ("fresh", synthetic_transcript(chars, seed=size + query))):
+            shingles = app.transcript_shingles(text)
+            signature = app.minhash_signature(shingles)
+            start = time.perf_counter()
+            matches = index.similar(len(shingles), signature)
+            timings.append((time.perf_counter() - start) * 1000)
+            if kind == "fresh":
+                wrong += bool(matches)
+                continue
+            found[kind] += any(match["key"] == str(seed) for match in matches)
+            if kind == "reupload":
+                start = time.perf_counter()
+                linear_scan(index, len(shingles), signature)
+                scans.append((time.perf_counter() - start) * 1000)
+    index.conn.close()
+    return build_seconds, timings, scans, {kind: count / queries for kind, count in found.items()}, wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--library", default="1000,5000", help="comma separated library sizes")
+    parser.add_argument("--chars", type=int, default=8000, help="characters per synthetic transcript")
+    parser.add_argument("--queries", type=int, default=50, help="queries of each kind per library size")
+    parser.add_argument("--min-recall", type=float, default=0.95)
+    args = parser.parse_args()
+
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        for size in (int(value) for value in args.library.split(",")):
+            build_seconds, timings, scans, recall, wrong = run(size, args.chars, args.queries, directory)
+            print(f"{size:>7} transcripts  indexed in {build_seconds:.1f}s  "
+                  f"lookup p50 {percentile(timings, 0.5):.2f}ms  p95 {percentile(timings, 0.95):.2f}ms  "
+                  f"linear scan p50 {percentile(scans, 0.5):.1f}ms")
+            print(f"{'':>7} recall  reupload {recall['reupload']:.0%}  clip {recall['clip']:.0%}  "
+                  f"fresh wrongly matched {wrong}/{args.queries}")
+            if min(recall.values()) < args.min_recall:
+                failed = True
+    if failed:
+        print(f"FAIL: recall below {args.min_recall:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
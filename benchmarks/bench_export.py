@@ -0,0 +1,81 @@
+"""Cost of each export format relative to the Chromium PDF path.
+
+    python benchmarks/bench_export.py [--repeat N] [--no-pdf]
+
+Renders the synthetic notes from bench_render once, then times writing them as
+standalone HTML, Markdown and EPUB, and as a PDF through Playwright the way
+PdfExportWorker does it (browser already running, one page per export). The
+browser launch is reported separately since the export queue pays it once.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import NOTES_EXPORTERS, PDF_EXPORT_OPTIONS, build_notes_document, extract_title, render_notes_body
+from bench_render import SIZES, best_of, synthetic_notes
+
+
+def pdf_exporter():
+    from playwright.sync_api import sync_playwright
+
+    start = time.perf_counter()
+    playwright = sync_playwright().start()
+    browser = playwright.chromium.launch()
+    launch = time.perf_counter() - start
+
+    def export_pdf(body, title, filename):
+        page = browser.new_page()
+        try:
+            page.set_content(build_notes_document(body, for_pdf=True))
+            pdf_bytes = page.pdf(**PDF_EXPORT_OPTIONS)
+        finally:
+            page.close()
+        with open(filename, "wb") as f:
+            f.write(pdf_bytes)
+
+    def close():
+        browser.close()
+        playwright.stop()
+
+    return export_pdf, launch, close
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-pdf", action="store_true", help="skip the Chromium baseline")
+    args = parser.parse_args()
+
+    exporters = dict(NOTES_EXPORTERS)
+    close = None
+    if not args.no_pdf:
+        try:
+            exporters["PDF"], launch, close = pdf_exporter()
+            print(f"chromium launch: {launch * 1e3:.0f}ms (once per export queue burst)\n")
+        except Exception as e:
+            print(f"chromium unavailable, skipping the PDF baseline: {e}\n")
+
+    print(f"{'size':<12}{'format':<10}{'time':>11}{'bytes':>11}{'vs PDF':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, target in SIZES.items():
+            body = render_notes_body(synthetic_notes(target))
+            title = extract_title(body)
+            timings = {}
+            for name, export in exporters.items():
+                filename = os.path.join(directory, f"notes.{name.lower()}")
+                timings[name] = (best_of(lambda: export(body, title, filename), args.repeat),
+                                 os.path.getsize(filename))
+            pdf = timings.get("PDF", (None, 0))[0]
+            for name, (elapsed, size) in timings.items():
+                ratio = f"{pdf / elapsed:>8.0f}x" if pdf and name != "PDF" else f"{'-':>9}"
+                print(f"{label:<12}{name:<10}{elapsed * 1e3:>9.2f}ms{size:>11}{ratio}")
+    if close is not None:
+        close()
+
+
+if __name__ == "__main__":
+    main()
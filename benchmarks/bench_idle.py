@@ -0,0 +1,104 @@
+"""Idle CPU and RSS of the YouTube web view in each lifecycle state.
+
+    python benchmarks/bench_idle.py [--url URL] [--seconds 20] [--before]
+
+Loads the page in a throwaway profile capped like the app's, then samples the
+whole process tree (app + QtWebEngineProcess) before the page is opened, while
+it is visible, hidden but still active, frozen and discarded. --before sets the
+profile up the way the app used to: Chromium's own cache size, the page loaded
+hidden at startup and never frozen, so the two runs can be compared row by row.
+Needs psutil, a display and network access.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QUrl
+from PySide6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile
+from PySide6.QtWebEngineWidgets import QWebEngineView
+from PySide6.QtWidgets import QApplication
+
+from app import YOUTUBE_CACHE_MB, YOUTUBE_URL, ResourceMonitor, directory_size, format_bytes
+
+
+def spin(app, seconds):
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.01)
+
+
+def measure(app, monitor, seconds):
+    monitor.sample()
+    peak = 0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        spin(app, 1)
+        peak = max(peak, monitor.sample()["rss"])
+    usage = monitor.sample()
+    return usage["cpu_percent"] or 0.0, usage["rss"], peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default=YOUTUBE_URL)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--before", action="store_true", help="uncapped cache, eager load, never frozen")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    monitor = ResourceMonitor()
+    if monitor.sample() is None:
+        sys.exit("psutil is required")
+
+    with tempfile.TemporaryDirectory() as profile_path:
+        profile = QWebEngineProfile("BenchProfile")
+        profile.setCachePath(profile_path)
+        profile.setPersistentStoragePath(profile_path)
+        if not args.before:
+            profile.setHttpCacheType(QWebEngineProfile.DiskHttpCache)
+            profile.setHttpCacheMaximumSize(YOUTUBE_CACHE_MB * 1024 * 1024)
+        view = QWebEngineView()
+        page = QWebEnginePage(profile, view)
+        view.setPage(page)
+        view.resize(1000, 700)
+
+        print(f"{'state':<18}{'cpu':>8}{'rss':>12}{'peak rss':>12}")
+        if args.before:
+            # The page used to load behind the main view as the window was built
+            steps = [("startup, hidden", lambda: None), ("visible", view.show), ("hidden, active", view.hide)]
+        else:
+            # Nothing is loaded until the YouTube view is first opened
+            cpu, rss, peak = measure(app, monitor, args.seconds)
+            print(f"{'not opened':<18}{cpu:>7.1f}%{format_bytes(rss):>12}{format_bytes(peak):>12}")
+            view.show()
+            steps = [
+                ("visible", lambda: None),
+                ("hidden, active", view.hide),
+                ("frozen", lambda: page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)),
+                ("discarded", lambda: page.setLifecycleState(QWebEnginePage.LifecycleState.Discarded)),
+            ]
+        loaded = []
+        view.loadFinished.connect(loaded.append)
+        view.load(QUrl(args.url))
+        while not loaded:
+            spin(app, 0.1)
+        spin(app, 5)
+
+        for label, step in steps:
+            step()
+            spin(app, 2)
+            cpu, rss, peak = measure(app, monitor, args.seconds)
+            print(f"{label:<18}{cpu:>7.1f}%{format_bytes(rss):>12}{format_bytes(peak):>12}")
+        print(f"\nprofile on disk after the run: {format_bytes(directory_size(profile_path))}")
+        view.deleteLater()
+        page.deleteLater()
+        spin(app, 1)
+
+
+if __name__ == "__main__":
+    main()
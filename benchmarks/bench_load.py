@@ -0,0 +1,112 @@
+"""Concurrent NotesGenerationWorker jobs against the fake LLM server.
+
+    python benchmarks/bench_load.py [--backend local|openrouter|both] [--jobs 8] [--concurrency 4]
+                                    [--hedge] [server options, see fake_llm_server.py --help]
+
+Starts benchmarks/fake_llm_server.py in-process on a free port, points the
+worker at it (ollama_host for Ollama, OpenRouterClient base URL for the
+OpenAI-compatible path) and runs --jobs generations, --concurrency at a time,
+each on its own thread the way the app gives each job a QThread. Reports
+success and failure counts, time to first visible chunk, delivered chunks/s
+and, for OpenRouter, the shared client's request, 429 and limiter wait totals.
+Nothing leaves the machine and every run with the same options replays the
+same faults.
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import Qt
+
+from app import NotesGenerationWorker, OpenRouterClient
+from bench_search import percentile
+from fake_llm_server import FakeLLMServer, build_parser
+
+
+def run_job(llm_type, model, url, hedge):
+    worker = NotesGenerationWorker(
+        "Here is a short synthetic transcript about gradient descent and networks.",
+        llm_type=llm_type, model=model, api_key="fake" if llm_type == "openrouter" else None,
+        hedge=hedge, ollama_host=url,
+    )
+    result = {"backend": llm_type, "chunks": 0, "chars": 0, "error": None, "hedge": None}
+    started = time.perf_counter()
+
+    def on_chunk(text):
+        if result["chunks"] == 0:
+            result["first_chunk"] = time.perf_counter() - started
+        result["chunks"] += 1
+        result["chars"] += len(text)
+
+    # Direct connections run the slots on the job thread; there is no event loop here
+    worker.chunk_received.connect(on_chunk, Qt.DirectConnection)
+    worker.error.connect(lambda message: result.update(error=message), Qt.DirectConnection)
+    worker.hedge_decided.connect(lambda name, reason: result.update(hedge=f"{name} ({reason})"),
+                                 Qt.DirectConnection)
+    worker.generate_notes()
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def report(label, results):
+    ok = [r for r in results if r["error"] is None]
+    print(f"\n{label}: {len(ok)}/{len(results)} succeeded")
+    for error in sorted({r["error"] for r in results if r["error"]}):
+        print(f"  error: {error} (x{sum(1 for r in results if r['error'] == error)})")
+    if ok:
+        first = [r["first_chunk"] * 1000 for r in ok if "first_chunk" in r]
+        rates = [r["chunks"] / r["seconds"] for r in ok]
+        print(f"  first chunk  p50 {percentile(first, 0.5):.0f}ms  p95 {percentile(first, 0.95):.0f}ms")
+        print(f"  chunks/s     p50 {percentile(rates, 0.5):.1f}  min {min(rates):.1f}")
+        print(f"  job time     p50 {percentile([r['seconds'] for r in ok], 0.5):.2f}s  "
+              f"max {max(r['seconds'] for r in ok):.2f}s")
+    hedges = [r["hedge"] for r in results if r["hedge"]]
+    if hedges:
+        print("  hedge winners: " + ", ".join(f"{h} x{hedges.count(h)}" for h in sorted(set(hedges))))
+
+
+def main():
+    parser = build_parser()
+    parser.description = __doc__
+    parser.set_defaults(port=0, quiet=True)
+    parser.add_argument("--backend", choices=["local", "openrouter", "both"], default="both")
+    parser.add_argument("--jobs", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--hedge", action="store_true", help="race the other backend as the hedge")
+    parser.add_argument("--hedge-deadline", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = FakeLLMServer(args)
+    server.start()
+    client = OpenRouterClient.instance()
+    client.set_base_url(server.url + "/v1")
+    model = args.models[0]
+    print(f"fake server on {server.url}, {args.jobs} jobs, {args.concurrency} at a time")
+
+    backends = ["local", "openrouter"] if args.backend == "both" else [args.backend]
+    try:
+        for llm_type in backends:
+            hedge = None
+            if args.hedge:
+                other = "openrouter" if llm_type == "local" else "local"
+                hedge = {"llm_type": other, "model": model, "api_key": "fake" if other == "openrouter" else None,
+                         "deadline": args.hedge_deadline, "min_rate": 0}
+            before = client.stats()
+            with ThreadPoolExecutor(args.concurrency) as pool:
+                results = list(pool.map(lambda _: run_job(llm_type, model, server.url, hedge), range(args.jobs)))
+            report(llm_type, results)
+            if llm_type == "openrouter" or args.hedge:
+                after = client.stats()
+                print(f"  openrouter client: {after['requests'] - before['requests']} requests, "
+                      f"{after['rejections'] - before['rejections']} rate limited, "
+                      f"{after['wait_time'] - before['wait_time']:.1f}s waiting in the limiter")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""Peak memory and time of one notes job with low-resource mode off and on.
+
+    python benchmarks/bench_low_resource.py [--size lecture] [--chunk 40] [--no-chromium]
+
+Each mode runs in its own process so peaks do not leak between them. A job is a
+synthetic transcript (compressed in low-resource mode), the bench_render notes
+streamed into a QTextBrowser in small chunks (repainted per chunk, or on the
+throttle timer in low-resource mode), then a PDF export through Chromium or
+through Qt's own typesetter. Peak RSS covers the process tree, so Chromium's
+child processes count; psutil makes the tree peak available, otherwise only
+ru_maxrss of this process and its children is reported.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_render import SIZES, WORDS, synthetic_notes
+
+FILLERS = ("um", "uh", "you know", "like", "[Music]", "[Applause]")
+
+
+def synthetic_transcript(target_chars, seed=0):
+    rng = random.Random(seed)
+    lines, size = [], 0
+    while size < target_chars:
+        words = [rng.choice(WORDS) for _ in range(rng.randint(6, 14))]
+        for _ in range(rng.randint(0, 3)):
+            words.insert(rng.randrange(len(words)), rng.choice(FILLERS))
+        line = " ".join(words)
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def sample_tree_peak(stop, peaks):
+    import psutil
+
+    process = psutil.Process()
+    while not stop.is_set():
+        total = 0
+        for proc in [process] + process.children(recursive=True):
+            try:
+                total += proc.memory_info().rss
+            except psutil.Error:
+                pass
+        peaks.append(total)
+        time.sleep(0.02)
+
+
+def run_job(low, size, chunk, chromium):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication, QTextBrowser
+
+    from app import (
+        LOW_RESOURCE_RENDER_MS, PDF_EXPORT_OPTIONS, build_notes_document, compress_transcript,
+        native_pdf_export, render_notes_body,
+    )
+
+    stop, peaks, sampler = threading.Event(), [], None
+    try:
+        import psutil  # noqa: F401
+        sampler = threading.Thread(target=sample_tree_peak, args=(stop, peaks), daemon=True)
+        sampler.start()
+    except ImportError:
+        pass
+
+    app = QApplication.instance() or QApplication([])
+    start = time.perf_counter()
+    transcript = synthetic_transcript(SIZES[size] // 2)
+    prompt_chars = len(compress_transcript(transcript) if low else transcript)
+
+    view = QTextBrowser()
+    view.resize(800, 600)
+    notes = synthetic_notes(SIZES[size])
+    streamed, renders, pending_ms = "", 0, 0.0
+    for offset in range(0, len(notes), chunk):
+        streamed += notes[offset:offset + chunk]
+        # Chunks are spaced as if they arrived at 50 tokens/s, about 4 characters a token
+        pending_ms += chunk / 4 / 50 * 1000
+        if not low or pending_ms >= LOW_RESOURCE_RENDER_MS or offset + chunk >= len(notes):
+            view.setHtml(render_notes_body(streamed))
+            app.processEvents()
+            renders += 1
+            pending_ms = 0.0
+    body = render_notes_body(streamed)
+    render_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "notes.pdf")
+        export_start = time.perf_counter()
+        exporter = "qt"
+        if low or not chromium:
+            native_pdf_export(build_notes_document(body, for_pdf=True), filename)
+        else:
+            from playwright.sync_api import sync_playwright
+
+            exporter = "chromium"
+            with sync_playwright() as playwright:
+                browser = playwright.chromium.launch()
+                page = browser.new_page()
+                page.set_content(build_notes_document(body, for_pdf=True))
+                page.pdf(path=filename, **PDF_EXPORT_OPTIONS)
+                browser.close()
+        export_seconds = time.perf_counter() - export_start
+        pdf_bytes = os.path.getsize(filename)
+
+    stop.set()
+    if sampler is not None:
+        sampler.join()
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    scale = 1 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * scale
+    return {
+        "prompt_chars": prompt_chars,
+        "transcript_chars": len(transcript),
+        "renders": renders,
+        "render_seconds": render_seconds,
+        "exporter": exporter,
+        "export_seconds": export_seconds,
+        "pdf_bytes": pdf_bytes,
+        "peak_rss": max(peaks) if peaks else None,
+        "ru_maxrss": own + children,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", choices=SIZES, default="lecture")
+    parser.add_argument("--chunk", type=int, default=40, help="characters per streamed chunk")
+    parser.add_argument("--no-chromium", action="store_true", help="export with Qt in both modes")
+    parser.add_argument("--job", choices=["normal", "low"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.job:
+        print(json.dumps(run_job(args.job == "low", args.size, args.chunk, not args.no_chromium)))
+        return
+
+    from app import format_bytes
+
+    results = {}
+    for mode in ("normal", "low"):
+        command = [sys.executable, os.path.abspath(__file__), "--job", mode, "--size", args.size,
+                   "--chunk", str(args.chunk)] + (["--no-chromium"] if args.no_chromium else [])
+        output = subprocess.run(command, capture_output=True, text=True)
+        if output.returncode != 0:
+            sys.exit(f"{mode} run failed:\n{output.stderr}")
+        results[mode] = json.loads(output.stdout.strip().splitlines()[-1])
+
+    print(f"{'mode':<8}{'prompt':>10}{'renders':>9}{'stream':>10}{'export':>16}{'peak rss':>12}{'ru_maxrss':>12}")
+    for mode, r in results.items():
+        peak = format_bytes(r["peak_rss"]) if r["peak_rss"] else "-"
+        print(f"{mode:<8}{r['prompt_chars']:>10}{r['renders']:>9}{r['render_seconds']:>9.2f}s"
+              f"{r['exporter']:>9}{r['export_seconds']:>6.2f}s{peak:>12}{format_bytes(r['ru_maxrss']):>12}")
+    normal, low = results["normal"], results["low"]
+    print(f"\nprompt {1 - low['prompt_chars'] / normal['prompt_chars']:.0%} shorter, "
+          f"{normal['renders'] / max(low['renders'], 1):.0f}x fewer repaints")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Peak Python allocations while streaming one long answer into the notes view.
+
+    python benchmarks/bench_memory.py [--tokens 100000] [--format html] [--max-ratio 4]
+
+Replays --tokens synthetic tokens (about four characters each) through the
+real worker -> NotesBuffer -> YouTubeNotesView path using bench_pipeline's
+ReplayWorker and MeasuredView, unthrottled, under tracemalloc. Two peaks are
+reported: while the answer streams in, and while the finished notes are turned
+into the PDF document and typeset. Exits with status 1 when the streaming peak
+is more than --max-ratio times the size of the output, so it doubles as a
+regression check.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication, QWidget
+
+import app
+from bench_pipeline import THINK_PRELUDE, MeasuredView, ReplayWorker, synthetic_markdown, tokenize
+from bench_render import synthetic_notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=100_000)
+    parser.add_argument("--format", choices=["html", "markdown"], default="html")
+    parser.add_argument("--max-ratio", type=float, default=4.0, help="allowed streaming peak per byte of output")
+    args = parser.parse_args()
+
+    qt_app = QApplication.instance() or QApplication(sys.argv)
+    app.Tracer.instance().set_enabled(False)
+    app.NotesGenerationWorker = ReplayWorker
+
+    make = synthetic_notes if args.format == "html" else synthetic_markdown
+    tokens = tokenize(THINK_PRELUDE + make(args.tokens * 4), random.Random(0))[:args.tokens]
+    output_bytes = sum(len(token) for token in tokens)
+    ReplayWorker.tokens = tokens
+    ReplayWorker.rate = 0
+
+    with tempfile.TemporaryDirectory() as directory:
+        transcript_path = os.path.join(directory, "transcript.txt")
+        with open(transcript_path, "w", encoding="utf-8") as f:
+            f.write("synthetic transcript\n")
+        tracemalloc.start()
+        view = MeasuredView(QWidget(), transcript_path)
+        view.show()
+        if not view.done:
+            view.finished_loop.exec()
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+        html_content = app.build_notes_document(view.current_body(), for_pdf=True)
+        app.native_pdf_export(html_content, os.path.join(directory, "notes.pdf"))
+        export_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    ratio = stream_peak / output_bytes
+    print(f"{len(tokens)} tokens, {app.format_bytes(output_bytes)} of output, {len(view.latencies)} view updates")
+    print(f"streaming peak: {app.format_bytes(stream_peak)} ({ratio:.2f}x the output)")
+    print(f"export peak:    {app.format_bytes(export_peak)} ({export_peak / output_bytes:.2f}x)")
+    if ratio > args.max_ratio:
+        print(f"FAIL: streaming peak is over {args.max_ratio:g}x the output")
+        sys.exit(1)
+    del qt_app
+
+
+if __name__ == "__main__":
+    main()
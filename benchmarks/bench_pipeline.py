@@ -0,0 +1,299 @@
+"""End-to-end notes pipeline benchmark with a JSON baseline.
+
+    python benchmarks/bench_pipeline.py [--sizes "short clip,lecture"] [--rate 1000]
+                                        [--save baseline.json] [--compare baseline.json]
+
+Runs headless (QT_QPA_PLATFORM=offscreen unless set). For each size and output
+format, a synthetic transcript is written to disk and a synthetic model answer
+is replayed token by token at --rate tokens/s through the real
+NotesGenerationWorker -> YouTubeNotesView path, so ThinkFilter, the shared
+NotesBuffer, the queued output_ready wake-up, on_output_ready and the notes
+panel repaint are all on the clock. The finished notes are then rendered for
+PDF and typeset with Qt; --chromium also prints them through PdfExportWorker.
+
+Reported per run: tokens/s actually delivered, latency percentiles from a
+wake-up on the worker thread to repaint done on the GUI thread, render time per
+wake-up, export times, and peak memory (tracemalloc over a second, unthrottled
+replay for Python allocations, ru_maxrss for the process). --compare flags
+every metric more than --tolerance worse than the baseline and exits with
+status 1 if any are.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QEventLoop, Qt
+from PySide6.QtWidgets import QApplication, QWidget
+
+import app
+from bench_low_resource import synthetic_transcript
+from bench_render import SIZES, WORDS, synthetic_notes
+from bench_search import percentile
+
+# Direction each metric should move in; anything else in a result is context
+METRICS = {
+    "tokens_per_second": "higher",
+    "latency_p50_ms": "lower",
+    "latency_p95_ms": "lower",
+    "latency_p99_ms": "lower",
+    "render_mean_ms": "lower",
+    "render_max_ms": "lower",
+    "stream_seconds": "lower",
+    "document_ms": "lower",
+    "native_pdf_ms": "lower",
+    "chromium_pdf_ms": "lower",
+    "python_peak_bytes": "lower",
+}
+THINK_PRELUDE = "<think>\nThe transcript covers several topics, so group them into sections.\n</think>\n"
+
+
+def synthetic_markdown(target_chars, seed=0):
+    rng = random.Random(seed)
+    parts = ["# Synthetic Lecture Notes\n\n"]
+    size, section = 0, 0
+    while size < target_chars:
+        section += 1
+        block = [f"## Section {section}: {rng.choice(WORDS).title()}\n"]
+        block.append(" ".join(rng.choice(WORDS) for _ in range(30)) + f" **{rng.choice(WORDS)}**.\n")
+        block.extend(f"- {' '.join(rng.choice(WORDS) for _ in range(8))}\n" for _ in range(4))
+        if section % 3 == 0:
+            block.append("\n| Term | Meaning |\n|---|---|\n")
+            block.extend(f"| {rng.choice(WORDS)} | {' '.join(rng.choice(WORDS) for _ in range(6))} |\n"
+                         for _ in range(3))
+        text = "\n".join(block) + "\n"
+        parts.append(text)
+        size += len(text)
+    return "".join(parts)
+
+
+def tokenize(text, rng):
+    # Model tokens average about four characters
+    tokens, position = [], 0
+    while position < len(text):
+        step = rng.randint(1, 7)
+        tokens.append(text[position:position + step])
+        position += step
+    return tokens
+
+
+class ReplayWorker(app.NotesGenerationWorker):
+    tokens = []
+    rate = 0.0
+    emitted = deque()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Runs on the worker thread at emit time, before the queued delivery to the view
+        self.output_ready.connect(self.stamp, Qt.DirectConnection)
+
+    def stamp(self):
+        self.emitted.append(time.perf_counter())
+
+    def stream_backend(self, llm_type, model, api_key, messages, timing=None, on_stream=None):
+        interval = 1.0 / self.rate if self.rate > 0 else 0.0
+        next_at = time.perf_counter()
+        for token in self.tokens:
+            if interval:
+                next_at += interval
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            yield token
+
+
+class MeasuredView(app.YouTubeNotesView):
+    def __init__(self, *args, **kwargs):
+        self.latencies = []
+        self.renders = []
+        self.done = False
+        self.finished_loop = QEventLoop()
+        super().__init__(*args, **kwargs)
+
+    def on_notes_generated(self, notes):
+        super().on_notes_generated(notes)
+        self.done = True
+        self.finished_loop.quit()
+
+    def on_notes_error(self, error_msg):
+        super().on_notes_error(error_msg)
+        self.done = True
+        self.finished_loop.quit()
+
+    def on_output_ready(self):
+        start = time.perf_counter()
+        super().on_output_ready()
+        done = time.perf_counter()
+        self.renders.append(done - start)
+        self.latencies.append(done - ReplayWorker.emitted.popleft())
+
+    def save_bundle(self):
+        pass
+
+
+def chromium_export(html_content, filename):
+    worker = app.PdfExportWorker()
+    errors = []
+    worker.error.connect(lambda filename, message: errors.append(message))
+    start = time.perf_counter()
+    try:
+        worker.export(html_content, filename)
+    finally:
+        worker.close_browser()
+    if errors:
+        raise RuntimeError(errors[0])
+    return time.perf_counter() - start
+
+
+def replay(transcript_path, tokens, rate, pdf_path):
+    ReplayWorker.tokens = tokens
+    ReplayWorker.rate = rate
+    ReplayWorker.emitted.clear()
+    start = time.perf_counter()
+    view = MeasuredView(QWidget(), transcript_path)
+    view.resize(1200, 800)
+    view.show()
+    if not view.done:
+        view.finished_loop.exec()
+    stream_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    html_content = app.build_notes_document(view.current_body(), for_pdf=True)
+    document_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    app.native_pdf_export(html_content, pdf_path)
+    native_pdf_ms = (time.perf_counter() - start) * 1000
+    view.close()
+    view.deleteLater()
+    return view, html_content, stream_seconds, document_ms, native_pdf_ms
+
+
+def run(size, notes_format, rate, chromium, directory):
+    rng = random.Random(0)
+    target = SIZES[size] if size in SIZES else int(size)
+    transcript_path = os.path.join(directory, "transcript.txt")
+    with open(transcript_path, "w", encoding="utf-8") as f:
+        f.write(synthetic_transcript(target // 2))
+    output = synthetic_notes(target) if notes_format == "html" else synthetic_markdown(target)
+    tokens = tokenize(THINK_PRELUDE + output, rng)
+    pdf_path = os.path.join(directory, "notes.pdf")
+
+    view, html_content, stream_seconds, document_ms, native_pdf_ms = replay(transcript_path, tokens, rate, pdf_path)
+    # tracemalloc slows every allocation, so memory gets its own unthrottled pass
+    tracemalloc.start()
+    replay(transcript_path, tokens, 0, pdf_path)
+    python_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    latencies = [value * 1000 for value in view.latencies]
+    renders = [value * 1000 for value in view.renders]
+    result = {
+        "tokens": len(tokens),
+        "notifications": len(latencies),
+        "output_chars": len(view.notes_buffer),
+        "tokens_per_second": round(len(tokens) / stream_seconds, 1),
+        "latency_p50_ms": round(percentile(latencies, 0.50), 3),
+        "latency_p95_ms": round(percentile(latencies, 0.95), 3),
+        "latency_p99_ms": round(percentile(latencies, 0.99), 3),
+        "render_mean_ms": round(statistics.mean(renders), 3),
+        "render_max_ms": round(max(renders), 3),
+        "stream_seconds": round(stream_seconds, 3),
+        "document_ms": round(document_ms, 3),
+        "native_pdf_ms": round(native_pdf_ms, 3),
+        "python_peak_bytes": python_peak,
+    }
+    if chromium:
+        try:
+            result["chromium_pdf_ms"] = round(chromium_export(html_content, pdf_path) * 1000, 3)
+        except Exception as e:
+            print(f"chromium unavailable, skipping: {e}", file=sys.stderr)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"\n{'run':<24}{'metric':<20}{'baseline':>12}{'now':>12}{'change':>9}")
+    for key, result in results.items():
+        for metric, direction in METRICS.items():
+            old, new = baseline.get(key, {}).get(metric), result.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change < -tolerance if direction == "higher" else change > tolerance
+            if worse:
+                regressions.append((key, metric))
+            print(f"{key:<24}{metric:<20}{old:>12g}{new:>12g}{change:>+8.0%}{'  REGRESSION' if worse else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="short clip,lecture", help=f"comma separated: {', '.join(SIZES)} or a character count")
+    parser.add_argument("--formats", default="html,markdown")
+    parser.add_argument("--rate", type=float, default=1000, help="tokens/s to replay at, 0 for as fast as possible")
+    parser.add_argument("--chromium", action="store_true", help="also time the Chromium PDF export")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier --save")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    qt_app = QApplication.instance() or QApplication(sys.argv)
+    app.Tracer.instance().set_enabled(False)
+    # The view builds its worker by name, so the replay stands in for the model there
+    app.NotesGenerationWorker = ReplayWorker
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in args.sizes.split(","):
+            for notes_format in args.formats.split(","):
+                key = f"{size}/{notes_format}"
+                results[key] = run(size, notes_format, args.rate, args.chromium, directory)
+                r = results[key]
+                print(f"{key:<24}{r['tokens_per_second']:>9.0f} tok/s  p50 {r['latency_p50_ms']:.2f}ms  "
+                      f"p95 {r['latency_p95_ms']:.2f}ms  p99 {r['latency_p99_ms']:.2f}ms  "
+                      f"render {r['render_mean_ms']:.2f}ms avg  pdf {r['native_pdf_ms']:.0f}ms  "
+                      f"peak {app.format_bytes(r['python_peak_bytes'])}")
+
+    # ru_maxrss is in KB on Linux and bytes on macOS; it covers the whole run, not one job
+    try:
+        import resource
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        print(f"process peak RSS: {app.format_bytes(peak_rss)}")
+    except ImportError:
+        peak_rss = None
+
+    report = {
+        "meta": {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "rate": args.rate,
+            "peak_rss_bytes": peak_rss,
+        },
+        "results": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"saved {args.save}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+    del qt_app
+
+
+if __name__ == "__main__":
+    main()
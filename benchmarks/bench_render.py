@@ -0,0 +1,119 @@
+"""Microbenchmarks for the notes rendering pipeline.
+
+    python benchmarks/bench_render.py [--repeat N]
+
+Compares the old Markdown + BeautifulSoup render with the HTML fast path. The
+old view paid the full render on every streamed chunk; the fast path only
+sanitizes the new text, shown as the per-chunk streaming cost.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown
+from bs4 import BeautifulSoup
+
+from app import NOTES_SCREEN_CSS, NotesHtmlSanitizer, build_notes_document, render_notes_body
+
+WORDS = (
+    "model gradient transcript lecture network function value example concept memory process "
+    "signal system theory data layer result method structure pattern approach context"
+).split()
+
+SIZES = {"short clip": 4_000, "lecture": 40_000, "3h course": 200_000}
+
+
+def sentence(rng, words=14):
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text.capitalize() + "."
+
+
+def synthetic_notes(target_chars, seed=0):
+    rng = random.Random(seed)
+    parts = ["```html\n<h1>Synthetic Lecture Notes</h1>\n"]
+    size = 0
+    section = 0
+    while size < target_chars:
+        section += 1
+        block = [f"<h2>Section {section}: {sentence(rng, 4)}</h2>"]
+        block.append(f"<p>{sentence(rng)} <strong>{rng.choice(WORDS)}</strong> {sentence(rng)}</p>")
+        block.append("<ul>" + "".join(f"<li>{sentence(rng, 8)}</li>" for _ in range(4)) + "</ul>")
+        if section % 3 == 0:
+            block.append("<table><tr><th>Term</th><th>Meaning</th></tr>"
+                         + "".join(f"<tr><td>{rng.choice(WORDS)}</td><td>{sentence(rng, 6)}</td></tr>"
+                                   for _ in range(3))
+                         + "</table>")
+        if section % 4 == 0:
+            block.append(f"<pre><code>def f(x):\n    return x &lt; {section}</code></pre>")
+        block.append(f"<blockquote>{sentence(rng)}</blockquote>")
+        text = "\n".join(block) + "\n"
+        parts.append(text)
+        size += len(text)
+    parts.append("```")
+    return "".join(parts)
+
+
+def legacy_render(markdown_text):
+    # The pre-fast-path markdown_to_html, kept here as the baseline
+    clean_text = re.sub(r'<style.*?>.*?</style>', '', markdown_text, flags=re.DOTALL)
+    clean_text = re.sub(r'style="[^"]*"', '', clean_text)
+    clean_text = re.sub(r'```html?', '', clean_text)
+    clean_text = re.sub(r'```', '', clean_text)
+    html = markdown.markdown(clean_text)
+    soup = BeautifulSoup(html, 'html.parser')
+    for a in soup.find_all('a', href=True):
+        a['target'] = '_blank'
+        a['rel'] = 'noopener noreferrer'
+    style = soup.new_tag('style')
+    style.string = NOTES_SCREEN_CSS
+    soup.insert(0, style)
+    return str(soup)
+
+
+def fast_render(text):
+    return build_notes_document(render_notes_body(text), for_pdf=True)
+
+
+def chunks(text, size=4):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def streaming_sanitize(parts):
+    sanitizer = NotesHtmlSanitizer()
+    for part in parts:
+        sanitizer.feed_text(part)
+    sanitizer.close_text()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'size':<12}{'chars':>9}{'legacy full':>14}{'fast full':>12}{'speedup':>9}{'stream/chunk':>15}")
+    for label, target in SIZES.items():
+        text = synthetic_notes(target)
+        parts = chunks(text)
+        legacy = best_of(lambda: legacy_render(text), args.repeat)
+        fast = best_of(lambda: fast_render(text), args.repeat)
+        stream = best_of(lambda: streaming_sanitize(parts), args.repeat)
+        print(f"{label:<12}{len(text):>9}{legacy * 1e3:>12.2f}ms{fast * 1e3:>10.2f}ms{legacy / fast:>8.1f}x"
+              f"{stream / len(parts) * 1e6:>13.2f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Full-text search over a synthetic notes library.
+
+    python benchmarks/bench_search.py [--notes 10000] [--queries 200]
+
+Builds a throwaway NotesLibrary with synthetic notes, then reports index build
+time, database size on disk and ranked query latency percentiles.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import NotesLibrary
+
+VOCABULARY_SIZE = 20_000
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def make_vocabulary(rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    words = set()
+    while len(words) < VOCABULARY_SIZE:
+        words.add("".join(rng.choice(letters) for _ in range(rng.randint(3, 10))))
+    words = sorted(words)
+    # Zipf-like weights so a few words are everywhere and most are rare, like real notes
+    weights = [1.0 / (rank + 1) for rank in range(len(words))]
+    return words, weights
+
+
+def synthetic_text(rng, words, weights, chars):
+    count = chars // 7
+    return " ".join(rng.choices(words, weights, k=count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument("--note-chars", type=int, default=12_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "library.db")
+        library = NotesLibrary(db_path)
+        words, weights = make_vocabulary(rng)
+
+        start = time.perf_counter()
+        for i in range(args.notes):
+            title = "Lecture " + synthetic_text(rng, words, weights, 40)
+            row = library.add(title=title, pdf_path=os.path.join(tmp, f"{i}.pdf"))
+            library.index_text(row["id"], title, synthetic_text(rng, words, weights, args.note_chars))
+        build = time.perf_counter() - start
+        library.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        size = os.path.getsize(db_path)
+
+        # Queries drawn from the same distribution as the text, plus prefix searches
+        queries = [" ".join(rng.choices(words, weights, k=rng.randint(1, 2))) for _ in range(args.queries // 2)]
+        queries += [f"{rng.choice(words)} {rng.choice(words)[:3]}" for _ in range(args.queries // 2)]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            library.search(query, limit=50)
+            latencies.append((time.perf_counter() - start) * 1e3)
+
+    print(f"notes:        {args.notes}")
+    print(f"index build:  {build:.1f}s ({args.notes / build:.0f} notes/s)")
+    print(f"db size:      {size / 1e6:.1f} MB")
+    print(f"query p50:    {statistics.median(latencies):.2f} ms")
+    print(f"query p95:    {percentile(latencies, 0.95):.2f} ms")
+    print(f"query max:    {max(latencies):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Vectorized cosine top-k over a memory-mapped section matrix.
+
+    python benchmarks/bench_semantic.py [--sections 100000] [--dim 768]
+
+Fills a throwaway SemanticIndex with random unit vectors (no Ollama needed)
+and reports build time, matrix size and query latency percentiles.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app import NotesLibrary, SemanticIndex
+from bench_search import percentile
+
+SECTIONS_PER_NOTE = 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sections", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=768)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "library.db")
+        library = NotesLibrary(db_path)
+        index = SemanticIndex(db_path, os.path.join(tmp, "sections.f32"), "synthetic")
+
+        start = time.perf_counter()
+        for note in range(args.sections // SECTIONS_PER_NOTE):
+            row = library.add(title=f"Note {note}", pdf_path=os.path.join(tmp, f"{note}.pdf"))
+            sections = [(f"Section {i}", "synthetic section text") for i in range(SECTIONS_PER_NOTE)]
+            index.add(row["id"], sections, rng.standard_normal((SECTIONS_PER_NOTE, args.dim), dtype=np.float32))
+        build = time.perf_counter() - start
+        size = os.path.getsize(index.vectors_path)
+        count = index.count()
+
+        # Cold first query maps the file; the rest are served from the page cache
+        latencies = []
+        for _ in range(args.queries):
+            query = rng.standard_normal(args.dim, dtype=np.float32)
+            start = time.perf_counter()
+            index.search(query, k=args.k)
+            latencies.append((time.perf_counter() - start) * 1e3)
+
+    print(f"sections:     {count} x {args.dim}")
+    print(f"build:        {build:.1f}s")
+    print(f"matrix size:  {size / 1e6:.0f} MB")
+    print(f"query first:  {latencies[0]:.1f} ms")
+    print(f"query p50:    {statistics.median(latencies):.1f} ms")
+    print(f"query p95:    {percentile(latencies, 0.95):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
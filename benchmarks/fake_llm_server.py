@@ -0,0 +1,327 @@
+"""Deterministic stand-in for Ollama and OpenRouter, for offline load testing.
+
+    python benchmarks/fake_llm_server.py [--port 11435] [--first-token-delay 0.5] [--rate 40]
+                                         [--chunk-chars 1,7] [--think] [--split-tags]
+                                         [--error-rate 0.05] [--drop-rate 0.05]
+                                         [--rate-limit-every 5] [--retry-after 2]
+
+Speaks the Ollama API (/api/chat streamed as NDJSON, /api/tags so 'ollama
+list' works, /api/embed) and the OpenAI-compatible API (/v1/chat/completions
+streamed as SSE, /v1/models). Point the app at it in Settings: Ollama host
+http://127.0.0.1:PORT, or API base URL http://127.0.0.1:PORT/v1 with any API
+key.
+
+The answer is synthetic HTML notes like bench_render's, optionally behind a <think>
+block, cut into chunks of --chunk-chars characters and sent at --rate chunks/s
+after --first-token-delay. --split-tags forces chunk boundaries inside the
+think tags. Faults are drawn from a generator seeded with --seed and the
+request number, so a run replays the same way: --error-rate answers with a 500
+(Ollama: an error line) before streaming, --drop-rate cuts the stream halfway,
+and --rate-limit-every N answers every Nth OpenAI request with a 429 carrying
+Retry-After.
+"""
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "model gradient transcript lecture network function value example concept memory process "
+    "signal system theory data layer result method structure pattern approach context"
+).split()
+THINK_TAGS = ("<think>", "</think>")
+THINK_TEXT = "The transcript jumps between topics, so I will group them into sections before writing.\n"
+EMBEDDING_DIM = 64
+
+
+def synthetic_answer(target_chars, seed):
+    # Same shape as bench_render.synthetic_notes, kept stdlib-only so the server needs neither Qt nor the app
+    rng = random.Random(seed)
+    sentence = lambda words: " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+    parts = ["```html\n<h1>Synthetic Lecture Notes</h1>\n"]
+    size, section = 0, 0
+    while size < target_chars:
+        section += 1
+        text = (f"<h2>Section {section}: {sentence(4)}</h2>\n"
+                f"<p>{sentence(14)} <strong>{rng.choice(WORDS)}</strong> {sentence(14)}</p>\n"
+                "<ul>" + "".join(f"<li>{sentence(8)}</li>" for _ in range(4)) + "</ul>\n")
+        parts.append(text)
+        size += len(text)
+    parts.append("```")
+    return "".join(parts)
+
+
+def answer_text(config):
+    text = synthetic_answer(config.chars, config.seed)
+    if config.think:
+        text = f"{THINK_TAGS[0]}\n{THINK_TEXT}{THINK_TAGS[1]}\n" + text
+    return text
+
+
+def split_chunks(text, rng, low, high, split_tags):
+    chunks, position = [], 0
+    while position < len(text):
+        end = position + rng.randint(low, high)
+        if split_tags:
+            # End this chunk inside the next tag so the client sees e.g. "<thi" + "nk>"
+            for tag in THINK_TAGS:
+                start = text.find(tag, position)
+                if start != -1 and start < end:
+                    end = max(start + len(tag) // 2, position + 1)
+                    break
+        chunks.append(text[position:end])
+        position = end
+    return chunks
+
+
+def fake_embedding(text):
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    values = [byte / 255.0 - 0.5 for byte in (digest * (EMBEDDING_DIM // len(digest) + 1))[:EMBEDDING_DIM]]
+    norm = sum(v * v for v in values) ** 0.5 or 1.0
+    return [v / norm for v in values]
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeLLM/1.0"
+
+    def log_message(self, format, *args):
+        if not self.server.config.quiet:
+            super().log_message(format, *args)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        return json.loads(body or b"{}")
+
+    def send_json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def start_stream(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_chunk(self, data):
+        data = data.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def end_stream(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def do_GET(self):
+        models = self.server.config.models
+        if self.path.rstrip("/") == "/api/tags":
+            now = datetime.now(timezone.utc).isoformat()
+            self.send_json(200, {"models": [
+                {"name": name, "model": name, "modified_at": now, "size": 1_000_000_000,
+                 "digest": hashlib.sha256(name.encode()).hexdigest(),
+                 "details": {"format": "gguf", "family": "fake", "parameter_size": "1B"}}
+                for name in models
+            ]})
+        elif self.path.rstrip("/") == "/api/version":
+            self.send_json(200, {"version": "0.0.0-fake"})
+        elif self.path.rstrip("/").endswith("/models"):
+            self.send_json(200, {"object": "list", "data": [
+                {"id": name, "object": "model", "owned_by": "fake"} for name in models
+            ]})
+        else:
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+
+    def do_POST(self):
+        request = self.read_json()
+        path = self.path.rstrip("/")
+        if path == "/api/chat":
+            self.ollama_chat(request)
+        elif path == "/api/embed":
+            inputs = request.get("input") or []
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            self.send_json(200, {"model": request.get("model"), "embeddings": [fake_embedding(t) for t in inputs]})
+        elif path.endswith("/chat/completions"):
+            self.openai_chat(request)
+        else:
+            self.send_json(404, {"error": f"unknown path {self.path}"})
+
+    def plan(self):
+        # One deterministic generator per request number, so reruns inject the same faults
+        config = self.server.config
+        number = next(self.server.requests)
+        rng = random.Random(f"{config.seed}:{number}")
+        return {
+            "number": number,
+            "fail": rng.random() < config.error_rate,
+            "drop": rng.random() < config.drop_rate,
+            "chunks": split_chunks(self.server.answer, rng, *config.chunk_chars, config.split_tags),
+        }
+
+    def paced(self, chunks, drop):
+        config = self.server.config
+        time.sleep(config.first_token_delay)
+        interval = 1.0 / config.rate if config.rate > 0 else 0.0
+        next_at = time.monotonic()
+        limit = len(chunks) // 2 if drop else len(chunks)
+        for chunk in chunks[:limit]:
+            yield chunk
+            if interval:
+                next_at += interval
+                delay = next_at - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+    def ollama_chat(self, request):
+        plan = self.plan()
+        model = request.get("model", "fake")
+        if plan["fail"]:
+            self.send_json(500, {"error": "injected failure"})
+            return
+        created = lambda: datetime.now(timezone.utc).isoformat()
+        if not request.get("stream", True):
+            text = "".join(self.paced(plan["chunks"], plan["drop"]))
+            self.send_json(200, {"model": model, "created_at": created(), "done": True, "done_reason": "stop",
+                                 "message": {"role": "assistant", "content": text}})
+            return
+        started = time.monotonic()
+        self.start_stream("application/x-ndjson")
+        count = 0
+        for chunk in self.paced(plan["chunks"], plan["drop"]):
+            count += 1
+            self.write_chunk(json.dumps({"model": model, "created_at": created(), "done": False,
+                                         "message": {"role": "assistant", "content": chunk}}) + "\n")
+        if plan["drop"]:
+            # Ollama reports mid-stream failures as an error line
+            self.write_chunk(json.dumps({"error": "injected stream drop"}) + "\n")
+        else:
+            self.write_chunk(json.dumps({
+                "model": model, "created_at": created(), "done": True, "done_reason": "stop",
+                "message": {"role": "assistant", "content": ""},
+                "total_duration": int((time.monotonic() - started) * 1e9),
+                # The fake model is always loaded
+                "load_duration": 0,
+                "prompt_eval_count": sum(len(m.get("content", "")) for m in request.get("messages", [])) // 4,
+                "eval_count": count,
+            }) + "\n")
+        self.end_stream()
+
+    def openai_chat(self, request):
+        config = self.server.config
+        plan = self.plan()
+        model = request.get("model", "fake")
+        if config.rate_limit_every and plan["number"] % config.rate_limit_every == config.rate_limit_every - 1:
+            self.send_json(429, {"error": {"message": "Rate limit exceeded (injected)", "code": 429}},
+                           {"Retry-After": f"{config.retry_after:g}"})
+            return
+        if plan["fail"]:
+            self.send_json(500, {"error": {"message": "injected failure", "code": 500}})
+            return
+        completion_id = f"chatcmpl-fake-{plan['number']}"
+
+        def event(delta, finish_reason=None):
+            return "data: " + json.dumps({
+                "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }) + "\n\n"
+
+        if not request.get("stream"):
+            text = "".join(self.paced(plan["chunks"], plan["drop"]))
+            self.send_json(200, {"id": completion_id, "object": "chat.completion", "created": int(time.time()),
+                                 "model": model, "choices": [{"index": 0, "finish_reason": "stop",
+                                                              "message": {"role": "assistant", "content": text}}]})
+            return
+        self.start_stream("text/event-stream")
+        self.write_chunk(event({"role": "assistant", "content": ""}))
+        for chunk in self.paced(plan["chunks"], plan["drop"]):
+            self.write_chunk(event({"content": chunk}))
+        if plan["drop"]:
+            # Hang up without [DONE], like a proxy dropping the connection
+            self.close_connection = True
+            self.wfile.flush()
+            return
+        self.write_chunk(event({}, "stop"))
+        self.write_chunk("data: [DONE]\n\n")
+        self.end_stream()
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose after an error line or a cancelled hedge
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def __init__(self, config):
+        super().__init__((config.host, config.port), FakeLLMHandler)
+        self.config = config
+        self.answer = answer_text(config)
+        self.requests = itertools.count()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+def chunk_range(value):
+    low, _, high = value.partition(",")
+    low, high = int(low), int(high or low)
+    if not 1 <= low <= high:
+        raise argparse.ArgumentTypeError("expected MIN,MAX with 1 <= MIN <= MAX")
+    return low, high
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435, help="0 picks a free port")
+    parser.add_argument("--models", default="fake:latest,fake-small:latest",
+                        type=lambda value: [name for name in value.split(",") if name])
+    parser.add_argument("--chars", type=int, default=8000, help="size of the streamed answer")
+    parser.add_argument("--first-token-delay", type=float, default=0.5, help="seconds before the first chunk")
+    parser.add_argument("--rate", type=float, default=40, help="chunks per second, 0 for no pacing")
+    parser.add_argument("--chunk-chars", type=chunk_range, default=(1, 7), help="MIN,MAX characters per chunk")
+    parser.add_argument("--think", action="store_true", help="start the answer with a <think> block")
+    parser.add_argument("--split-tags", action="store_true", help="cut chunks inside the think tags")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail up front")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="fraction of streams cut off halfway")
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="429 every Nth OpenAI request")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds on a 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--quiet", action="store_true")
+    return parser
+
+
+def main():
+    config = build_parser().parse_args()
+    server = FakeLLMServer(config)
+    print(f"fake LLM server on {server.url}  (Ollama host: {server.url}, OpenAI base URL: {server.url}/v1)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Open and close notes views mid-stream and check nothing is left running.
+
+    python benchmarks/soak_lifecycle.py [--cycles 50] [--dwell 50,400] [--hedge] [--long-prefill] [server options]
+
+Starts benchmarks/fake_llm_server.py in-process and, --cycles times, opens a
+YouTubeNotesView streaming from it, waits a random --dwell milliseconds (so
+some jobs are cut off before the first token, some mid-stream and a few after
+they finish) and closes it the way navigation does: cancel the job in the
+JobRegistry, then deleteLater the view. --hedge races the OpenAI-compatible
+endpoint as well, so BackendStream threads are on the books too.
+--long-prefill holds every first token back for a minute, longer than
+--settle, so each job is closed while its request is still waiting on the
+server and only passes if closing it really cuts the connection.
+
+Prints the peak of each JobRegistry count during the run and the counts after
+a final shutdown. Exits with status 1 if any count has not returned to zero
+within --settle seconds.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtCore import QEventLoop, QTimer
+from PySide6.QtWidgets import QApplication, QWidget
+
+import app
+from fake_llm_server import FakeLLMServer, build_parser
+
+
+class SoakView(app.YouTubeNotesView):
+    def save_bundle(self):
+        pass
+
+
+def pump(milliseconds):
+    loop = QEventLoop()
+    QTimer.singleShot(milliseconds, loop.quit)
+    loop.exec()
+
+
+def main():
+    parser = build_parser()
+    parser.description = __doc__
+    parser.set_defaults(port=0, quiet=True, first_token_delay=0.1, rate=200, chars=2000)
+    parser.add_argument("--cycles", type=int, default=50)
+    parser.add_argument("--dwell", default="50,400", help="MIN,MAX milliseconds a view stays open")
+    parser.add_argument("--hedge", action="store_true", help="race the OpenAI-compatible endpoint as the hedge")
+    parser.add_argument("--settle", type=float, default=5.0, help="seconds allowed for the counts to reach zero")
+    parser.add_argument("--long-prefill", action="store_true", help="close every view before its first token")
+    args = parser.parse_args()
+    if args.long_prefill:
+        args.first_token_delay = 60.0
+    low, _, high = args.dwell.partition(",")
+    dwell = (int(low), int(high or low))
+
+    qt_app = QApplication.instance() or QApplication(sys.argv)
+    app.Tracer.instance().set_enabled(False)
+    server = FakeLLMServer(args)
+    server.start()
+    app.OpenRouterClient.instance().set_base_url(server.url + "/v1")
+    registry = app.JobRegistry.instance()
+    rng = random.Random(args.seed)
+    model = args.models[0]
+    hedge = {"llm_type": "openrouter", "model": model, "api_key": "fake", "deadline": 0.05, "min_rate": 0}
+
+    directory = tempfile.mkdtemp()
+    transcript_path = os.path.join(directory, "transcript.txt")
+    with open(transcript_path, "w", encoding="utf-8") as f:
+        f.write("A short synthetic transcript about gradient descent.\n")
+
+    peaks = dict.fromkeys(("jobs",) + app.JOB_RESOURCE_KINDS, 0)
+    started = time.perf_counter()
+    try:
+        for cycle in range(args.cycles):
+            job = registry.new_job(f"soak{cycle}")
+            view = SoakView(QWidget(), transcript_path, model=model, hedge=hedge if args.hedge else None,
+                            ollama_host=server.url, job=job)
+            pump(rng.randint(*dwell))
+            for kind, count in registry.counts().items():
+                peaks[kind] = max(peaks[kind], count)
+            registry.cancel(job)
+            view.deleteLater()
+
+        settle_started = time.monotonic()
+        stuck = registry.shutdown(timeout_ms=int(args.settle * 1000))
+        deadline = time.monotonic() + args.settle
+        while any(registry.counts().values()) and time.monotonic() < deadline:
+            pump(20)
+        final = registry.counts()
+        settled = time.monotonic() - settle_started
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"{args.cycles} views in {time.perf_counter() - started:.1f}s against {server.url}")
+    print("peak:  " + "  ".join(f"{kind} {count}" for kind, count in peaks.items()))
+    print("after: " + "  ".join(f"{kind} {count}" for kind, count in final.items()) + f"  ({settled:.2f}s)")
+    if stuck or any(final.values()):
+        print(f"FAIL: {stuck} threads still running, {sum(final.values())} resources still registered")
+        sys.exit(1)
+    del qt_app
+
+
+if __name__ == "__main__":
+    main()
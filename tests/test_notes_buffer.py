@@ -0,0 +1,103 @@
+import os
+import random
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py needs the whole PySide6 WebEngine stack, which a headless box may not have
+app = pytest.importorskip("app")
+NotesBuffer, ThinkFilter, BLOCK = app.NotesBuffer, app.ThinkFilter, app.NOTES_BUFFER_BLOCK
+
+
+def filled(text, rng):
+    buffer = NotesBuffer()
+    position = 0
+    while position < len(text):
+        step = rng.randint(1, 300)
+        buffer.append(text[position:position + step])
+        position += step
+    return buffer
+
+
+@pytest.fixture
+def text():
+    rng = random.Random(0)
+    return "".join(rng.choice("abcdefgh \n<>") for _ in range(3 * BLOCK + 777))
+
+
+def test_since_every_offset_around_block_boundaries(text):
+    buffer = filled(text, random.Random(1))
+    assert len(buffer) == len(text)
+    assert buffer.starts, "the text should span several blocks"
+    offsets = {0, len(text)}
+    for start in buffer.starts + [BLOCK, 2 * BLOCK, len(text) - buffer.tail_length]:
+        offsets.update(start + delta for delta in (-2, -1, 0, 1, 2))
+    for offset in sorted(o for o in offsets if 0 <= o <= len(text)):
+        assert buffer.since(offset) == text[offset:]
+        generation, new_text, end = buffer.peek(offset)
+        assert (generation, new_text, end) == (0, text[offset:], len(text))
+
+
+def test_read_catches_up_in_steps(text):
+    rng = random.Random(2)
+    buffer = NotesBuffer()
+    seen, offset, position = [], 0, 0
+    while position < len(text):
+        step = rng.randint(1, BLOCK // 3)
+        buffer.append(text[position:position + step])
+        position += step
+        if rng.random() < 0.3:
+            _, new_text = buffer.read(offset, 0)
+            seen.append(new_text)
+            offset += len(new_text)
+    seen.append(buffer.read(offset, 0)[1])
+    assert "".join(seen) == text
+
+
+def test_clear_bumps_the_generation_and_restarts_readers(text):
+    buffer = filled(text, random.Random(3))
+    buffer.clear()
+    assert len(buffer) == 0
+    buffer.append("fresh")
+    # A reader still on the old generation starts over instead of reading past the end
+    assert buffer.read(len(text), 0) == (1, "fresh")
+    assert buffer.peek(len(text), 0) == (1, "fresh", 5)
+    assert buffer.peek(2, 1) == (1, "esh", 5)
+    assert buffer.text() == "fresh"
+
+
+def test_peek_does_not_mark_the_reader_caught_up():
+    buffer = NotesBuffer()
+    assert buffer.append("a") is True
+    buffer.peek(0)
+    assert buffer.append("b") is False
+    buffer.read(0)
+    assert buffer.append("c") is True
+
+
+def test_streaming_100k_tokens_stays_close_to_the_output_size():
+    rng = random.Random(4)
+    words = "gradient descent network layer value <b>function</b> model\n".split(" ")
+    tokens = ["<think>", "planning the sections", "</think>"]
+    tokens += [rng.choice(words) + rng.choice(" \n") for _ in range(100_000)]
+    output = sum(len(token) for token in tokens[3:])
+
+    tracemalloc.start()
+    try:
+        think_filter = ThinkFilter()
+        buffer = NotesBuffer()
+        for token in tokens:
+            visible = think_filter.feed(token)
+            if visible:
+                buffer.append(visible)
+        buffer.append(think_filter.flush())
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert len(buffer) == output
+    # The streamed text is held once, in blocks, plus at most one block of small chunks
+    assert peak < 1.5 * output + 4 * BLOCK
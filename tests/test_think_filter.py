@@ -0,0 +1,55 @@
+import os
+import re
+import sys
+
+import pytest
+
+pytest.importorskip("hypothesis")
+from hypothesis import given, strategies as st
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# app.py needs the whole PySide6 WebEngine stack, which a headless box may not have
+ThinkFilter = pytest.importorskip("app").ThinkFilter
+
+# Tag fragments make the splits land inside tags far more often than random text would
+PIECES = ["<think>", "</think>", "<", "</", "<th", "think", "ink>", ">", "notes", " ", "\n", "a<b", "é"]
+streams = st.lists(st.sampled_from(PIECES), max_size=40).map("".join)
+THINK_BLOCK = re.compile(r"<think>.*?(?:</think>|\Z)", re.S)
+
+
+def run(chunks):
+    think_filter = ThinkFilter()
+    return "".join(think_filter.feed(chunk) for chunk in chunks) + think_filter.flush()
+
+
+@st.composite
+def chunked(draw):
+    text = draw(streams)
+    cuts = sorted(draw(st.lists(st.integers(0, len(text)), max_size=20)))
+    bounds = [0] + cuts + [len(text)]
+    return text, [text[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+@given(chunked())
+def test_random_chunk_splits_match_whole_string(case):
+    text, chunks = case
+    assert run(chunks) == run([text])
+
+
+@given(streams)
+def test_whole_string_drops_think_blocks(text):
+    assert run([text]) == THINK_BLOCK.sub("", text)
+
+
+@given(streams)
+def test_one_character_chunks(text):
+    assert run(list(text)) == THINK_BLOCK.sub("", text)
+
+
+def test_unclosed_think_hides_the_rest():
+    assert run(["before <thi", "nk> hidden", " still hidden"]) == "before "
+
+
+def test_partial_tag_at_the_end_is_kept():
+    assert run(["notes <th"]) == "notes <th"